@@ -19,7 +19,7 @@ from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.metrics import f1_score, precision_score, recall_score, roc_auc_score
 import xgboost as xgb
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -124,47 +124,76 @@ class DataLoader_B:
         """
         Create weather features from HISTORICAL data (30 days BEFORE planting)
         ✅ NO TEMPORAL LEAKAGE - using past data only
+        
+        Rolling 30-day aggregates are computed once per province on a daily
+        calendar, shifted by one day (window = planting-30d .. planting-1d),
+        then joined onto the planting dates.
         """
         
-        weather_features = []
+        windows = self._weather_windows()
+        
+        keys = pd.DataFrame({
+            'province': df['province'].to_numpy(),
+            'date': df['planting_date'].dt.normalize().to_numpy()
+        })
+        joined = keys.merge(windows, on=['province', 'date'], how='left')
+        
+        # Use default values if no weather data
+        has_data = joined['rows'].fillna(0).to_numpy() > 0
+        weather_df = pd.DataFrame({
+            'avg_temp_prev_30d': np.where(has_data, joined['temp_sum'] / joined['temp_count'], 28.0),
+            'avg_rainfall_prev_30d': np.where(has_data, joined['rain_sum'] / joined['rain_count'], 100.0),
+            'total_rainfall_prev_30d': np.where(has_data, joined['rain_sum'], 3000.0),
+            'rainy_days_prev_30d': np.where(has_data, joined['rainy_days'].fillna(0), 15).astype(np.int64),
+        })
         
-        for idx, row in df.iterrows():
-            province = row['province']
-            planting_date = row['planting_date']
-            
-            # Get weather from 30 days BEFORE planting
-            start_date = planting_date - timedelta(days=30)
-            end_date = planting_date - timedelta(days=1)
-            
-            weather_window = self.weather[
-                (self.weather['province'] == province) &
-                (self.weather['date'] >= start_date) &
-                (self.weather['date'] <= end_date)
-            ]
-            
-            if len(weather_window) > 0:
-                weather_features.append({
-                    'avg_temp_prev_30d': weather_window['temperature_celsius'].mean(),
-                    'avg_rainfall_prev_30d': weather_window['rainfall_mm'].mean(),
-                    'total_rainfall_prev_30d': weather_window['rainfall_mm'].sum(),
-                    'rainy_days_prev_30d': (weather_window['rainfall_mm'] > 5).sum(),
-                })
-            else:
-                # Use default values if no weather data
-                weather_features.append({
-                    'avg_temp_prev_30d': 28.0,
-                    'avg_rainfall_prev_30d': 100.0,
-                    'total_rainfall_prev_30d': 3000.0,
-                    'rainy_days_prev_30d': 15,
-                })
-        
-        weather_df = pd.DataFrame(weather_features)
         df = pd.concat([df.reset_index(drop=True), weather_df], axis=1)
         
         logger.info(f"✅ Created weather features (30 days before planting)")
         
         return df
     
+    def _weather_windows(self, window_days=30, rainy_day_mm=5):
+        """
+        Per-province sums over the `window_days` days BEFORE each date
+        
+        Returns:
+            DataFrame with province, date, rows, temp_sum, temp_count,
+            rain_sum, rain_count, rainy_days
+        """
+        
+        temp = self.weather['temperature_celsius']
+        rain = self.weather['rainfall_mm']
+        daily = pd.DataFrame({
+            'province': self.weather['province'],
+            'date': self.weather['date'].dt.normalize(),
+            'rows': 1,
+            'temp_sum': temp.fillna(0.0),
+            'temp_count': temp.notna().astype(np.int64),
+            'rain_sum': rain.fillna(0.0),
+            'rain_count': rain.notna().astype(np.int64),
+            'rainy_days': (rain > rainy_day_mm).astype(np.int64),
+        }).groupby(['province', 'date']).sum()
+        
+        windows = []
+        for province, province_daily in daily.groupby(level='province'):
+            province_daily = province_daily.droplevel('province')
+            
+            # Daily calendar reaching window_days past the last record
+            calendar = pd.date_range(province_daily.index.min(),
+                                     province_daily.index.max() + pd.Timedelta(days=window_days), freq='D')
+            rolled = (province_daily.reindex(calendar, fill_value=0)
+                      .rolling(window_days, min_periods=1).sum()
+                      .shift(1))
+            rolled.index.name = 'date'
+            rolled['province'] = province
+            windows.append(rolled.dropna().reset_index())
+        
+        if not windows:
+            return pd.DataFrame(columns=['province', 'date', 'rows', 'temp_sum', 'temp_count',
+                                         'rain_sum', 'rain_count', 'rainy_days'])
+        return pd.concat(windows, ignore_index=True)
+    
     def _create_clean_target(self, df, success_threshold):
         """
         Create target WITHOUT data leakage
@@ -173,49 +202,32 @@ class DataLoader_B:
         This is better than using actual success_rate (which is data leakage)
         
         Rules are more lenient to create balanced dataset
+        Good window if score >= 4 out of 7
         """
         
-        def is_good_window_rule_based(row):
-            """
-            Rule-based target from agronomic knowledge
-            More lenient rules for balanced dataset
-            """
-            
-            score = 0
-            
-            # 1. Season match (weight: 2 points)
-            if row['seasonal_type'] == 'all_season':
-                score += 2
-            elif row['seasonal_type'] == row['season']:
-                score += 2
-            elif row['seasonal_type'] in ['rainy', 'summer', 'winter']:
-                # Partial match for adjacent seasons
-                if row['season'] == 'rainy' and row['seasonal_type'] in ['summer', 'winter']:
-                    score += 1
-            
-            # 2. Rainfall suitability (weight: 2 points)
-            rainfall = row['avg_rainfall_prev_30d']
-            if 10 <= rainfall <= 150:  # More lenient range
-                score += 2
-            elif 5 <= rainfall <= 200:
-                score += 1
-            
-            # 3. Temperature suitability (weight: 2 points)
-            temp = row['avg_temp_prev_30d']
-            if 22 <= temp <= 32:  # Optimal range
-                score += 2
-            elif 18 <= temp <= 36:  # Acceptable range
-                score += 1
-            
-            # 4. Rainy days (weight: 1 point)
-            rainy_days = row['rainy_days_prev_30d']
-            if 5 <= rainy_days <= 20:
-                score += 1
-            
-            # Good window if score >= 4 out of 7
-            return int(score >= 4)
+        seasonal_type = df['seasonal_type'].to_numpy()
+        season = df['season'].to_numpy()
+        rainfall = df['avg_rainfall_prev_30d'].to_numpy(dtype=float)
+        temp = df['avg_temp_prev_30d'].to_numpy(dtype=float)
+        rainy_days = df['rainy_days_prev_30d'].to_numpy(dtype=float)
+        
+        # 1. Season match (weight: 2 points), partial match for adjacent seasons
+        season_match = (seasonal_type == 'all_season') | (seasonal_type == season)
+        adjacent = (season == 'rainy') & np.isin(seasonal_type, ['summer', 'winter'])
+        score = np.where(season_match, 2, np.where(adjacent, 1, 0))
+        
+        # 2. Rainfall suitability (weight: 2 points), lenient range
+        score += np.where((rainfall >= 10) & (rainfall <= 150), 2,
+                          np.where((rainfall >= 5) & (rainfall <= 200), 1, 0))
+        
+        # 3. Temperature suitability (weight: 2 points): optimal / acceptable
+        score += np.where((temp >= 22) & (temp <= 32), 2,
+                          np.where((temp >= 18) & (temp <= 36), 1, 0))
+        
+        # 4. Rainy days (weight: 1 point)
+        score += ((rainy_days >= 5) & (rainy_days <= 20)).astype(int)
         
-        df['is_good_window'] = df.apply(is_good_window_rule_based, axis=1)
+        df['is_good_window'] = (score >= 4).astype(int)
         
         logger.info(f"✅ Created clean target (rule-based, no data leakage)")
         
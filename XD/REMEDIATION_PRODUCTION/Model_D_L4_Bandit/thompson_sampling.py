@@ -100,17 +100,27 @@ class ThompsonSamplingBandit:
         """
         Thompson Sampling: Sample θ ~ Beta(α, β) for each arm, select max
         """
-        # Sample from posterior
-        theta_samples = np.array([
-            np.random.beta(self.alpha[i], self.beta[i]) 
-            for i in range(self.n_arms)
-        ])
+        # Sample from posterior (one draw per arm, in arm order)
+        theta_samples = np.random.beta(self.alpha, self.beta)
         
         # Select action with highest sample
         best_action = np.argmax(theta_samples)
         
         return best_action, theta_samples
     
+    def sample_and_select_batch(self, n_decisions):
+        """
+        Thompson Sampling for n independent decisions in one Beta draw
+        
+        Draws come in the same order as n calls to sample_and_select().
+        
+        Returns:
+            best_actions (n_decisions,), theta_samples (n_decisions, n_arms)
+        """
+        theta_samples = np.random.beta(self.alpha, self.beta, size=(n_decisions, self.n_arms))
+        
+        return np.argmax(theta_samples, axis=1), theta_samples
+    
     def get_arm_posteriors(self):
         """Get posterior distribution for each arm"""
         posteriors = {}
@@ -188,11 +198,74 @@ class HarvestProfitCalculator:
             'revenue': expected_revenue,
         }
 
+    def calculate_profit_matrix(self,
+                                wait_days,
+                                current_price,
+                                forecast_price,
+                                forecast_std,
+                                spoilage_rate_per_day=0.02):
+        """
+        calculate_profit() for many plots and every action at once
+        
+        Args:
+            wait_days: Days to wait per action, e.g. (0, 3, 7)
+            current_price, forecast_price, forecast_std, spoilage_rate_per_day:
+                One value per plot (arrays of equal length, or scalars); the
+                calculator's yield_kg / storage_cost_per_day likewise
+        
+        Returns:
+            Same keys as calculate_profit, each an (n_plots, n_actions) array
+        """
+        def column(values):
+            return np.asarray(values, dtype=np.float64).reshape(-1, 1)
+        
+        wait = np.asarray(wait_days, dtype=np.float64).reshape(1, -1)
+        yield_kg = column(self.yield_kg)
+        
+        # Expected yield after spoilage
+        spoilage_loss = yield_kg * (column(spoilage_rate_per_day) * wait)
+        remaining_yield = yield_kg - spoilage_loss
+        
+        # Expected price (no uncertainty for current price)
+        sell_now = wait == 0
+        expected_price = np.where(sell_now, column(current_price), column(forecast_price))
+        price_std = np.where(sell_now, 0.0, column(forecast_std))
+        
+        # Revenue
+        expected_revenue = remaining_yield * expected_price
+        revenue_std = remaining_yield * price_std
+        
+        # Costs
+        storage_cost = column(self.storage_cost_per_day) * wait
+        
+        # Profit
+        expected_profit = expected_revenue - storage_cost
+        
+        shape = np.broadcast_shapes(expected_profit.shape, storage_cost.shape)
+        return {
+            'expected_profit': np.broadcast_to(expected_profit, shape),
+            'profit_std': np.broadcast_to(revenue_std, shape),
+            'remaining_yield': np.broadcast_to(remaining_yield, shape),
+            'expected_price': np.broadcast_to(expected_price, shape),
+            'storage_cost': np.broadcast_to(storage_cost, shape),
+            'revenue': np.broadcast_to(expected_revenue, shape),
+        }
+
 class HarvestDecisionEngine:
     """End-to-end harvest decision system"""
     
-    def __init__(self):
-        self.bandit = ThompsonSamplingBandit(n_arms=3)
+    WAIT_DAYS = [0, 3, 7]
+    ACTION_NAMES = ["Harvest Now", "Wait 3 Days", "Wait 7 Days"]
+    
+    def __init__(self, bandit=None, record_history=True):
+        """
+        Args:
+            bandit: Trained ThompsonSamplingBandit (None = fresh prior)
+            record_history: Keep every decide() result in decision_history
+                (turn off for a long-lived serving engine)
+        """
+        self.bandit = bandit if bandit is not None else ThompsonSamplingBandit(n_arms=3)
+        self.record_history = record_history
         self.decision_history = []
         
     def decide(self, 
@@ -260,10 +333,64 @@ class HarvestDecisionEngine:
             'confidence': self.bandit.get_arm_posteriors(),
         }
         
-        self.decision_history.append(decision_dict)
+        if self.record_history:
+            self.decision_history.append(decision_dict)
         
         return decision_dict
     
+    def decide_batch(self,
+                     current_price,
+                     forecast_price_median,
+                     forecast_price_std,
+                     yield_kg,
+                     plant_health_score=0.9,
+                     storage_cost_per_day=10,
+                     use_thompson=True):
+        """
+        decide() for many plots at once
+        
+        Inputs are arrays with one value per plot, or scalars shared by all
+        plots. Profits for every plot and action come from one broadcast
+        computation and the Thompson samples from one Beta draw, so with the
+        same NumPy seed the actions match consecutive decide() calls. Batch
+        decisions are not added to decision_history.
+        
+        Returns:
+            Dict of arrays: action_idx / action (n_plots,), the
+            calculate_profit keys (n_plots, 3 actions: now, 3d, 7d),
+            theta_samples (n_plots, 3; None when greedy), confidence
+        """
+        current_price, forecast_price_median, forecast_price_std, yield_kg, plant_health_score, storage_cost_per_day = (
+            np.atleast_1d(arr) for arr in np.broadcast_arrays(*(
+                np.asarray(value, dtype=np.float64) for value in (
+                    current_price, forecast_price_median, forecast_price_std,
+                    yield_kg, plant_health_score, storage_cost_per_day
+                )
+            ))
+        )
+        
+        profit_calc = HarvestProfitCalculator(yield_kg, storage_cost_per_day)
+        profits = profit_calc.calculate_profit_matrix(
+            self.WAIT_DAYS,
+            current_price,
+            forecast_price_median,
+            forecast_price_std,
+            spoilage_rate_per_day=0.02 * (1 - plant_health_score)  # Healthier = less spoilage
+        )
+        
+        if use_thompson:
+            best_action, theta_samples = self.bandit.sample_and_select_batch(len(current_price))
+        else:
+            best_action, theta_samples = np.argmax(profits['expected_profit'], axis=1), None
+        
+        return {
+            'action_idx': best_action,
+            'action': np.array(self.ACTION_NAMES, dtype=object)[best_action],
+            **profits,
+            'theta_samples': theta_samples,
+            'confidence': self.bandit.get_arm_posteriors(),
+        }
+    
     def get_stats(self):
         """Get bandit statistics"""
         return {
@@ -19,6 +19,7 @@ import json
 from pathlib import Path
 from datetime import datetime
 import logging
+import time
 import matplotlib.pyplot as plt
 import seaborn as sns
 from scipy.stats import beta as beta_dist
@@ -42,6 +43,8 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+WAIT_DAYS = [0, 3, 7]  # Harvest Now, Wait 3 Days, Wait 7 Days
+
 class ThompsonSamplingBanditV3(ThompsonSamplingBandit):
     """Enhanced Thompson Sampling with continuous reward"""
     
@@ -66,87 +69,205 @@ class ThompsonSamplingBanditV3(ThompsonSamplingBandit):
         self.action_history.append(action_idx)
         self.reward_history.append(reward)
 
+    def run_continuous(self, rewards, decay_factor=0.995, rng=None):
+        """
+        Sequential Thompson Sampling over precomputed rewards
+        
+        Same decisions and updates as sample_and_select() +
+        update_beliefs_continuous() per scenario. Every posterior sample
+        depends on all earlier updates, so this stays a per-scenario Python
+        loop; it is kept tight instead (three scalar Beta draws and a decayed
+        update on plain floats per step, rewards read from a list), and the
+        histories are appended in bulk at the end.
+        
+        Args:
+            rewards: (n_scenarios, n_arms) reward of each arm in [0, 1]
+            decay_factor: Decay for non-stationary environments
+            rng: np.random.Generator for the posterior samples
+        
+        Returns:
+            Chosen arm per scenario (n_scenarios,)
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        draw = rng.beta
+        alpha = [float(a) for a in self.alpha]
+        beta = [float(b) for b in self.beta]
+        arms = range(self.n_arms)
+        actions = []
+        
+        for reward_row in rewards.tolist():
+            # Sample from posterior, select max (first arm on ties, like argmax)
+            theta = [draw(alpha[i], beta[i]) for i in arms]
+            action = theta.index(max(theta))
+            actions.append(action)
+            
+            # Decay, then fractional success/failure for the chosen arm
+            reward = reward_row[action]
+            alpha = [a * decay_factor for a in alpha]
+            beta = [b * decay_factor for b in beta]
+            alpha[action] += reward
+            beta[action] += 1 - reward
+        
+        actions = np.array(actions, dtype=np.int64)
+        self.alpha = np.array(alpha)
+        self.beta = np.array(beta)
+        self.action_history.extend(actions.tolist())
+        self.reward_history.extend(rewards[np.arange(len(rewards)), actions].tolist())
+        
+        return actions
+
+
+def generate_scenarios(n_scenarios=5000, rng=None):
+    """
+    BALANCED test scenarios as arrays (one draw per column, no Python loop)
+    
+    Thirds of up / down / stable price trends, farm conditions and a noisy
+    forecast, plus the profit of every action and the optimal one.
+    
+    Args:
+        n_scenarios: Number of scenarios
+        rng: np.random.Generator
+    
+    Returns:
+        DataFrame with one row per scenario; profit_now / profit_wait_3d /
+        profit_wait_7d hold the profit of each action
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    
+    # More balanced: 33% each trend
+    n_per_trend = n_scenarios // 3
+    position = np.arange(n_scenarios)
+    trend = np.where(position < n_per_trend, 0, np.where(position < 2 * n_per_trend, 1, 2))
+    
+    #                           up           down         stable
+    price_low = np.array([2.5, 3.0, 2.5])[trend]
+    price_high = np.array([3.5, 4.0, 4.0])[trend]
+    change_low = np.array([1.10, 0.80, 0.97])[trend]
+    change_high = np.array([1.25, 0.95, 1.03])[trend]
+    
+    current_price = rng.uniform(price_low, price_high)
+    forecast_price = current_price * rng.uniform(change_low, change_high)
+    forecast_std = np.abs(forecast_price - current_price) * 0.15
+    
+    # Farm conditions
+    yield_kg = rng.uniform(12000, 18000, n_scenarios)
+    plant_health = rng.uniform(0.85, 1.0, n_scenarios)
+    storage_cost = rng.uniform(3, 7, n_scenarios)
+    
+    # Add noise
+    noisy_forecast_price = np.maximum(0.5, rng.normal(forecast_price, forecast_std))
+    
+    # Profit of every action, optimal action
+    calc = HarvestProfitCalculator(yield_kg, storage_cost)
+    profits = calc.calculate_profit_matrix(
+        WAIT_DAYS, current_price, noisy_forecast_price, forecast_std,
+        spoilage_rate_per_day=0.015 * (1 - plant_health)
+    )['expected_profit']
+    optimal_idx = np.argmax(profits, axis=1)
+    
+    return pd.DataFrame({
+        'scenario_id': position,
+        'current_price': current_price,
+        'forecast_price': forecast_price,
+        'noisy_forecast_price': noisy_forecast_price,
+        'forecast_std': forecast_std,
+        'yield_kg': yield_kg,
+        'plant_health': plant_health,
+        'storage_cost': storage_cost,
+        'price_trend': np.array(['up', 'down', 'stable'])[trend],
+        'optimal_action': np.array(WAIT_DAYS)[optimal_idx],
+        'optimal_profit': profits[position, optimal_idx],
+        'profit_now': profits[:, 0],
+        'profit_wait_3d': profits[:, 1],
+        'profit_wait_7d': profits[:, 2]
+    })
+
+
+def scenario_profits(scenarios):
+    """(n_scenarios, 3) profit of each action"""
+    return scenarios[['profit_now', 'profit_wait_3d', 'profit_wait_7d']].to_numpy()
+
+
+def continuous_rewards(scenarios):
+    """(n_scenarios, 3) continuous reward of each action: profit ratio to optimal, clipped to [0, 1]"""
+    profits = scenario_profits(scenarios)
+    optimal = scenarios['optimal_profit'].to_numpy()[:, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        profit_ratio = np.where(optimal > 0, profits / optimal, 0.5)
+    return profit_ratio, np.clip(profit_ratio, 0, 1)
+
+
+def evaluate_actions(scenarios, actions):
+    """
+    Per-scenario results and metrics for the chosen actions
+    
+    Returns:
+        (results DataFrame, metrics dict)
+    """
+    rows = np.arange(len(scenarios))
+    profit_ratio, rewards = continuous_rewards(scenarios)
+    chosen_wait_days = np.array(WAIT_DAYS)[actions]
+    actual_profit = scenario_profits(scenarios)[rows, actions]
+    optimal_profit = scenarios['optimal_profit'].to_numpy()
+    is_correct = chosen_wait_days == scenarios['optimal_action'].to_numpy()
+    
+    results = pd.DataFrame({
+        'scenario_id': scenarios['scenario_id'].to_numpy(),
+        'chosen_action': np.array(HarvestDecisionEngine.ACTION_NAMES, dtype=object)[actions],
+        'chosen_wait_days': chosen_wait_days,
+        'optimal_action': scenarios['optimal_action'].to_numpy(),
+        'is_correct': is_correct,
+        'actual_profit': actual_profit,
+        'optimal_profit': optimal_profit,
+        'profit_ratio': profit_ratio[rows, actions],
+        'reward': rewards[rows, actions]
+    })
+    
+    total_profit = float(actual_profit.sum())
+    total_optimal_profit = float(optimal_profit.sum())
+    metrics = {
+        'accuracy': float(is_correct.mean()),
+        'profit_efficiency': total_profit / total_optimal_profit if total_optimal_profit > 0 else 0,
+        'total_profit': total_profit,
+        'optimal_profit': total_optimal_profit,
+        'correct_decisions': int(is_correct.sum()),
+        'total_scenarios': len(scenarios)
+    }
+    return results, metrics
+
+
 class ModelDTrainerV3:
     """Train Model D V3 - Production Ready"""
     
-    def __init__(self, decay_factor=0.995):
-        self.engine = HarvestDecisionEngine()
-        # Replace with V3 bandit
-        self.engine.bandit = ThompsonSamplingBanditV3(n_arms=3, alpha_init=1, beta_init=1)
+    def __init__(self, decay_factor=0.995, seed=42):
+        # V3 bandit
+        self.engine = HarvestDecisionEngine(bandit=ThompsonSamplingBanditV3(n_arms=3, alpha_init=1, beta_init=1))
         self.decay_factor = decay_factor
-        self.test_scenarios = []
-        self.results = []
+        self.seed = seed
+        self.test_scenarios = None
+        self.results = None
         self.cached_metrics = None
-        
+    
+    def _random_streams(self) -> dict:
+        """Independent seeded generators for the scenarios and the posterior samples"""
+        seeds = np.random.SeedSequence(self.seed).spawn(2)
+        return {
+            name: np.random.default_rng(seed)
+            for name, seed in zip(['scenarios', 'thompson'], seeds)
+        }
+    
     def create_test_scenarios(self, n_scenarios=5000):
         """Create BALANCED test scenarios"""
-        logger.info(f"📊 Creating {n_scenarios} BALANCED test scenarios...")
-        
-        np.random.seed(42)
-        scenarios = []
-        
-        # More balanced: 33% each trend
-        n_per_trend = n_scenarios // 3
-        
-        for i in range(n_scenarios):
-            # Determine trend
-            if i < n_per_trend:
-                price_trend = 'up'
-                current_price = np.random.uniform(2.5, 3.5)
-                forecast_price = current_price * np.random.uniform(1.10, 1.25)
-            elif i < 2 * n_per_trend:
-                price_trend = 'down'
-                current_price = np.random.uniform(3.0, 4.0)
-                forecast_price = current_price * np.random.uniform(0.80, 0.95)
-            else:
-                price_trend = 'stable'
-                current_price = np.random.uniform(2.5, 4.0)
-                forecast_price = current_price * np.random.uniform(0.97, 1.03)
-            
-            forecast_std = abs(forecast_price - current_price) * 0.15
-            
-            # Farm conditions
-            yield_kg = np.random.uniform(12000, 18000)
-            plant_health = np.random.uniform(0.85, 1.0)
-            storage_cost = np.random.uniform(3, 7)
-            
-            # Add noise
-            noisy_forecast_price = np.random.normal(forecast_price, forecast_std)
-            noisy_forecast_price = max(0.5, noisy_forecast_price)
-            
-            # Calculate optimal action
-            calc = HarvestProfitCalculator(yield_kg, storage_cost)
-            profits = {}
-            for wait_days in [0, 3, 7]:
-                profits[wait_days] = calc.calculate_profit(
-                    wait_days, current_price, noisy_forecast_price, forecast_std,
-                    spoilage_rate_per_day=0.015 * (1 - plant_health)
-                )['expected_profit']
-            
-            optimal_action = max(profits, key=profits.get)
-            optimal_profit = profits[optimal_action]
-            
-            scenario = {
-                'scenario_id': i,
-                'current_price': current_price,
-                'forecast_price': forecast_price,
-                'noisy_forecast_price': noisy_forecast_price,
-                'forecast_std': forecast_std,
-                'yield_kg': yield_kg,
-                'plant_health': plant_health,
-                'storage_cost': storage_cost,
-                'price_trend': price_trend,
-                'optimal_action': optimal_action,
-                'optimal_profit': optimal_profit,
-                'profits': profits
-            }
-            scenarios.append(scenario)
+        logger.info(f"📊 Creating {n_scenarios} BALANCED test scenarios (seed {self.seed})...")
+        
+        scenarios = generate_scenarios(n_scenarios, self._random_streams()['scenarios'])
         
         self.test_scenarios = scenarios
+        trends = scenarios['price_trend'].value_counts()
         logger.info(f"✅ Created {len(scenarios)} test scenarios")
-        logger.info(f"   Price trends: Up={sum(1 for s in scenarios if s['price_trend']=='up')}, "
-                   f"Down={sum(1 for s in scenarios if s['price_trend']=='down')}, "
-                   f"Stable={sum(1 for s in scenarios if s['price_trend']=='stable')}")
+        logger.info(f"   Price trends: Up={trends.get('up', 0)}, "
+                   f"Down={trends.get('down', 0)}, "
+                   f"Stable={trends.get('stable', 0)}")
         
         return scenarios
     
@@ -156,74 +277,23 @@ class ModelDTrainerV3:
         logger.info(f"   Decay factor: {self.decay_factor}")
         logger.info(f"   Reward: Continuous profit_ratio")
         
-        correct_decisions = 0
-        total_profit = 0
-        total_optimal_profit = 0
-        
-        for idx, scenario in enumerate(self.test_scenarios):
-            # Pure Thompson Sampling
-            decision = self.engine.decide(
-                current_price=scenario['current_price'],
-                forecast_price_median=scenario['noisy_forecast_price'],
-                forecast_price_std=scenario['forecast_std'],
-                yield_kg=scenario['yield_kg'],
-                plant_health_score=scenario['plant_health'],
-                storage_cost_per_day=scenario['storage_cost'],
-                use_thompson=True
-            )
-            
-            action_map = {"Harvest Now": 0, "Wait 3 Days": 3, "Wait 7 Days": 7}
-            chosen_wait_days = action_map[decision['action']]
-            
-            actual_profit = scenario['profits'][chosen_wait_days]
-            is_correct = (chosen_wait_days == scenario['optimal_action'])
-            if is_correct:
-                correct_decisions += 1
-            
-            # Continuous reward
-            profit_ratio = actual_profit / scenario['optimal_profit'] if scenario['optimal_profit'] > 0 else 0.5
-            reward = np.clip(profit_ratio, 0, 1)
-            
-            # Update with continuous reward
-            self.engine.bandit.update_beliefs_continuous(
-                decision['action_idx'], 
-                reward,
-                decay_factor=self.decay_factor
-            )
-            
-            result = {
-                'scenario_id': scenario['scenario_id'],
-                'chosen_action': decision['action'],
-                'chosen_wait_days': chosen_wait_days,
-                'optimal_action': scenario['optimal_action'],
-                'is_correct': is_correct,
-                'actual_profit': actual_profit,
-                'optimal_profit': scenario['optimal_profit'],
-                'profit_ratio': profit_ratio,
-                'reward': reward
-            }
-            self.results.append(result)
-            
-            total_profit += actual_profit
-            total_optimal_profit += scenario['optimal_profit']
-        
-        accuracy = correct_decisions / len(self.test_scenarios)
-        profit_efficiency = total_profit / total_optimal_profit if total_optimal_profit > 0 else 0
-        
-        self.cached_metrics = {
-            'accuracy': accuracy,
-            'profit_efficiency': profit_efficiency,
-            'total_profit': total_profit,
-            'optimal_profit': total_optimal_profit,
-            'correct_decisions': correct_decisions,
-            'total_scenarios': len(self.test_scenarios)
-        }
+        _, rewards = continuous_rewards(self.test_scenarios)
+        actions = self.engine.bandit.run_continuous(
+            rewards,
+            decay_factor=self.decay_factor,
+            rng=self._random_streams()['thompson']
+        )
+        self.results, self.cached_metrics = evaluate_actions(self.test_scenarios, actions)
+        
+        accuracy = self.cached_metrics['accuracy']
+        profit_efficiency = self.cached_metrics['profit_efficiency']
+        correct_decisions = self.cached_metrics['correct_decisions']
         
         logger.info(f"\n✅ Simulation complete:")
         logger.info(f"   Decision accuracy: {accuracy:.2%} ({correct_decisions}/{len(self.test_scenarios)})")
         logger.info(f"   Profit efficiency: {profit_efficiency:.2%}")
-        logger.info(f"   Total profit: {total_profit:,.0f} baht")
-        logger.info(f"   Optimal profit: {total_optimal_profit:,.0f} baht")
+        logger.info(f"   Total profit: {self.cached_metrics['total_profit']:,.0f} baht")
+        logger.info(f"   Optimal profit: {self.cached_metrics['optimal_profit']:,.0f} baht")
         
         if accuracy >= Config.MODEL_D_EXPECTED_ACCURACY:
             logger.info(f"   ✅ Accuracy meets requirement (>= {Config.MODEL_D_EXPECTED_ACCURACY})")
@@ -233,6 +303,34 @@ class ModelDTrainerV3:
         
         return self.cached_metrics
     
+    def sweep_decay_factors(self, decay_factors):
+        """
+        Simulate the same scenarios with a fresh V3 bandit per decay factor
+        
+        Every run uses the same seeded posterior-sample stream, so the
+        results differ only by the decay factor.
+        
+        Returns:
+            DataFrame with one row of metrics per decay factor
+        """
+        if self.test_scenarios is None:
+            self.create_test_scenarios()
+        
+        logger.info(f"\n🔁 Decay factor sweep over {len(self.test_scenarios):,} scenarios: {list(decay_factors)}")
+        _, rewards = continuous_rewards(self.test_scenarios)
+        
+        rows = []
+        for decay_factor in decay_factors:
+            start = time.perf_counter()
+            bandit = ThompsonSamplingBanditV3(n_arms=3, alpha_init=1, beta_init=1)
+            actions = bandit.run_continuous(rewards, decay_factor=decay_factor, rng=self._random_streams()['thompson'])
+            _, metrics = evaluate_actions(self.test_scenarios, actions)
+            rows.append({'decay_factor': decay_factor, **metrics, 'seconds': time.perf_counter() - start})
+            logger.info(f"   decay={decay_factor}: accuracy {metrics['accuracy']:.2%}, "
+                        f"profit efficiency {metrics['profit_efficiency']:.2%} ({rows[-1]['seconds']:.1f}s)")
+        
+        return pd.DataFrame(rows)
+    
     def generate_evaluation_plots(self):
         """Generate evaluation plots using cached metrics"""
         output_dir = Config.get_output_path('model_d', 'evaluation')
@@ -243,7 +341,7 @@ class ModelDTrainerV3:
             return
         
         metrics = self.cached_metrics
-        results_df = pd.DataFrame(self.results)
+        results_df = self.results.copy()
         
         fig = plt.figure(figsize=(16, 10))
         gs = fig.add_gridspec(3, 3, hspace=0.3, wspace=0.3)
@@ -372,7 +470,7 @@ class ModelDTrainerV3:
         model_state = {
             'version': '3.0',
             'bandit': self.engine.bandit,
-            'decision_history': self.engine.decision_history,
+            'decision_history': self.results.to_dict('records'),  # One dict per simulated decision
             'decay_factor': self.decay_factor,
             'metrics': self.cached_metrics
         }
@@ -413,12 +511,31 @@ class ModelDTrainerV3:
         logger.info(f"  Decay Factor: {self.decay_factor}")
 
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Train Model D V3 (Thompson Sampling)')
+    parser.add_argument('--scenarios', type=int, default=5000,
+                       help='Number of simulated scenarios (default: 5000)')
+    parser.add_argument('--decay', type=float, default=0.995,
+                       help='Posterior decay factor (default: 0.995)')
+    parser.add_argument('--seed', type=int, default=42,
+                       help='Seed for scenarios and posterior samples (default: 42)')
+    parser.add_argument('--sweep', type=float, nargs='+', default=None,
+                       help='Only compare these decay factors (no model saved)')
+    
+    args = parser.parse_args()
+    
     print("\n" + "="*80)
     print("MODEL D V3 - PRODUCTION READY".center(80))
     print("="*80)
     
-    trainer = ModelDTrainerV3(decay_factor=0.995)
-    trainer.create_test_scenarios(n_scenarios=5000)
+    trainer = ModelDTrainerV3(decay_factor=args.decay, seed=args.seed)
+    trainer.create_test_scenarios(n_scenarios=args.scenarios)
+    
+    if args.sweep:
+        print(trainer.sweep_decay_factors(args.sweep).to_string(index=False))
+        sys.exit(0)
+    
     metrics = trainer.simulate_decisions()
     trainer.generate_evaluation_plots()
     trainer.save_model()
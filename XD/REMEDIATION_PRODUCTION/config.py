@@ -15,6 +15,7 @@ class Config:
     MODEL_PATH = BASE_DIR / 'REMEDIATION_PRODUCTION' / 'trained_models'
     OUTPUT_PATH = BASE_DIR / 'REMEDIATION_PRODUCTION' / 'outputs'
     LOG_PATH = BASE_DIR / 'REMEDIATION_PRODUCTION' / 'logs'
+    CACHE_PATH = BASE_DIR / 'REMEDIATION_PRODUCTION' / 'cache'  # Parquet dataset caches (created on demand)
     
     # Ensure directories exist
     MODEL_PATH.mkdir(parents=True, exist_ok=True)
@@ -61,6 +62,10 @@ class Config:
     PIPELINE_TIMEOUT = 10  # seconds
     ENABLE_FALLBACK = True
     
+    # ==================== TRAINING CONFIG ====================
+    TRAIN_PARALLEL = False  # Fit the 3 candidate algorithms concurrently (only pays off with several cores)
+    TRAIN_N_CORES = None  # CPU budget for parallel training (None = all cores)
+    
     # ==================== DATA VALIDATION CONFIG ====================
     MAX_MISSING_VALUES_PERCENT = 5.0  # Maximum 5% missing values allowed
     MIN_FEATURE_CORRELATION = 0.05  # Minimum correlation with target
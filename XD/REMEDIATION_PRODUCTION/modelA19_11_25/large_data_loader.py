@@ -1,11 +1,18 @@
 """
 Large Data Loader for Model A
 Uses FARMME_GPU_DATASET.csv (2.2M+ rows) for training
+
+The CSV is streamed in chunks: only the columns Model A uses are parsed,
+features are created per chunk, numerics are downcast (float32 / smallest
+int) and province / crop_type become categoricals. The prepared chunks are
+written to a Parquet cache (one part file per chunk plus a manifest) that
+later runs load directly while the CSV is unchanged.
 """
 
 import pandas as pd
 import numpy as np
 from pathlib import Path
+import json
 import logging
 import sys
 
@@ -13,112 +20,281 @@ import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from config import Config
 
+# Parquet engine for the prepared-data cache (optional)
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Columns read from the CSV (pre-planting only, no future information)
+SOURCE_COLUMNS = [
+    'date',
+    'province',
+    'crop_type',
+    'crop_id',
+    'base_price',  # Historical base price
+    'inventory_level',
+    'storage_level',
+    'planting_activity',
+    'supply_level',
+    'demand_elasticity',
+    'income_elasticity',
+    'temperature_celsius',
+    'rainfall_mm',
+    'humidity_percent',
+    'drought_index',
+    'fuel_price',
+    'fertilizer_price',
+    'inflation_rate',
+    'gdp_growth',
+    'unemployment_rate',
+    'vegetable_demand_index',
+    'herb_demand_index',
+    'baht_usd_rate',
+    'avg_income',
+    'income_inequality',
+    'rural_share',
+]
+CATEGORICAL_COLUMNS = ['province', 'crop_type']
+CHUNK_SIZE = 250_000
+CACHE_FORMAT = 1
+
 class LargeDataLoader:
     """Load large FARMME_GPU_DATASET for Model A training"""
     
-    def __init__(self, dataset_path=None):
+    def __init__(self, dataset_path=None, chunksize=CHUNK_SIZE, cache_dir=None, use_cache=True):
         """
         Initialize large data loader
         
         Args:
             dataset_path: Path to FARMME_GPU_DATASET.csv
+            chunksize: CSV rows parsed per chunk
+            cache_dir: Parquet cache directory (default Config.CACHE_PATH / model_a_large)
+            use_cache: Read / write the Parquet cache (needs pyarrow)
         """
         if dataset_path is None:
             self.dataset_path = Config.DATA_PATH / 'FARMME_GPU_DATASET.csv'
         else:
             self.dataset_path = Path(dataset_path)
-            
+        
+        self.chunksize = chunksize
+        self.cache_dir = Path(cache_dir) if cache_dir else Config.CACHE_PATH / 'model_a_large'
+        self.use_cache = use_cache and PARQUET_AVAILABLE
+        if use_cache and not PARQUET_AVAILABLE:
+            logger.warning("⚠️ pyarrow not installed, Parquet cache disabled. Install with: pip install pyarrow")
+    
     def load_and_prepare(self, sample_size=None) -> pd.DataFrame:
         """
         Load and prepare large dataset for Model A
         
         Args:
             sample_size: Optional - limit number of rows (None = load all)
-            
+        
         Returns:
             pd.DataFrame: Prepared dataset
         """
         logger.info(f"📥 Loading FARMME_GPU_DATASET...")
         
-        # Load dataset
-        if sample_size:
-            logger.info(f"   Sampling {sample_size:,} rows...")
-            df = pd.read_csv(self.dataset_path, nrows=sample_size)
-        else:
-            logger.info(f"   Loading ALL rows (this may take a while)...")
-            df = pd.read_csv(self.dataset_path)
-        
-        logger.info(f"✅ Loaded {len(df):,} rows")
-        
-        # Parse date
-        df['date'] = pd.to_datetime(df['date'])
-        
-        # Create features for Model A
-        df_model_a = self._create_model_a_features(df)
+        df_model_a = self._read_cache(sample_size) if self.use_cache else None
+        if df_model_a is None:
+            df_model_a = self._load_chunked(sample_size)
         
         # Validate no leakage
         self._validate_no_leakage(df_model_a)
         
+        target = df_model_a['expected_roi_percent']
+        logger.info(f"   Target variable (expected_roi_percent):")
+        logger.info(f"   Mean: {target.mean():.2f}%")
+        logger.info(f"   Std: {target.std():.2f}%")
+        logger.info(f"   Min: {target.min():.2f}%")
+        logger.info(f"   Max: {target.max():.2f}%")
+        
         logger.info(f"✅ Prepared {len(df_model_a):,} samples for Model A")
         logger.info(f"   Features: {df_model_a.shape[1]} columns")
+        logger.info(f"   Memory: {df_model_a.memory_usage(deep=True).sum() / 1e6:.1f} MB")
         logger.info(f"   Date range: {df_model_a['date'].min()} to {df_model_a['date'].max()}")
         
         return df_model_a
     
-    def _create_model_a_features(self, df: pd.DataFrame) -> pd.DataFrame:
+    # ------------------------------------------------------------------
+    # Chunked CSV load
+    # ------------------------------------------------------------------
+    
+    def _load_chunked(self, sample_size=None) -> pd.DataFrame:
+        """Stream the CSV, prepare each chunk and (optionally) cache it"""
+        if sample_size:
+            logger.info(f"   Sampling {sample_size:,} rows...")
+        else:
+            logger.info(f"   Loading ALL rows in chunks of {self.chunksize:,}...")
+        
+        reader = pd.read_csv(
+            self.dataset_path,
+            usecols=SOURCE_COLUMNS,
+            dtype={col: str for col in CATEGORICAL_COLUMNS},
+            parse_dates=['date'],
+            chunksize=self.chunksize,
+            nrows=sample_size
+        )
+        
+        if self.use_cache:
+            self._clear_cache()
+        
+        # One random stream per synthetic column, so values don't depend on the chunk size
+        streams = self._random_streams()
+        categories = {col: [] for col in CATEGORICAL_COLUMNS}
+        chunks = []
+        rows_read = 0
+        
+        for i, chunk in enumerate(reader):
+            rows_read += len(chunk)
+            prepared = self._optimize_dtypes(self._create_model_a_features(chunk, streams), categories)
+            if self.use_cache:
+                prepared.to_parquet(self.cache_dir / f'part-{i:05d}.parquet', index=False)
+            chunks.append(prepared)
+        
+        logger.info(f"✅ Loaded {rows_read:,} rows")
+        df = self._concat(chunks, categories)
+        
+        if self.use_cache:
+            self._write_manifest(sample_size, len(chunks), categories)
+        
+        return df
+    
+    def _optimize_dtypes(self, df: pd.DataFrame, categories: dict) -> pd.DataFrame:
+        """
+        Downcast numerics and encode categorical columns
+        
+        `categories` holds the categories seen so far per column; new values
+        are appended, so codes stay stable from chunk to chunk.
+        """
+        for col in df.columns:
+            if col in categories:
+                known = categories[col]
+                seen = set(known)
+                known.extend(value for value in pd.unique(df[col].dropna()) if value not in seen)
+                df[col] = pd.Categorical(df[col], categories=known)
+            elif pd.api.types.is_float_dtype(df[col]):
+                df[col] = df[col].astype(np.float32)
+            elif pd.api.types.is_integer_dtype(df[col]):
+                df[col] = pd.to_numeric(df[col], downcast='integer')
+        return df
+    
+    @staticmethod
+    def _concat(chunks, categories: dict) -> pd.DataFrame:
+        """Concatenate prepared chunks with one shared category list per column"""
+        for chunk in chunks:
+            for col, known in categories.items():
+                chunk[col] = chunk[col].cat.set_categories(known)
+        
+        if not chunks:
+            return pd.DataFrame()
+        df = pd.concat(chunks, ignore_index=True)
+        chunks.clear()
+        return df
+    
+    @staticmethod
+    def _random_streams() -> dict:
+        """Independent seeded generators for the synthetic planting columns"""
+        seeds = np.random.SeedSequence(42).spawn(3)
+        return {
+            name: np.random.default_rng(seed)
+            for name, seed in zip(['planting_area', 'yield_per_rai', 'cost_per_rai'], seeds)
+        }
+    
+    # ------------------------------------------------------------------
+    # Parquet cache
+    # ------------------------------------------------------------------
+    
+    def _cache_key(self, sample_size) -> dict:
+        """What the cached data was built from"""
+        stat = self.dataset_path.stat()
+        return {
+            'format': CACHE_FORMAT,
+            'source': self.dataset_path.name,
+            'source_size': stat.st_size,
+            'source_mtime_ns': stat.st_mtime_ns,
+            'sample_size': sample_size,
+            'columns': SOURCE_COLUMNS
+        }
+    
+    def _clear_cache(self):
+        """Remove the manifest and part files of a previous cache (nothing else in cache_dir)"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Manifest first, so an interrupted clear never leaves a manifest pointing at missing parts
+        (self.cache_dir / 'manifest.json').unlink(missing_ok=True)
+        for part in self.cache_dir.glob('part-*.parquet'):
+            part.unlink()
+    
+    def _write_manifest(self, sample_size, n_parts: int, categories: dict):
+        """Written last, so an interrupted build is never reused"""
+        manifest = {**self._cache_key(sample_size), 'parts': n_parts, 'categories': categories}
+        with open(self.cache_dir / 'manifest.json', 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        logger.info(f"💾 Cached {n_parts} parts to {self.cache_dir}")
+    
+    def _read_cache(self, sample_size=None):
+        """Prepared dataset from the Parquet cache, or None if missing / stale"""
+        manifest_path = self.cache_dir / 'manifest.json'
+        if not manifest_path.exists():
+            return None
+        
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            
+            key = self._cache_key(sample_size)
+            if any(manifest.get(name) != value for name, value in key.items()):
+                logger.info("ℹ️ Parquet cache is stale, rebuilding from CSV")
+                return None
+            
+            categories = manifest['categories']
+            chunks = [
+                pd.read_parquet(self.cache_dir / f'part-{i:05d}.parquet')
+                for i in range(manifest['parts'])
+            ]
+            df = self._concat(chunks, categories)
+            logger.info(f"✅ Loaded {len(df):,} prepared rows from Parquet cache {self.cache_dir}")
+            return df
+        
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to read Parquet cache: {e}, rebuilding from CSV")
+            return None
+    
+    # ------------------------------------------------------------------
+    # Features
+    # ------------------------------------------------------------------
+    
+    def _create_model_a_features(self, df: pd.DataFrame, streams=None) -> pd.DataFrame:
         """
-        Create Model A features from FARMME_GPU_DATASET
+        Create Model A features from FARMME_GPU_DATASET (one chunk)
         
         Model A predicts ROI based on:
         - Crop characteristics
         - Market conditions
         - Weather
         - Economic factors
+        
+        Args:
+            df: Raw rows
+            streams: Generators from _random_streams, shared by all chunks
         """
-        logger.info("🔧 Creating Model A features...")
+        streams = streams or self._random_streams()
         
         # Select relevant features (pre-planting only, no future information)
-        features = df[[
-            'date',
-            'province',
-            'crop_type',
-            'crop_id',
-            'base_price',  # Historical base price
-            'inventory_level',
-            'storage_level',
-            'planting_activity',
-            'supply_level',
-            'demand_elasticity',
-            'income_elasticity',
-            'temperature_celsius',
-            'rainfall_mm',
-            'humidity_percent',
-            'drought_index',
-            'fuel_price',
-            'fertilizer_price',
-            'inflation_rate',
-            'gdp_growth',
-            'unemployment_rate',
-            'vegetable_demand_index',
-            'herb_demand_index',
-            'baht_usd_rate',
-            'avg_income',
-            'income_inequality',
-            'rural_share',
-        ]].copy()
+        features = df[SOURCE_COLUMNS].copy()
         
         # Create synthetic planting features (simulate cultivation data)
-        np.random.seed(42)
-        features['planting_area_rai'] = np.random.uniform(5, 50, len(features))
-        features['expected_yield_kg'] = features['planting_area_rai'] * np.random.uniform(800, 1500, len(features))
+        features['planting_area_rai'] = streams['planting_area'].uniform(5, 50, len(features))
+        features['expected_yield_kg'] = features['planting_area_rai'] * streams['yield_per_rai'].uniform(800, 1500, len(features))
         
         # Add crop characteristics (from crop_id)
         features['growth_days'] = 60 + (features['crop_id'] % 10) * 10  # 60-150 days
         features['water_requirement'] = 0.3 + (features['crop_id'] % 5) * 0.15  # 0.3-0.9
-        features['investment_cost'] = features['planting_area_rai'] * np.random.uniform(5000, 15000, len(features))
+        features['investment_cost'] = features['planting_area_rai'] * streams['cost_per_rai'].uniform(5000, 15000, len(features))
         features['risk_level'] = 0.2 + (features['crop_id'] % 4) * 0.2  # 0.2-0.8
         
         # Create target: Expected ROI
@@ -134,23 +310,13 @@ class LargeDataLoader:
             [np.inf, -np.inf], np.nan
         )
         
-        # Remove extreme outliers (keep ROI between -100% and 500%)
+        # Remove extreme outliers (keep ROI between -100% and 500%); this
+        # also drops NaN targets, so no fill step is needed
         features = features[
             (features['expected_roi_percent'] >= -100) & 
             (features['expected_roi_percent'] <= 500)
         ].copy()
         
-        # Fill remaining NaN with median
-        features['expected_roi_percent'] = features['expected_roi_percent'].fillna(
-            features['expected_roi_percent'].median()
-        )
-        
-        logger.info(f"   Target variable (expected_roi_percent):")
-        logger.info(f"   Mean: {features['expected_roi_percent'].mean():.2f}%")
-        logger.info(f"   Std: {features['expected_roi_percent'].std():.2f}%")
-        logger.info(f"   Min: {features['expected_roi_percent'].min():.2f}%")
-        logger.info(f"   Max: {features['expected_roi_percent'].max():.2f}%")
-        
         return features
     
     def _validate_no_leakage(self, df: pd.DataFrame):
@@ -202,10 +368,13 @@ if __name__ == "__main__":
     # Test large data loader
     loader = LargeDataLoader()
     
-    # Test with sample
+    # Test with sample (second call reads the Parquet cache)
     df = loader.load_and_prepare(sample_size=10000)
+    df_cached = loader.load_and_prepare(sample_size=10000)
+    assert df.equals(df_cached)
     
     print(f"\n✅ Large Data Loader Test Passed")
     print(f"Shape: {df.shape}")
+    print(f"Memory: {df.memory_usage(deep=True).sum() / 1e6:.1f} MB")
     print(f"Columns: {df.columns.tolist()[:10]}...")
     print(f"Target stats: mean={df['expected_roi_percent'].mean():.2f}%, std={df['expected_roi_percent'].std():.2f}%")
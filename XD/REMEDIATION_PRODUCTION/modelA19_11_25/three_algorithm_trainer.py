@@ -1,6 +1,10 @@
 """
 Three Algorithm Trainer for Model A
 Trains 3 different algorithms: XGBoost, Random Forest + ElasticNet, Gradient Boosting
+
+With parallel=True the three candidates are fitted concurrently in worker
+processes; X/y are placed in shared memory once and each worker gets a
+thread budget so XGBoost and the RF don't oversubscribe the CPU.
 """
 
 import pandas as pd
@@ -10,9 +14,19 @@ from sklearn.linear_model import ElasticNet
 from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
 import xgboost as xgb
 import logging
+import os
+import sys
 import time
 from dataclasses import dataclass
-from typing import Dict, Any
+from pathlib import Path
+from typing import Dict, Any, Optional
+from joblib import Parallel, delayed
+from threadpoolctl import threadpool_limits
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from shared_arrays import SharedArrays, attach_arrays, release_arrays
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -28,13 +42,30 @@ class TrainingResult:
     training_time: float
     predictions: list
 
+# (result key, training method)
+ALGORITHMS = [
+    ('xgboost', '_train_xgboost'),
+    ('rf_ensemble', '_train_rf_ensemble'),
+    ('gradboost', '_train_gradboost')
+]
+
 class ThreeAlgorithmTrainer:
     """Train Model A with 3 different algorithms"""
     
-    def __init__(self):
-        """Initialize trainer"""
+    def __init__(self, parallel: bool = False, n_cores: Optional[int] = None):
+        """
+        Initialize trainer
+        
+        Args:
+            parallel: Fit the 3 algorithms concurrently in worker processes
+            n_cores: CPU budget for parallel mode (None = all cores)
+        """
         self.training_times = {}
         self.models = {}
+        self.parallel = parallel
+        self.n_cores = n_cores
+        self.n_jobs = None  # Threads per estimator (None = estimator default); set per worker in parallel mode
+        self.overall_time = None
         
     def train_all(self, X_train, y_train, X_val, y_val, X_test, y_test) -> Dict[str, TrainingResult]:
         """
@@ -49,28 +80,73 @@ class ThreeAlgorithmTrainer:
             Dict[str, TrainingResult]: Results for each algorithm
         """
         results = {}
+        start_time = time.time()
         
         logger.info("\n🤖 Training 3 algorithms...")
         logger.info("="*70)
         
-        # Algorithm 1: XGBoost
-        logger.info("\n[1/3] Training XGBoost...")
-        results['xgboost'] = self._train_xgboost(X_train, y_train, X_val, y_val, X_test, y_test)
-        
-        # Algorithm 2: Random Forest + ElasticNet
-        logger.info("\n[2/3] Training Random Forest + ElasticNet...")
-        results['rf_ensemble'] = self._train_rf_ensemble(X_train, y_train, X_val, y_val, X_test, y_test)
+        if self.parallel:
+            results = self._train_parallel(X_train, y_train, X_val, y_val, X_test, y_test)
+        else:
+            # Algorithm 1: XGBoost
+            logger.info("\n[1/3] Training XGBoost...")
+            results['xgboost'] = self._train_xgboost(X_train, y_train, X_val, y_val, X_test, y_test)
+            
+            # Algorithm 2: Random Forest + ElasticNet
+            logger.info("\n[2/3] Training Random Forest + ElasticNet...")
+            results['rf_ensemble'] = self._train_rf_ensemble(X_train, y_train, X_val, y_val, X_test, y_test)
+            
+            # Algorithm 3: Gradient Boosting
+            logger.info("\n[3/3] Training Gradient Boosting...")
+            results['gradboost'] = self._train_gradboost(X_train, y_train, X_val, y_val, X_test, y_test)
         
-        # Algorithm 3: Gradient Boosting
-        logger.info("\n[3/3] Training Gradient Boosting...")
-        results['gradboost'] = self._train_gradboost(X_train, y_train, X_val, y_val, X_test, y_test)
+        self.overall_time = time.time() - start_time
+        sequential_time = sum(self.training_times.values())
         
         logger.info("\n" + "="*70)
         logger.info("✅ All 3 algorithms trained successfully")
+        logger.info(f"⏱️  Overall: {self.overall_time:.2f}s (algorithms back to back: {sequential_time:.2f}s, "
+                    f"{sequential_time / self.overall_time:.2f}x)")
         logger.info("="*70)
         
         return results
     
+    def _train_parallel(self, X_train, y_train, X_val, y_val, X_test, y_test) -> Dict[str, TrainingResult]:
+        """Fit the 3 algorithms concurrently, one worker process each"""
+        threads = self._split_cores()
+        logger.info(f"\n⚡ Parallel mode, threads per algorithm: {threads}")
+        
+        with SharedArrays() as shared:
+            handles = [shared.share(data) for data in (X_train, y_train, X_val, y_val, X_test, y_test)]
+            logger.info(f"   Shared memory: {shared.nbytes / 1e6:.1f} MB")
+            
+            outputs = Parallel(n_jobs=len(ALGORITHMS), backend='loky', max_nbytes=None)(
+                delayed(_train_in_worker)(type(self), method, handles, threads[key])
+                for key, method in ALGORITHMS
+            )
+        
+        results = {}
+        for (key, _), result in zip(ALGORITHMS, outputs):
+            results[key] = result
+            self.training_times[key] = result.training_time
+            self.models[key] = result.model
+            
+            logger.info(f"\n   {result.algorithm_name}: {result.training_time:.2f}s")
+            logger.info(f"   Train R²: {result.train_metrics['r2']:.4f}, RMSE: {result.train_metrics['rmse']:.2f}%")
+            logger.info(f"   Val   R²: {result.val_metrics['r2']:.4f}, RMSE: {result.val_metrics['rmse']:.2f}%")
+            logger.info(f"   Test  R²: {result.test_metrics['r2']:.4f}, RMSE: {result.test_metrics['rmse']:.2f}%")
+        
+        return results
+    
+    def _split_cores(self) -> Dict[str, int]:
+        """
+        Threads per algorithm: GradBoost is single-threaded, XGBoost and the
+        RF share the rest of the budget
+        """
+        budget = self.n_cores or os.cpu_count() or 1
+        rest = max(budget - 1, 2)
+        return {'xgboost': (rest + 1) // 2, 'rf_ensemble': rest // 2, 'gradboost': 1}
+    
     def _train_xgboost(self, X_train, y_train, X_val, y_val, X_test, y_test) -> TrainingResult:
         """Train XGBoost with regularization"""
         start_time = time.time()
@@ -86,6 +162,7 @@ class ThreeAlgorithmTrainer:
             min_child_weight=3,
             gamma=0.1,
             random_state=42,
+            n_jobs=self.n_jobs,
             verbosity=0
         )
         
@@ -129,7 +206,8 @@ class ThreeAlgorithmTrainer:
             min_samples_split=10,
             min_samples_leaf=5,
             max_features='sqrt',
-            random_state=42
+            random_state=42,
+            n_jobs=self.n_jobs
         )
         rf.fit(X_train, y_train)
         
@@ -243,8 +321,28 @@ class ThreeAlgorithmTrainer:
         return rf_pred + residual_pred
     
     def get_training_times(self) -> Dict[str, float]:
-        """Get training time for each algorithm"""
-        return self.training_times
+        """Get training time for each algorithm, plus 'overall' wall time of train_all"""
+        return {**self.training_times, 'overall': self.overall_time}
+
+
+def _train_in_worker(trainer_cls, method: str, handles, threads: int) -> TrainingResult:
+    """Run one _train_* method in a worker process on the shared X/y"""
+    arrays, blocks = attach_arrays(handles)
+    try:
+        trainer = trainer_cls()
+        trainer.n_jobs = threads
+        with threadpool_limits(limits=threads):
+            result = getattr(trainer, method)(*arrays)
+    finally:
+        del arrays
+        release_arrays(blocks)
+    
+    # Saved models keep the sequential-mode n_jobs
+    estimators = result.model.values() if isinstance(result.model, dict) else [result.model]
+    for estimator in estimators:
+        if 'n_jobs' in estimator.get_params():
+            estimator.set_params(n_jobs=None)
+    return result
 
 if __name__ == "__main__":
     # Test with dummy data
@@ -260,10 +358,17 @@ if __name__ == "__main__":
     X_val, y_val = X[train_size:train_size+val_size], y[train_size:train_size+val_size]
     X_test, y_test = X[train_size+val_size:], y[train_size+val_size:]
     
-    # Train
+    # Train (sequential, then parallel)
     trainer = ThreeAlgorithmTrainer()
     results = trainer.train_all(X_train, y_train, X_val, y_val, X_test, y_test)
     
+    parallel_trainer = ThreeAlgorithmTrainer(parallel=True)
+    parallel_results = parallel_trainer.train_all(X_train, y_train, X_val, y_val, X_test, y_test)
+    
+    for key in results:
+        assert np.isclose(results[key].test_metrics['r2'], parallel_results[key].test_metrics['r2'])
+    
     print("\n✅ Three Algorithm Trainer Test Passed")
     print(f"Trained {len(results)} algorithms")
     print(f"Training times: {trainer.get_training_times()}")
+    print(f"Parallel training times: {parallel_trainer.get_training_times()}")
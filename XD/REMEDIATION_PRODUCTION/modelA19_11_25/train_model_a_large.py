@@ -195,7 +195,7 @@ class ModelALargeTrainer:
         """Train all 3 algorithms"""
         logger.info("\n🤖 Training 3 algorithms on LARGE dataset...")
         
-        trainer = ThreeAlgorithmTrainer()
+        trainer = ThreeAlgorithmTrainer(parallel=Config.TRAIN_PARALLEL, n_cores=Config.TRAIN_N_CORES)
         self.results = trainer.train_all(X_train, y_train, X_val, y_val, X_test, y_test)
         
         # Log summary
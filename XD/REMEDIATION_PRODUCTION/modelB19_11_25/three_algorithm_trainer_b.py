@@ -2,6 +2,10 @@
 Three Algorithm Trainer for Model B
 Trains 3 different algorithms: XGBoost, Random Forest, Gradient Boosting
 For binary classification (Good/Bad planting window)
+
+With parallel=True the three candidates are fitted concurrently in worker
+processes; X/y are placed in shared memory once and each worker gets a
+thread budget so XGBoost and the RF don't oversubscribe the CPU.
 """
 
 import pandas as pd
@@ -11,9 +15,19 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import f1_score, precision_score, recall_score, roc_auc_score
 import xgboost as xgb
 import logging
+import os
+import sys
 import time
 from dataclasses import dataclass
-from typing import Dict, Any
+from pathlib import Path
+from typing import Dict, Any, Optional
+from joblib import Parallel, delayed
+from threadpoolctl import threadpool_limits
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from shared_arrays import SharedArrays, attach_arrays, release_arrays
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -31,13 +45,30 @@ class TrainingResultB:
     predictions: list
     y_proba: Any
 
+# (result key, training method)
+ALGORITHMS = [
+    ('xgboost', '_train_xgboost'),
+    ('random_forest', '_train_random_forest'),
+    ('gradboost', '_train_gradboost')
+]
+
 class ThreeAlgorithmTrainerB:
     """Train Model B with 3 different algorithms"""
     
-    def __init__(self):
-        """Initialize trainer"""
+    def __init__(self, parallel: bool = False, n_cores: Optional[int] = None):
+        """
+        Initialize trainer
+        
+        Args:
+            parallel: Fit the 3 algorithms concurrently in worker processes
+            n_cores: CPU budget for parallel mode (None = all cores)
+        """
         self.training_times = {}
         self.models = {}
+        self.parallel = parallel
+        self.n_cores = n_cores
+        self.n_jobs = -1  # Threads per estimator; set per worker in parallel mode
+        self.overall_time = None
         
     def train_all(self, X_train, y_train, X_val, y_val, X_test, y_test) -> Dict[str, TrainingResultB]:
         """
@@ -52,28 +83,74 @@ class ThreeAlgorithmTrainerB:
             Dict[str, TrainingResultB]: Results for each algorithm
         """
         results = {}
+        start_time = time.time()
         
         logger.info("\n🤖 Training 3 algorithms...")
         logger.info("="*70)
         
-        # Algorithm 1: XGBoost
-        logger.info("\n[1/3] Training XGBoost Classifier...")
-        results['xgboost'] = self._train_xgboost(X_train, y_train, X_val, y_val, X_test, y_test)
-        
-        # Algorithm 2: Random Forest
-        logger.info("\n[2/3] Training Random Forest Classifier...")
-        results['random_forest'] = self._train_random_forest(X_train, y_train, X_val, y_val, X_test, y_test)
+        if self.parallel:
+            results = self._train_parallel(X_train, y_train, X_val, y_val, X_test, y_test)
+        else:
+            # Algorithm 1: XGBoost
+            logger.info("\n[1/3] Training XGBoost Classifier...")
+            results['xgboost'] = self._train_xgboost(X_train, y_train, X_val, y_val, X_test, y_test)
+            
+            # Algorithm 2: Random Forest
+            logger.info("\n[2/3] Training Random Forest Classifier...")
+            results['random_forest'] = self._train_random_forest(X_train, y_train, X_val, y_val, X_test, y_test)
+            
+            # Algorithm 3: Gradient Boosting
+            logger.info("\n[3/3] Training Gradient Boosting Classifier...")
+            results['gradboost'] = self._train_gradboost(X_train, y_train, X_val, y_val, X_test, y_test)
         
-        # Algorithm 3: Gradient Boosting
-        logger.info("\n[3/3] Training Gradient Boosting Classifier...")
-        results['gradboost'] = self._train_gradboost(X_train, y_train, X_val, y_val, X_test, y_test)
+        self.overall_time = time.time() - start_time
+        sequential_time = sum(self.training_times.values())
         
         logger.info("\n" + "="*70)
         logger.info("✅ All 3 algorithms trained successfully")
+        logger.info(f"⏱️  Overall: {self.overall_time:.2f}s (algorithms back to back: {sequential_time:.2f}s, "
+                    f"{sequential_time / self.overall_time:.2f}x)")
         logger.info("="*70)
         
         return results
     
+    def _train_parallel(self, X_train, y_train, X_val, y_val, X_test, y_test) -> Dict[str, TrainingResultB]:
+        """Fit the 3 algorithms concurrently, one worker process each"""
+        threads = self._split_cores()
+        logger.info(f"\n⚡ Parallel mode, threads per algorithm: {threads}")
+        
+        with SharedArrays() as shared:
+            handles = [shared.share(data) for data in (X_train, y_train, X_val, y_val, X_test, y_test)]
+            logger.info(f"   Shared memory: {shared.nbytes / 1e6:.1f} MB")
+            
+            outputs = Parallel(n_jobs=len(ALGORITHMS), backend='loky', max_nbytes=None)(
+                delayed(_train_in_worker)(type(self), method, handles, threads[key])
+                for key, method in ALGORITHMS
+            )
+        
+        results = {}
+        for (key, _), result in zip(ALGORITHMS, outputs):
+            results[key] = result
+            self.training_times[key] = result.training_time
+            self.models[key] = {'model': result.model, 'scaler': result.scaler}
+            
+            logger.info(f"\n   {result.algorithm_name}: {result.training_time:.2f}s")
+            logger.info(f"   Train F1: {result.train_metrics['f1']:.4f}, Precision: {result.train_metrics['precision']:.4f}, Recall: {result.train_metrics['recall']:.4f}")
+            logger.info(f"   Val   F1: {result.val_metrics['f1']:.4f}, Precision: {result.val_metrics['precision']:.4f}, Recall: {result.val_metrics['recall']:.4f}")
+            logger.info(f"   Test  F1: {result.test_metrics['f1']:.4f}, Precision: {result.test_metrics['precision']:.4f}, Recall: {result.test_metrics['recall']:.4f}")
+            logger.info(f"   Test ROC-AUC: {result.test_metrics['roc_auc']:.4f}")
+        
+        return results
+    
+    def _split_cores(self) -> Dict[str, int]:
+        """
+        Threads per algorithm: GradBoost is single-threaded, XGBoost and the
+        RF share the rest of the budget
+        """
+        budget = self.n_cores or os.cpu_count() or 1
+        rest = max(budget - 1, 2)
+        return {'xgboost': (rest + 1) // 2, 'random_forest': rest // 2, 'gradboost': 1}
+    
     def _train_xgboost(self, X_train, y_train, X_val, y_val, X_test, y_test) -> TrainingResultB:
         """Train XGBoost Classifier"""
         start_time = time.time()
@@ -92,6 +169,7 @@ class ThreeAlgorithmTrainerB:
             max_depth=5,
             learning_rate=0.1,
             scale_pos_weight=scale_pos_weight,
+            n_jobs=self.n_jobs,
             random_state=42,
             verbosity=0
         )
@@ -155,7 +233,7 @@ class ThreeAlgorithmTrainerB:
             max_features='sqrt',
             class_weight=class_weight,
             random_state=42,
-            n_jobs=-1
+            n_jobs=self.n_jobs
         )
         
         model.fit(X_train_scaled, y_train)
@@ -257,8 +335,26 @@ class ThreeAlgorithmTrainerB:
         }
     
     def get_training_times(self) -> Dict[str, float]:
-        """Get training time for each algorithm"""
-        return self.training_times
+        """Get training time for each algorithm, plus 'overall' wall time of train_all"""
+        return {**self.training_times, 'overall': self.overall_time}
+
+
+def _train_in_worker(trainer_cls, method: str, handles, threads: int) -> TrainingResultB:
+    """Run one _train_* method in a worker process on the shared X/y"""
+    arrays, blocks = attach_arrays(handles)
+    try:
+        trainer = trainer_cls()
+        trainer.n_jobs = threads
+        with threadpool_limits(limits=threads):
+            result = getattr(trainer, method)(*arrays)
+    finally:
+        del arrays
+        release_arrays(blocks)
+    
+    # Saved models use every core at inference, as in sequential mode
+    if 'n_jobs' in result.model.get_params():
+        result.model.set_params(n_jobs=-1)
+    return result
 
 if __name__ == "__main__":
     # Test with dummy data
@@ -275,10 +371,17 @@ if __name__ == "__main__":
     X_val, y_val = X[train_size:train_size+val_size], y[train_size:train_size+val_size]
     X_test, y_test = X[train_size+val_size:], y[train_size+val_size:]
     
-    # Train
+    # Train (sequential, then parallel)
     trainer = ThreeAlgorithmTrainerB()
     results = trainer.train_all(X_train, y_train, X_val, y_val, X_test, y_test)
     
+    parallel_trainer = ThreeAlgorithmTrainerB(parallel=True)
+    parallel_results = parallel_trainer.train_all(X_train, y_train, X_val, y_val, X_test, y_test)
+    
+    for key in results:
+        assert np.isclose(results[key].test_metrics['f1'], parallel_results[key].test_metrics['f1'])
+    
     print("\n✅ Three Algorithm Trainer B Test Passed")
     print(f"Trained {len(results)} algorithms")
     print(f"Training times: {trainer.get_training_times()}")
+    print(f"Parallel training times: {parallel_trainer.get_training_times()}")
@@ -0,0 +1,134 @@
+"""
+Shared-memory arrays for parallel training
+Copies X/y once into multiprocessing shared memory so worker processes can
+map them instead of receiving pickled copies
+"""
+
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+
+class SharedArrays:
+    """
+    Owner side: one shared-memory block per array, unlinked on close
+    
+    Use as a context manager around the parallel section:
+        
+        with SharedArrays() as shared:
+            handles = [shared.share(X_train), shared.share(y_train)]
+            ... workers call attach_arrays(handles) ...
+    """
+    
+    def __init__(self):
+        self._blocks: List[SharedMemory] = []
+    
+    def share(self, data) -> Dict[str, Any]:
+        """
+        Copy a DataFrame / Series / ndarray into shared memory
+        
+        Returns:
+            Picklable handle for attach_arrays (object-dtype data is carried
+            in the handle itself)
+        """
+        if isinstance(data, pd.DataFrame):
+            kind, values = 'frame', data.to_numpy()
+            meta = {'columns': list(data.columns)}
+        elif isinstance(data, pd.Series):
+            kind, values = 'series', data.to_numpy()
+            meta = {'series_name': data.name}
+        else:
+            kind, values = 'array', np.asarray(data)
+            meta = {}
+        
+        if values.dtype == object:
+            return {'kind': 'pickled', 'data': data}
+        
+        values = np.ascontiguousarray(values)
+        block = SharedMemory(create=True, size=max(values.nbytes, 1))
+        np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[...] = values
+        self._blocks.append(block)
+        
+        return {
+            'kind': kind,
+            'name': block.name,
+            'shape': values.shape,
+            'dtype': values.dtype.str,
+            **meta
+        }
+    
+    @property
+    def nbytes(self) -> int:
+        return sum(block.size for block in self._blocks)
+    
+    def close(self):
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _attach(name: str) -> SharedMemory:
+    """Map an existing block without registering it with the resource tracker"""
+    try:
+        return SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        # The tracker would unlink the owner's block when the worker exits,
+        # or see it unregistered twice
+        register = resource_tracker.register
+        resource_tracker.register = lambda *args, **kwargs: None
+        try:
+            return SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+def attach_arrays(handles: List[Dict[str, Any]]):
+    """
+    Worker side: rebuild the shared data as zero-copy views
+    
+    DataFrames keep their column names (so fitted models keep
+    feature_names_in_) but get a fresh RangeIndex.
+    
+    Returns:
+        (list of DataFrame / Series / ndarray, list of blocks to pass to
+        release_arrays once the views are no longer used)
+    """
+    arrays, blocks = [], []
+    for handle in handles:
+        if handle['kind'] == 'pickled':
+            arrays.append(handle['data'])
+            continue
+        
+        block = _attach(handle['name'])
+        blocks.append(block)
+        values = np.ndarray(handle['shape'], dtype=np.dtype(handle['dtype']), buffer=block.buf)
+        values.flags.writeable = False
+        
+        if handle['kind'] == 'frame':
+            arrays.append(pd.DataFrame(values, columns=handle['columns'], copy=False))
+        elif handle['kind'] == 'series':
+            arrays.append(pd.Series(values, name=handle['series_name'], copy=False))
+        else:
+            arrays.append(values)
+    
+    return arrays, blocks
+
+
+def release_arrays(blocks: List[SharedMemory]):
+    """Unmap blocks in a worker (the owner unlinks them)"""
+    for block in blocks:
+        try:
+            block.close()
+        except BufferError:
+            # A view is still referenced; the mapping goes when it is collected
+            pass
@@ -36,7 +36,8 @@ import logging_config
 from config import (
     APP_TITLE, APP_DESCRIPTION, APP_VERSION, 
     ALLOWED_ORIGINS, ENVIRONMENT, DEBUG, LOG_LEVEL,
-    RATE_LIMIT_ENABLED, HEALTH_CHECK_ENABLED
+    RATE_LIMIT_ENABLED, HEALTH_CHECK_ENABLED, PRICE_STORE_ENABLED, FORECAST_CACHE_ENABLED,
+    SERVICE_WARMUP_ENABLED
 )
 
 # Import database setup
@@ -52,6 +53,15 @@ try:
 except ImportError:
     MONITORING_AVAILABLE = False
 
+# In-memory price time-series store
+from price_series_store import price_series_store
+
+# Nightly precomputed Model C forecasts
+from forecast_cache import forecast_cache
+
+# Lazily loaded model services
+from service_registry import service_registry
+
 logger = logging.getLogger(__name__)
 
 # Application lifespan management
@@ -82,6 +92,17 @@ async def lifespan(app: FastAPI):
         metrics_collector.start()
         logger.info("✅ Metrics collection started")
     
+    # Load models in the background; requests load what they need on first use
+    if SERVICE_WARMUP_ENABLED:
+        service_registry.start_warmup()
+    
+    # Load price history into memory and keep it fresh (already loaded when preloaded by the master)
+    if PRICE_STORE_ENABLED and (price_series_store.is_loaded() or price_series_store.load()):
+        price_series_store.start()
+    
+    if FORECAST_CACHE_ENABLED:
+        forecast_cache.start()
+    
     logger.info("✅ Farmme API startup complete")
     yield
     
@@ -93,6 +114,12 @@ async def lifespan(app: FastAPI):
         metrics_collector.stop()
         logger.info("✅ Metrics collection stopped")
     
+    if FORECAST_CACHE_ENABLED:
+        forecast_cache.stop()
+    
+    if PRICE_STORE_ENABLED:
+        price_series_store.stop()
+    
     try:
         engine.dispose()
         logger.info("✅ Database connections closed")
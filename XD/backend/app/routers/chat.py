@@ -11,7 +11,6 @@ import json
 import logging
 import re
 from sqlalchemy.orm import Session
-import google.generativeai as genai
 import numpy as np
 
 import sys
@@ -27,15 +26,25 @@ from utils.helpers import get_crop_name_from_id
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/chat", tags=["chat"])
 
-# Import Gemini functions
-from gemini_functions import GEMINI_FUNCTIONS, function_handler
+# Gemini function handler loads with its model services on first use (or warmup)
+from service_registry import service_registry
+function_handler = service_registry.proxy("gemini_function_handler")
 
 # Import services
 from app.services.prompt_builder_service import prompt_builder_service
 from app.services.response_formatter_service import response_formatter
 
-# Configure Gemini
-genai.configure(api_key=GEMINI_API_KEY)
+# Gemini SDK is imported and configured on the first chat request (or warmup)
+_genai = None
+
+def get_genai():
+    """Configured google.generativeai module"""
+    global _genai
+    if _genai is None:
+        import google.generativeai as genai
+        genai.configure(api_key=GEMINI_API_KEY)
+        _genai = genai
+    return _genai
 
 # Data Schemas
 class ChatRequest(BaseModel):
@@ -148,8 +157,10 @@ def chat_with_gemini(data: ChatRequest, db: Session = Depends(get_db)):
         
         # 5. Initialize Gemini WITH function calling
         try:
+            from gemini_functions import GEMINI_FUNCTIONS
+            
             # Use gemini-pro for v1beta API (supports function calling)
-            gemini_model = genai.GenerativeModel(
+            gemini_model = get_genai().GenerativeModel(
                 "gemini-2.5-flash",
                 system_instruction=AGRI_PERSONA,
                 tools=GEMINI_FUNCTIONS
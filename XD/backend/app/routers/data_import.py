@@ -4,7 +4,7 @@ Data Import API Router
 Endpoints for adding new data to the system
 """
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
 from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime, date
@@ -16,6 +16,8 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from database import get_db, CropPrice, WeatherData
+from price_series_store import price_series_store
+from forecast_cache import forecast_cache
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/data", tags=["data-import"])
@@ -50,7 +52,7 @@ class BulkWeatherData(BaseModel):
 
 
 @router.post("/price")
-async def add_price_data(data: NewPriceData, db: Session = Depends(get_db)):
+async def add_price_data(data: NewPriceData, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """
     Add new crop price data to the database
     
@@ -75,6 +77,8 @@ async def add_price_data(data: NewPriceData, db: Session = Depends(get_db)):
             existing.source = data.source
             existing.updated_at = datetime.utcnow()
             db.commit()
+            price_series_store.refresh(db)
+            background_tasks.add_task(forecast_cache.recompute, [(data.crop_type, data.province)])
             
             logger.info(f"✅ Updated existing price record (ID: {existing.id})")
             return {
@@ -104,6 +108,8 @@ async def add_price_data(data: NewPriceData, db: Session = Depends(get_db)):
             db.add(new_price)
             db.commit()
             db.refresh(new_price)
+            price_series_store.refresh(db)
+            background_tasks.add_task(forecast_cache.recompute, [(data.crop_type, data.province)])
             
             logger.info(f"✅ Created new price record (ID: {new_price.id})")
             return {
@@ -208,7 +214,7 @@ async def add_weather_data(data: NewWeatherData, db: Session = Depends(get_db)):
 
 
 @router.post("/price/bulk")
-async def add_bulk_price_data(data: BulkPriceData, db: Session = Depends(get_db)):
+async def add_bulk_price_data(data: BulkPriceData, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """
     Add multiple crop price records at once
     """
@@ -218,6 +224,7 @@ async def add_bulk_price_data(data: BulkPriceData, db: Session = Depends(get_db)
         created = 0
         updated = 0
         errors = []
+        touched_pairs = set()
         
         for price_data in data.prices:
             try:
@@ -245,11 +252,18 @@ async def add_bulk_price_data(data: BulkPriceData, db: Session = Depends(get_db)
                     )
                     db.add(new_price)
                     created += 1
+                
+                touched_pairs.add((price_data.crop_type, price_data.province))
                     
             except Exception as e:
                 errors.append(f"{price_data.crop_type} - {price_data.province}: {str(e)}")
         
         db.commit()
+        price_series_store.refresh(db)
+        
+        # Recompute precomputed forecasts only for the pairs that changed
+        if touched_pairs:
+            background_tasks.add_task(forecast_cache.recompute, sorted(touched_pairs))
         
         logger.info(f"✅ Bulk import complete: {created} created, {updated} updated, {len(errors)} errors")
         
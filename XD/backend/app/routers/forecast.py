@@ -22,6 +22,7 @@ if backend_dir not in sys.path:
     sys.path.append(backend_dir)
 
 from database import get_db, CropPrice, ProvinceData, CropCharacteristics, WeatherData
+from price_series_store import price_series_store, to_date_strings
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v2/forecast", tags=["forecast"])
@@ -201,7 +202,17 @@ def get_price_history(
         
         # If crop_type is provided, also query price data
         price_records = []
-        if crop_type:
+        if crop_type and price_series_store.is_loaded():
+            dates, values = price_series_store.get_window(
+                crop_type, province,
+                start=start_date if use_date_filter else None,
+                end=end_date + timedelta(microseconds=1) if use_date_filter else None
+            )
+            price_records = [
+                {"date": d, "price": p}
+                for d, p in zip(to_date_strings(dates[::-1]), values[::-1].tolist())
+            ]
+        elif crop_type:
             price_query = db.query(CropPrice).filter(
                 CropPrice.province == province,
                 CropPrice.crop_type == crop_type
@@ -359,13 +370,17 @@ def forecast_price(
         logger.info(f"📊 Forecasting price for {request.crop_type} in {request.province}")
         logger.info(f"   Days ahead: {request.days_ahead}")
         
-        # Get current price from database
-        current_price_query = db.query(CropPrice).filter(
-            CropPrice.province == request.province,
-            CropPrice.crop_type == request.crop_type
-        ).order_by(CropPrice.date.desc()).first()
-        
-        current_price = float(current_price_query.price_per_kg) if current_price_query else None
+        # Get current price from the price store (or database)
+        if price_series_store.is_loaded():
+            _, latest = price_series_store.get_last(request.crop_type, request.province, 1)
+            current_price = float(latest[0]) if len(latest) else None
+        else:
+            current_price_query = db.query(CropPrice).filter(
+                CropPrice.province == request.province,
+                CropPrice.crop_type == request.crop_type
+            ).order_by(CropPrice.date.desc()).first()
+            
+            current_price = float(current_price_query.price_per_kg) if current_price_query else None
         
         # Get forecast
         result = price_forecast_service.forecast_price(
@@ -10,9 +10,11 @@ import os
 import time
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
+from sqlalchemy import text
 from cache import cache
 from database import engine
-from config import ENVIRONMENT, APP_VERSION, HEALTH_CHECK_ENABLED
+from config import ENVIRONMENT, APP_VERSION, HEALTH_CHECK_ENABLED, READY_REQUIRES_WARMUP
+from service_registry import service_registry
 import logging
 
 logger = logging.getLogger(__name__)
@@ -54,7 +56,7 @@ def health_check():
     # Database health check
     try:
         with engine.connect() as conn:
-            conn.execute("SELECT 1")
+            conn.execute(text("SELECT 1"))
         health_status["checks"]["database"] = {"status": "healthy", "message": "Connected"}
     except Exception as e:
         health_status["status"] = "unhealthy"
@@ -81,11 +83,15 @@ def health_check():
         if MONITORING_AVAILABLE:
             record_cache_operation("health_check", False)
     
-    # Model services health check
+    # Model services health check (does not force models that are still warming up)
     try:
-        from unified_model_service import unified_model_service
-        model_info = unified_model_service.get_model_info()
-        health_status["checks"]["models"] = {"status": "healthy", "info": model_info}
+        warmup = service_registry.status()
+        health_status["checks"]["models"] = {
+            "status": "healthy" if warmup["complete"] and not warmup["failed"] else "degraded",
+            "warmup": warmup
+        }
+        if service_registry.is_loaded("unified_model_service"):
+            health_status["checks"]["models"]["info"] = service_registry.get("unified_model_service").get_model_info()
     except Exception as e:
         health_status["checks"]["models"] = {"status": "degraded", "error": str(e)}
         logger.warning(f"Model services health check failed: {e}")
@@ -99,15 +105,29 @@ def liveness_probe():
 
 @router.get("/health/ready")
 def readiness_probe():
-    """Kubernetes readiness probe endpoint"""
+    """
+    Kubernetes readiness probe endpoint
+    
+    Reports model warmup progress; with READY_REQUIRES_WARMUP the instance
+    stays unready (503) until every service has loaded or failed.
+    """
     try:
         # Quick database check
         with engine.connect() as conn:
-            conn.execute("SELECT 1")
-        return {"status": "ready", "timestamp": time.time()}
+            conn.execute(text("SELECT 1"))
     except Exception as e:
         logger.error(f"Readiness probe failed: {e}")
         raise HTTPException(status_code=503, detail="Service not ready")
+    
+    warmup = service_registry.status()
+    if READY_REQUIRES_WARMUP and not warmup["complete"]:
+        raise HTTPException(status_code=503, detail={"status": "warming_up", "warmup": warmup})
+    
+    return {
+        "status": "ready" if warmup["complete"] else "warming_up",
+        "timestamp": time.time(),
+        "warmup": warmup
+    }
 
 @router.get("/metrics")
 def metrics():
@@ -4,7 +4,7 @@ ML Model endpoints - API v2
 """
 
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List, Dict, Any
 from datetime import datetime, timedelta
 import logging
@@ -39,6 +39,27 @@ class PriceForecastRequest(BaseModel):
     crop_category: Optional[str] = None
     days_ahead: int = 30
 
+class PriceForecastPair(BaseModel):
+    province: str
+    crop_type: str
+
+class BatchPriceForecastRequest(BaseModel):
+    items: List[PriceForecastPair] = Field(..., min_length=1, max_length=100)
+    days_ahead: int = Field(30, ge=1, le=180, description="Forecast horizon in days (Model C supports up to 180)")
+
+class HarvestPlot(BaseModel):
+    model_config = ConfigDict(allow_inf_nan=False)
+    
+    current_price: float = Field(..., gt=0, description="Current market price (baht/kg)")
+    forecast_price: float = Field(..., gt=0, description="Forecasted price from Model C (baht/kg)")
+    forecast_std: float = Field(0.2, ge=0)
+    yield_kg: float = Field(15000, gt=0)
+    plant_health: float = Field(0.9, ge=0, le=1)
+    storage_cost_per_day: float = Field(10, ge=0)
+
+class BatchHarvestDecisionRequest(BaseModel):
+    plots: List[HarvestPlot] = Field(..., min_length=1, max_length=1000)
+
 class PriceForecastResponse(BaseModel):
     success: bool
     forecast: List[Dict[str, Any]]
@@ -385,6 +406,76 @@ async def predict_price_forecast(request: PriceForecastRequest):
             }
         }
 
+@router.post("/predict-price-forecast/batch")
+async def predict_price_forecast_batch(request: BatchPriceForecastRequest):
+    """
+    🚀 PRODUCTION: Model C Stratified forecasts for many crop/province pairs
+    
+    All pairs share bulk availability/history queries and one predict per
+    price stratum. Each pair gets its own result or error, in request order.
+    """
+    logger.info(f"🔮 Batch price prediction request: {len(request.items)} pairs, {request.days_ahead} days")
+    
+    from model_c_wrapper import model_c_wrapper
+    
+    try:
+        results = model_c_wrapper.predict_prices_batch(
+            [(item.crop_type, item.province) for item in request.items],
+            days_ahead=request.days_ahead
+        )
+        
+        succeeded = sum(1 for r in results if r.get('success'))
+        logger.info(f"✅ Batch forecast generated: {succeeded}/{len(results)} pairs succeeded")
+        
+        model_info = model_c_wrapper.get_model_info()
+        
+        return {
+            "success": True,
+            "days_ahead": request.days_ahead,
+            "total": len(results),
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+            "results": results,
+            "metadata": {
+                "model_name": model_info.get('model_name', 'Model C Stratified'),
+                "model_version": model_info.get('version', '7.0.0'),
+                "algorithm": model_info.get('algorithm', 'gradient_boosting_stratified'),
+                "model_used": "model_c_stratified"
+            }
+        }
+        
+    except Exception as e:
+        logger.error(f"❌ Batch price forecast failed: {e}")
+        import traceback
+        logger.error(traceback.format_exc())
+        
+        raise HTTPException(
+            status_code=500,
+            detail=f"Batch prediction failed: {str(e)}"
+        )
+
+@router.post("/harvest-decision/batch")
+async def harvest_decision_batch(request: BatchHarvestDecisionRequest):
+    """
+    Model D harvest timing decisions for many plots (e.g. a co-op) in one call
+    
+    Profits, Thompson samples and overrides are computed for all plots at
+    once. Results are per-plot lists in request order.
+    """
+    logger.info(f"🌾 Batch harvest decision request: {len(request.plots)} plots")
+    
+    from model_d_wrapper import model_d_wrapper
+    
+    fields = ("current_price", "forecast_price", "forecast_std", "yield_kg", "plant_health", "storage_cost_per_day")
+    result = model_d_wrapper.decide_batch(
+        **{name: [getattr(plot, name) for plot in request.plots] for name in fields}
+    )
+    
+    if not result.get("success"):
+        raise HTTPException(status_code=422, detail=result.get("message", "Invalid harvest decision batch"))
+    
+    return result
+
 @router.get("/monitoring")
 async def get_monitoring_metrics():
     """Get model monitoring metrics and health status"""
@@ -33,6 +33,7 @@ class PlantingCalendarRequest(BaseModel):
     province: str = Field(..., description="Province name (Thai)")
     crop_type: str = Field(default="พริก", description="Crop type")
     months_ahead: int = Field(default=12, ge=1, le=24, description="Months to analyze")
+    resolution: str = Field(default="month", pattern="^(month|day)$", description="month, or day for a daily calendar")
     soil_type: Optional[str] = Field(None, description="Soil type")
     soil_ph: Optional[float] = Field(None, ge=0, le=14, description="Soil pH")
     soil_nutrients: Optional[float] = Field(None, ge=0, le=100, description="Soil nutrients")
@@ -79,6 +80,7 @@ async def get_planting_calendar(request: PlantingCalendarRequest):
         - monthly_predictions: Prediction for each month
         - good_windows: List of good planting windows
         - best_windows: Best consecutive planting periods
+        - daily_predictions / good_day_windows: Every day (resolution=day)
         - summary: Human-readable summary
     """
     try:
@@ -93,17 +95,21 @@ async def get_planting_calendar(request: PlantingCalendarRequest):
         
         current_date = datetime.now()
         
+        # One predict_calendar call for every date (30-day steps or every day)
+        step_days = 1 if request.resolution == "day" else 30
+        horizon_days = 30 * request.months_ahead
+        calendar_dates = [current_date + timedelta(days=d) for d in range(0, horizon_days, step_days)]
+        calendar = model_b.predict_calendar(
+            crop_type=request.crop_type,
+            province=request.province,
+            planting_dates=calendar_dates
+        )
+        
         for month_offset in range(request.months_ahead):
             # Get first day of each month
             target_date = current_date + timedelta(days=30 * month_offset)
             date_str = target_date.strftime('%Y-%m-%d')
-            
-            # Predict for this date
-            result = model_b.predict_planting_window(
-                crop_type=request.crop_type,
-                province=request.province,
-                planting_date=date_str
-            )
+            result = calendar[30 * month_offset // step_days]
             
             monthly_predictions.append({
                 'month': target_date.strftime('%Y-%m'),
@@ -143,6 +149,35 @@ async def get_planting_calendar(request: PlantingCalendarRequest):
                 'duration_months': len(current_window)
             })
         
+        # Daily calendar: every day plus runs of at least a week of good days
+        daily = {}
+        if request.resolution == "day":
+            daily_predictions = [
+                {
+                    'date': result['features']['planting_date'],
+                    'is_good_window': result['is_good_window'],
+                    'confidence': result['confidence']
+                }
+                for result in calendar
+            ]
+            
+            good_day_windows = []
+            run = []
+            for pred in daily_predictions + [{'is_good_window': False}]:
+                if pred['is_good_window']:
+                    run.append(pred)
+                    continue
+                if len(run) >= 7:
+                    good_day_windows.append({
+                        'start': run[0]['date'],
+                        'end': run[-1]['date'],
+                        'duration_days': len(run),
+                        'avg_confidence': sum(p['confidence'] for p in run) / len(run)
+                    })
+                run = []
+            
+            daily = {'daily_predictions': daily_predictions, 'good_day_windows': good_day_windows}
+        
         # Generate summary
         good_count = len(good_windows)
         total_count = len(monthly_predictions)
@@ -161,7 +196,9 @@ async def get_planting_calendar(request: PlantingCalendarRequest):
             'best_windows': best_windows,
             'summary': summary,
             'crop_type': request.crop_type,
-            'province': request.province
+            'province': request.province,
+            'resolution': request.resolution,
+            **daily
         }
         
     except Exception as e:
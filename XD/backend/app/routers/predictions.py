@@ -19,11 +19,12 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 from database import get_db, CropPrediction
 from cache import cache
 from config import CACHE_TTL_PREDICTIONS
-from unified_model_service import unified_model_service
+from service_registry import service_registry
 from utils.helpers import get_crop_name_from_id
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/predict", tags=["predictions"])
+unified_model_service = service_registry.proxy("unified_model_service")
 
 # Data Schemas
 class PredictRequest(BaseModel):
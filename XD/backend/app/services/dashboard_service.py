@@ -15,6 +15,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from database import CropPrice, WeatherData, CropCharacteristics
+from price_series_store import price_series_store, to_datetimes
 
 logger = logging.getLogger(__name__)
 
@@ -165,9 +166,27 @@ def get_price_history(db: Session, province: str, days_back: int = 30) -> List[D
         List of price data points
     """
     try:
-        db.rollback()  # Ensure clean transaction
         cutoff_date = datetime.now() - timedelta(days=days_back)
         
+        if price_series_store.is_loaded():
+            points = []
+            for crop_type in price_series_store.get_crops_for_province(province):
+                dates, values = price_series_store.get_window(crop_type, province, start=cutoff_date)
+                points.extend(zip(to_datetimes(dates[-100:]), [crop_type] * len(values[-100:]), values[-100:].tolist()))
+            
+            # 100 most recent records across all crops
+            points.sort(key=lambda point: point[0], reverse=True)
+            return [
+                {
+                    "date": date.isoformat(),
+                    "crop_type": crop_type,
+                    "price": round(price, 2)
+                }
+                for date, crop_type, price in points[:100]
+            ]
+        
+        db.rollback()  # Ensure clean transaction
+        
         # Limit to 100 most recent records for performance
         prices = db.query(CropPrice).filter(
             CropPrice.province == province,
@@ -20,19 +20,11 @@ logger = logging.getLogger(__name__)
 class PlantingRecommendationService:
     """Service for handling planting recommendations"""
     
-    def __init__(self):
-        self.planting_model_service = None
-        self._load_model_service()
-    
-    def _load_model_service(self):
-        """Load the planting model service"""
-        try:
-            from planting_model_service import planting_model_service
-            self.planting_model_service = planting_model_service
-            logger.info("✅ Planting model service loaded")
-        except Exception as e:
-            logger.error(f"❌ Failed to load planting model service: {e}")
-            self.planting_model_service = None
+    @property
+    def planting_model_service(self):
+        """Planting model service, loaded on first use (None if unavailable)"""
+        from service_registry import service_registry
+        return service_registry.get_optional("planting_model_service")
     
     def get_recommendations(
         self,
@@ -272,8 +264,22 @@ class PlantingRecommendationService:
             timeline_data = []
             now = datetime.now()
             
-            # ✅ Part 1: Get REAL historical data from database (past 12 months)
-            if db:
+            # ✅ Part 1: Get REAL historical data (past 12 months) - in-memory price store first
+            from price_series_store import price_series_store, to_date_strings
+            if price_series_store.is_loaded():
+                dates, prices = price_series_store.get_window(
+                    crop_type, province, start=now - timedelta(days=365), end=now
+                )
+                for date_str, price in zip(to_date_strings(dates), prices.tolist()):
+                    timeline_data.append({
+                        "date": date_str,
+                        "average_price": round(price, 1),
+                        "type": "historical"
+                    })
+                
+                logger.info(f"✅ Loaded {len(prices)} historical records from price store")
+            
+            elif db:
                 try:
                     # Import from correct location
                     try:
@@ -297,7 +303,7 @@ class PlantingRecommendationService:
                     for price_record in historical_prices:
                         timeline_data.append({
                             "date": price_record.date.strftime("%Y-%m-%d"),
-                            "average_price": round(price_record.average_price, 1),
+                            "average_price": round(price_record.price_per_kg, 1),
                             "type": "historical"
                         })
                     
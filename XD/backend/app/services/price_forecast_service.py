@@ -451,6 +451,11 @@ class PriceForecastService:
             # Add current price
             price_history.append(current_price or price_history[-1])
             
+            # Streaming feature engine: each predicted price is pushed once and
+            # lags / rolling stats are read back without re-scanning history
+            from price_feature_engine import PriceFeatureEngine
+            engine = PriceFeatureEngine(price_history)
+            
             # Track seasonal index changes
             prev_seasonal_index = context.get('seasonal_index', 1.0)
             initial_seasonal_index = context.get('seasonal_index', 1.0)  # Store initial value for seasonal adjustment
@@ -463,23 +468,23 @@ class PriceForecastService:
                 # For now, use the context as-is and update key features
                 
                 # Update lag features from price history
-                if len(price_history) >= 7:
-                    context['price_per_kg_lag7'] = price_history[-7]
-                if len(price_history) >= 14:
-                    context['price_per_kg_lag14'] = price_history[-14]
-                if len(price_history) >= 30:
-                    context['price_per_kg_lag30'] = price_history[-30]
+                if engine.count >= 7:
+                    context['price_per_kg_lag7'] = engine.lag(7)
+                if engine.count >= 14:
+                    context['price_per_kg_lag14'] = engine.lag(14)
+                if engine.count >= 30:
+                    context['price_per_kg_lag30'] = engine.lag(30)
                 
                 # Update momentum features
-                current_price_step = price_history[-1]
-                if len(price_history) >= 7:
-                    lag7 = price_history[-7]
+                current_price_step = engine.last
+                if engine.count >= 7:
+                    lag7 = engine.lag(7)
                     context['price_per_kg_momentum_7d'] = (current_price_step - lag7) / (lag7 + 1e-6)
-                if len(price_history) >= 14:
-                    lag14 = price_history[-14]
+                if engine.count >= 14:
+                    lag14 = engine.lag(14)
                     context['price_per_kg_momentum_14d'] = (current_price_step - lag14) / (lag14 + 1e-6)
-                if len(price_history) >= 30:
-                    lag30 = price_history[-30]
+                if engine.count >= 30:
+                    lag30 = engine.lag(30)
                     context['price_per_kg_momentum_30d'] = (current_price_step - lag30) / (lag30 + 1e-6)
                 
                 # Update seasonal features for future date
@@ -538,52 +543,38 @@ class PriceForecastService:
                     # Default seasonal index if not present
                     context['seasonal_index'] = 1.0
                 
-                # Update volatility features (recalculate from recent history)
-                if len(price_history) >= 7:
-                    recent_7 = price_history[-7:]
-                    context['price_per_kg_volatility_7d'] = float(np.std(recent_7))
-                    context['price_per_kg_cv_7d'] = context['price_per_kg_volatility_7d'] / (np.mean(recent_7) + 1e-6)
-                
-                if len(price_history) >= 14:
-                    recent_14 = price_history[-14:]
-                    context['price_per_kg_volatility_14d'] = float(np.std(recent_14))
-                    context['price_per_kg_cv_14d'] = context['price_per_kg_volatility_14d'] / (np.mean(recent_14) + 1e-6)
-                
-                # Update trend features (recalculate from recent history)
-                if len(price_history) >= 7:
-                    recent_7 = price_history[-7:]
-                    if len(recent_7) > 1:
-                        # Simple linear trend
-                        x = np.arange(len(recent_7))
-                        y = np.array(recent_7)
-                        slope = np.polyfit(x, y, 1)[0]
-                        context['price_per_kg_trend_7d'] = float(slope / (np.mean(recent_7) + 1e-6))
-                
-                if len(price_history) >= 14:
-                    recent_14 = price_history[-14:]
-                    if len(recent_14) > 1:
-                        x = np.arange(len(recent_14))
-                        y = np.array(recent_14)
-                        slope = np.polyfit(x, y, 1)[0]
-                        context['price_per_kg_trend_14d'] = float(slope / (np.mean(recent_14) + 1e-6))
-                
-                if len(price_history) >= 30:
-                    recent_30 = price_history[-30:]
-                    if len(recent_30) > 1:
-                        x = np.arange(len(recent_30))
-                        y = np.array(recent_30)
-                        slope = np.polyfit(x, y, 1)[0]
-                        context['price_per_kg_trend_30d'] = float(slope / (np.mean(recent_30) + 1e-6))
+                # Update volatility features (running window stats)
+                if engine.count >= 7:
+                    recent_7 = engine.recent(7)
+                    context['price_per_kg_volatility_7d'] = recent_7.std()
+                    context['price_per_kg_cv_7d'] = context['price_per_kg_volatility_7d'] / (recent_7.mean() + 1e-6)
+                
+                if engine.count >= 14:
+                    recent_14 = engine.recent(14)
+                    context['price_per_kg_volatility_14d'] = recent_14.std()
+                    context['price_per_kg_cv_14d'] = context['price_per_kg_volatility_14d'] / (recent_14.mean() + 1e-6)
+                
+                # Update trend features (least-squares slope from running sums)
+                if engine.count >= 7:
+                    recent_7 = engine.recent(7)
+                    context['price_per_kg_trend_7d'] = float(recent_7.slope() / (recent_7.mean() + 1e-6))
+                
+                if engine.count >= 14:
+                    recent_14 = engine.recent(14)
+                    context['price_per_kg_trend_14d'] = float(recent_14.slope() / (recent_14.mean() + 1e-6))
+                
+                if engine.count >= 30:
+                    recent_30 = engine.recent(30)
+                    context['price_per_kg_trend_30d'] = float(recent_30.slope() / (recent_30.mean() + 1e-6))
                 
                 # Update market features
-                if len(price_history) >= 30:
-                    context['price_per_kg_historical_mean'] = float(np.mean(price_history[-30:]))
+                if engine.count >= 30:
+                    recent_30 = engine.recent(30)
+                    context['price_per_kg_historical_mean'] = recent_30.mean()
                     context['price_per_kg_distance_from_mean'] = current_price_step - context['price_per_kg_historical_mean']
                     
-                    # Update percentile
-                    sorted_prices = sorted(price_history[-30:])
-                    rank = sum(1 for p in sorted_prices if p <= current_price_step)
-                    context['price_per_kg_percentile'] = rank / len(sorted_prices)
+                    # Update percentile (bisection on the sorted window)
+                    context['price_per_kg_percentile'] = recent_30.rank(current_price_step)
                 
                 # Update seasonal interactions
                 if 'month' in context and 'price_per_kg_momentum_7d' in context:
@@ -642,7 +633,7 @@ class PriceForecastService:
                     pred_price = pred_price_raw
                 
                 # Add to history
-                price_history.append(pred_price)
+                engine.push(pred_price)
                 
                 # Store daily forecast
                 daily_forecasts.append({
@@ -9,6 +9,8 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from sqlalchemy import text
 
+from price_series_store import price_series_store, to_datetimes
+
 logger = logging.getLogger(__name__)
 
 
@@ -134,8 +136,16 @@ class SimplePriceForecast:
         days_back: int,
         db_session
     ) -> List[Dict]:
-        """Get historical prices from database"""
+        """Get historical prices from the in-memory store, or the database"""
         try:
+            if price_series_store.is_loaded():
+                start = datetime.combine(datetime.now().date(), datetime.min.time()) - timedelta(days=days_back)
+                dates, prices = price_series_store.get_window(crop_type, province, start=start)
+                return [
+                    {"date": d, "price": p}
+                    for d, p in zip(to_datetimes(dates), prices.tolist())
+                ]
+            
             query = text("""
                 SELECT 
                     date,
@@ -6,6 +6,7 @@ Supports Redis with fallback to in-memory cache
 
 import json
 import logging
+import threading
 from typing import Any, Optional
 from datetime import datetime, timedelta
 
@@ -146,10 +147,20 @@ class MockCache:
 
 # Helper methods for both cache types
 class CacheWrapper:
-    """Wrapper to add helper methods"""
+    """Wrapper to add helper methods (creates the backend on first use when given a factory)"""
     
-    def __init__(self, cache_instance):
-        self._cache = cache_instance
+    def __init__(self, cache_instance=None, factory=None):
+        self._instance = cache_instance
+        self._factory = factory
+        self._lock = threading.Lock()
+    
+    @property
+    def _cache(self):
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self._factory()
+        return self._instance
     
     def get_prediction(self, data: dict) -> Optional[dict]:
         """Get cached prediction"""
@@ -213,22 +224,30 @@ class CacheWrapper:
 
 
 # Initialize global cache instance
-def create_cache():
-    """Create cache instance with Redis or fallback to MockCache"""
+def create_cache_backend():
+    """
+    Create Redis cache or fallback to MockCache
+    
+    Called on first cache use, so the Redis ping (and its timeout when Redis
+    is down) happens here rather than when config is imported.
+    """
     if REDIS_AVAILABLE:
         try:
             from config import REDIS_URL, REDIS_ENABLED
             if REDIS_ENABLED:
-                redis_cache = RedisCache(REDIS_URL)
-                return CacheWrapper(redis_cache)
+                return RedisCache(REDIS_URL)
             else:
                 logger.info("Redis disabled by configuration, using MockCache")
-                return CacheWrapper(MockCache())
+                return MockCache()
         except Exception as e:
             logger.warning(f"⚠️  Redis connection failed, falling back to MockCache: {e}")
-            return CacheWrapper(MockCache())
+            return MockCache()
     else:
-        return CacheWrapper(MockCache())
+        return MockCache()
+
+def create_cache():
+    """Create cache instance; Redis is connected on first use, not at import"""
+    return CacheWrapper(factory=create_cache_backend)
 
 
 cache = create_cache()
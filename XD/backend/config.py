@@ -54,19 +54,9 @@ PRODUCTION_ORIGINS = os.getenv("ALLOWED_ORIGINS", "").split(",")
 if PRODUCTION_ORIGINS and PRODUCTION_ORIGINS[0]:
     ALLOWED_ORIGINS.extend([origin.strip() for origin in PRODUCTION_ORIGINS])
 
-# Redis Configuration with validation
+# Redis Configuration (the connection is tested by cache.create_cache_backend on first use)
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
-REDIS_ENABLED = True
-
-try:
-    import redis
-    # Test Redis connection
-    r = redis.from_url(REDIS_URL)
-    r.ping()
-    logger.info("✅ Redis connection successful")
-except Exception as e:
-    logger.warning(f"⚠️ Redis connection failed: {e}. Caching disabled.")
-    REDIS_ENABLED = False
+REDIS_ENABLED = os.getenv("REDIS_ENABLED", "true").lower() == "true"
 
 # Cache TTL (Time To Live) in seconds
 CACHE_TTL_PREDICTIONS = int(os.getenv("CACHE_TTL_PREDICTIONS", "3600"))  # 1 hour
@@ -90,9 +80,25 @@ RATE_LIMIT_WINDOW = int(os.getenv("RATE_LIMIT_WINDOW", "60"))  # seconds
 # Health Check Configuration
 HEALTH_CHECK_ENABLED = True
 HEALTH_CHECK_TIMEOUT = int(os.getenv("HEALTH_CHECK_TIMEOUT", "30"))
+READY_REQUIRES_WARMUP = os.getenv("READY_REQUIRES_WARMUP", "false").lower() == "true"  # 503 until models are loaded
 
 # Model Service Configuration
 MODEL_TIMEOUT = int(os.getenv("MODEL_TIMEOUT", "30"))  # seconds
 MODEL_RETRY_ATTEMPTS = int(os.getenv("MODEL_RETRY_ATTEMPTS", "3"))
+MODEL_INFERENCE_BACKEND = os.getenv("MODEL_INFERENCE_BACKEND", "native").lower()  # native | compiled | onnx
+ONNX_INTRA_OP_THREADS = int(os.getenv("ONNX_INTRA_OP_THREADS", "1"))  # per worker; 4 workers share the CPU
+SERVICE_WARMUP_ENABLED = os.getenv("SERVICE_WARMUP_ENABLED", "true").lower() == "true"  # load models in background at startup
+SUITABILITY_CUBE_ENABLED = os.getenv("SUITABILITY_CUBE_ENABLED", "true").lower() == "true"  # serve Model B / planting calendar from models/cube
+RECOMMENDATION_STORE_ENABLED = os.getenv("RECOMMENDATION_STORE_ENABLED", "true").lower() == "true"  # serve Model A recommendations from models/cube
+
+# Price Series Store Configuration
+PRICE_STORE_ENABLED = os.getenv("PRICE_STORE_ENABLED", "true").lower() == "true"
+PRICE_STORE_REFRESH_SECONDS = int(os.getenv("PRICE_STORE_REFRESH_SECONDS", "300"))  # 5 minutes
+
+# Precomputed Forecast Configuration
+FORECAST_CACHE_ENABLED = os.getenv("FORECAST_CACHE_ENABLED", "true").lower() == "true"
+FORECAST_CACHE_HOUR = int(os.getenv("FORECAST_CACHE_HOUR", "2"))  # nightly run, local hour
+FORECAST_CACHE_TTL = int(os.getenv("FORECAST_CACHE_TTL", "93600"))  # Redis TTL, 26 hours
+FORECAST_CACHE_MISS_TTL = int(os.getenv("FORECAST_CACHE_MISS_TTL", "600"))  # remember pairs with no stored forecast
 
 logger.info(f"✅ Configuration loaded for environment: {ENVIRONMENT}")
\ No newline at end of file
@@ -5,9 +5,10 @@ Data Availability Checker
 ตรวจสอบว่าพืช+จังหวัดมีข้อมูลใน database หรือไม่
 """
 
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple, Iterable
 from database import SessionLocal, CropPrice
-from sqlalchemy import func, distinct
+from sqlalchemy import func, distinct, tuple_
+from price_series_store import price_series_store, to_datetimes
 import logging
 
 logger = logging.getLogger(__name__)
@@ -55,13 +56,9 @@ class DataAvailabilityChecker:
             
             # ถ้ามีข้อมูลเพียงพอ
             if count >= min_records:
-                return {
-                    "available": True,
-                    "record_count": count,
-                    "latest_date": latest.strftime("%Y-%m-%d") if latest else None,
-                    "message": f"มีข้อมูล {crop_type} ในจังหวัด{province} ({count} records)",
-                    "suggestions": []
-                }
+                return DataAvailabilityChecker._build_availability(
+                    crop_type, province, count, latest, min_records, []
+                )
             
             # ถ้าไม่มีข้อมูลเลย หรือมีน้อยเกินไป
             # หาจังหวัดอื่นที่มีพืชนี้
@@ -80,31 +77,294 @@ class DataAvailabilityChecker:
             
             suggestions = [p[0] for p in available_provinces]
             
-            if count == 0:
-                message = f"ไม่มีข้อมูล {crop_type} ในจังหวัด{province}"
-            else:
-                message = f"มีข้อมูล {crop_type} ในจังหวัด{province} เพียง {count} records (ต้องการอย่างน้อย {min_records})"
+            return DataAvailabilityChecker._build_availability(
+                crop_type, province, count, latest, min_records, suggestions
+            )
             
+        except Exception as e:
+            logger.error(f"Error checking data availability: {e}")
             return {
                 "available": False,
+                "record_count": 0,
+                "latest_date": None,
+                "message": f"เกิดข้อผิดพลาดในการตรวจสอบข้อมูล: {str(e)}",
+                "suggestions": []
+            }
+        finally:
+            db.close()
+    
+    @staticmethod
+    def load_price_context(
+        crop_type: str,
+        province: str,
+        min_records: int = 30,
+        history_limit: int = 90,
+        db=None
+    ) -> Dict[str, Any]:
+        """
+        โหลดข้อมูลทั้งหมดที่ใช้ทำนายราคาของพืช+จังหวัดใน round trip เดียว
+        
+        ใช้ window function ดึง count, วันที่ล่าสุด, ราคาล่าสุด และราคาย้อนหลัง
+        history_limit รายการใน query เดียว (query จังหวัดแนะนำจะรันเพิ่มเฉพาะเมื่อข้อมูลไม่พอ)
+        
+        Args:
+            crop_type: ชื่อพืช
+            province: ชื่อจังหวัด
+            min_records: จำนวน records ขั้นต่ำที่ต้องการ
+            history_limit: จำนวนราคาย้อนหลังที่ต้องการ
+            db: Session ที่ใช้ร่วมกันทั้ง request (ถ้าไม่ระบุจะเปิดใหม่)
+            
+        Returns:
+            {
+                "availability": dict แบบเดียวกับ check_crop_province_availability,
+                "record_count": int,
+                "latest_date": datetime,
+                "current_price": float,      # ราคาของ record ล่าสุด
+                "historical_prices": List[float],  # ใหม่สุดก่อน
+                "history": List[Dict]        # [{date, price}] ใหม่สุดก่อน
+            }
+        """
+        # อ่านจาก in-memory store ถ้าโหลดไว้แล้ว (ไม่ต้องแตะ database)
+        if price_series_store.is_loaded():
+            return DataAvailabilityChecker._price_context_from_store(
+                crop_type, province, min_records, history_limit
+            )
+        
+        own_session = db is None
+        if own_session:
+            db = SessionLocal()
+        
+        try:
+            rows = db.query(
+                CropPrice.price_per_kg,
+                CropPrice.date,
+                func.count().over().label('record_count'),
+                func.max(CropPrice.date).over().label('latest_date')
+            ).filter(
+                CropPrice.crop_type == crop_type,
+                CropPrice.province == province
+            ).order_by(
+                CropPrice.date.desc()
+            ).limit(history_limit).all()
+            
+            count = rows[0].record_count if rows else 0
+            latest = rows[0].latest_date if rows else None
+            
+            suggestions = []
+            if count < min_records:
+                suggestions = DataAvailabilityChecker._get_suggestions_bulk(
+                    db, [crop_type], min_records
+                ).get(crop_type, [])
+            
+            return {
+                "availability": DataAvailabilityChecker._build_availability(
+                    crop_type, province, count, latest, min_records, suggestions
+                ),
                 "record_count": count,
-                "latest_date": latest.strftime("%Y-%m-%d") if latest else None,
-                "message": message,
-                "suggestions": suggestions
+                "latest_date": latest,
+                "current_price": float(rows[0].price_per_kg) if rows and rows[0].price_per_kg is not None else None,
+                "historical_prices": [float(r.price_per_kg) for r in rows if r.price_per_kg is not None],
+                "history": [
+                    {"date": r.date, "price": float(r.price_per_kg)}
+                    for r in rows if r.price_per_kg is not None
+                ]
             }
             
         except Exception as e:
-            logger.error(f"Error checking data availability: {e}")
+            logger.error(f"Error loading price context: {e}")
             return {
-                "available": False,
+                "availability": {
+                    "available": False,
+                    "record_count": 0,
+                    "latest_date": None,
+                    "message": f"เกิดข้อผิดพลาดในการตรวจสอบข้อมูล: {str(e)}",
+                    "suggestions": []
+                },
                 "record_count": 0,
                 "latest_date": None,
-                "message": f"เกิดข้อผิดพลาดในการตรวจสอบข้อมูล: {str(e)}",
-                "suggestions": []
+                "current_price": None,
+                "historical_prices": [],
+                "history": []
+            }
+        finally:
+            if own_session:
+                db.close()
+    
+    @staticmethod
+    def _price_context_from_store(
+        crop_type: str,
+        province: str,
+        min_records: int,
+        history_limit: int
+    ) -> Dict[str, Any]:
+        """load_price_context จาก price_series_store"""
+        count = price_series_store.record_count(crop_type, province)
+        dates, prices = price_series_store.get_last(crop_type, province, history_limit)
+        dates = to_datetimes(dates[::-1])
+        prices = prices[::-1].tolist()
+        latest = dates[0] if dates else None
+        
+        suggestions = []
+        if count < min_records:
+            suggestions = [p for p, _ in price_series_store.get_province_counts(crop_type, min_records)[:5]]
+        
+        return {
+            "availability": DataAvailabilityChecker._build_availability(
+                crop_type, province, count, latest, min_records, suggestions
+            ),
+            "record_count": count,
+            "latest_date": latest,
+            "current_price": prices[0] if prices else None,
+            "historical_prices": prices,
+            "history": [{"date": d, "price": p} for d, p in zip(dates, prices)]
+        }
+    
+    @staticmethod
+    def check_bulk_availability(
+        pairs: Iterable[Tuple[str, str]],
+        min_records: int = 30
+    ) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """
+        ตรวจสอบความพร้อมของข้อมูลหลายคู่ (พืช, จังหวัด) ในครั้งเดียว
+        
+        ใช้ GROUP BY query เดียวสำหรับ count + วันที่ล่าสุดของทุกคู่
+        และอีกหนึ่ง query สำหรับจังหวัดแนะนำของพืชที่ข้อมูลไม่พอ
+        
+        Args:
+            pairs: รายการ (crop_type, province)
+            min_records: จำนวน records ขั้นต่ำที่ต้องการ
+            
+        Returns:
+            {(crop_type, province): availability dict แบบเดียวกับ check_crop_province_availability}
+        """
+        pairs = list(dict.fromkeys(pairs))
+        if not pairs:
+            return {}
+        
+        if price_series_store.is_loaded():
+            result = {}
+            for crop_type, province in pairs:
+                count = price_series_store.record_count(crop_type, province)
+                dates, _ = price_series_store.get_last(crop_type, province, 1)
+                suggestions = [] if count >= min_records else [
+                    p for p, _ in price_series_store.get_province_counts(crop_type, min_records)[:5]
+                ]
+                result[(crop_type, province)] = DataAvailabilityChecker._build_availability(
+                    crop_type, province, count, to_datetimes(dates)[0] if len(dates) else None,
+                    min_records, suggestions
+                )
+            return result
+        
+        db = SessionLocal()
+        
+        try:
+            rows = db.query(
+                CropPrice.crop_type,
+                CropPrice.province,
+                func.count(CropPrice.id),
+                func.max(CropPrice.date)
+            ).filter(
+                tuple_(CropPrice.crop_type, CropPrice.province).in_(pairs)
+            ).group_by(
+                CropPrice.crop_type,
+                CropPrice.province
+            ).all()
+            
+            stats = {(r[0], r[1]): (r[2], r[3]) for r in rows}
+            
+            # หาจังหวัดแนะนำเฉพาะพืชที่มีบางคู่ข้อมูลไม่พอ
+            short_crops = {
+                crop_type for crop_type, province in pairs
+                if stats.get((crop_type, province), (0, None))[0] < min_records
+            }
+            suggestions = DataAvailabilityChecker._get_suggestions_bulk(
+                db, short_crops, min_records
+            ) if short_crops else {}
+            
+            result = {}
+            for crop_type, province in pairs:
+                count, latest = stats.get((crop_type, province), (0, None))
+                result[(crop_type, province)] = DataAvailabilityChecker._build_availability(
+                    crop_type, province, count, latest, min_records,
+                    [] if count >= min_records else suggestions.get(crop_type, [])
+                )
+            
+            return result
+            
+        except Exception as e:
+            logger.error(f"Error checking bulk data availability: {e}")
+            return {
+                pair: {
+                    "available": False,
+                    "record_count": 0,
+                    "latest_date": None,
+                    "message": f"เกิดข้อผิดพลาดในการตรวจสอบข้อมูล: {str(e)}",
+                    "suggestions": []
+                }
+                for pair in pairs
             }
         finally:
             db.close()
     
+    @staticmethod
+    def _get_suggestions_bulk(db, crop_types: Iterable[str], min_records: int, limit: int = 5) -> Dict[str, List[str]]:
+        """ดึงจังหวัดแนะนำ (เรียงตามจำนวน records) ของหลายพืชใน query เดียว"""
+        rows = db.query(
+            CropPrice.crop_type,
+            CropPrice.province,
+            func.count(CropPrice.id).label('count')
+        ).filter(
+            CropPrice.crop_type.in_(list(crop_types))
+        ).group_by(
+            CropPrice.crop_type,
+            CropPrice.province
+        ).having(
+            func.count(CropPrice.id) >= min_records
+        ).order_by(
+            CropPrice.crop_type,
+            func.count(CropPrice.id).desc()
+        ).all()
+        
+        suggestions: Dict[str, List[str]] = {}
+        for crop_type, province, _ in rows:
+            provinces = suggestions.setdefault(crop_type, [])
+            if len(provinces) < limit:
+                provinces.append(province)
+        
+        return suggestions
+    
+    @staticmethod
+    def _build_availability(
+        crop_type: str,
+        province: str,
+        count: int,
+        latest,
+        min_records: int,
+        suggestions: List[str]
+    ) -> Dict[str, Any]:
+        """สร้างผลลัพธ์ availability จาก count และวันที่ล่าสุด"""
+        if count >= min_records:
+            return {
+                "available": True,
+                "record_count": count,
+                "latest_date": latest.strftime("%Y-%m-%d") if latest else None,
+                "message": f"มีข้อมูล {crop_type} ในจังหวัด{province} ({count} records)",
+                "suggestions": []
+            }
+        
+        if count == 0:
+            message = f"ไม่มีข้อมูล {crop_type} ในจังหวัด{province}"
+        else:
+            message = f"มีข้อมูล {crop_type} ในจังหวัด{province} เพียง {count} records (ต้องการอย่างน้อย {min_records})"
+        
+        return {
+            "available": False,
+            "record_count": count,
+            "latest_date": latest.strftime("%Y-%m-%d") if latest else None,
+            "message": message,
+            "suggestions": suggestions
+        }
+    
     @staticmethod
     def get_available_crops_for_province(province: str, min_records: int = 30) -> List[str]:
         """
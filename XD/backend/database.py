@@ -17,8 +17,13 @@ from config import DATABASE_URL
 logger = logging.getLogger(__name__)
 
 # Production-ready SQLAlchemy setup with connection pooling - PostgreSQL only
-def create_database_engine():
-    """Create PostgreSQL database engine with production-ready configuration"""
+def create_database_engine(test_connection: bool = False):
+    """
+    Create PostgreSQL database engine with production-ready configuration
+    
+    The engine connects lazily; the app lifespan verifies the connection, so
+    importing this module does not wait on the database.
+    """
     try:
         # Validate PostgreSQL URL
         if "postgresql" not in DATABASE_URL:
@@ -44,9 +49,9 @@ def create_database_engine():
         )
         logger.info("✅ PostgreSQL engine configured with connection pooling")
         
-        # Test connection
-        with engine.connect() as conn:
-            logger.info("✅ PostgreSQL connection test successful")
+        if test_connection:
+            with engine.connect() as conn:
+                logger.info("✅ PostgreSQL connection test successful")
         
         return engine
         
@@ -202,6 +207,21 @@ class CropCultivation(Base):
     area_rai = Column(Float)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+class ForecastCache(Base):
+    __tablename__ = "forecast_cache"
+    __table_args__ = (
+        Index("ix_forecast_cache_crop_province", "crop_type", "province", unique=True),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    crop_type = Column(String, nullable=False)
+    province = Column(String, nullable=False)
+    model_version = Column(String, nullable=False)
+    data_watermark = Column(String, nullable=False)  # record count : latest date : latest change
+    horizon_days = Column(Integer, nullable=False)
+    forecast_data = Column(Text)  # JSON string
+    computed_at = Column(DateTime, default=datetime.utcnow, index=True)
+
 # Database functions
 def get_db() -> Generator[Session, None, None]:
     """Get database session"""
@@ -0,0 +1,440 @@
+# -*- coding: utf-8 -*-
+"""
+Forecast Cache
+Precomputed Model C forecasts stored in the forecast_cache table and Redis
+
+An entry is served while its model version, data watermark (record count,
+latest price date, latest created_at/updated_at of the pair) and forecast
+date all still match; otherwise callers fall back to live inference. Pairs
+with no stored forecast are remembered as misses for FORECAST_CACHE_MISS_TTL
+seconds so live requests don't query the table every time.
+
+Every API worker schedules the nightly batch, but only the one holding the
+Postgres advisory lock runs it; rows are written with INSERT ... ON CONFLICT.
+
+Run the full batch from the command line:
+    python forecast_cache.py
+    python forecast_cache.py --pair "พริก:เชียงใหม่" --pair "ข้าว:สุพรรณบุรี"
+"""
+
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    from config import FORECAST_CACHE_ENABLED, FORECAST_CACHE_HOUR, FORECAST_CACHE_TTL, FORECAST_CACHE_MISS_TTL
+except ImportError:
+    FORECAST_CACHE_ENABLED = True
+    FORECAST_CACHE_HOUR = 2
+    FORECAST_CACHE_TTL = 93600
+    FORECAST_CACHE_MISS_TTL = 600
+
+HORIZON_DAYS = 180    # Longest Model C timeframe; shorter requests are prefixes of it
+MIN_RECORDS = 30      # Same threshold predict_price() uses
+BATCH_SIZE = 200      # Pairs per predict_prices_batch call
+BATCH_LOCK_KEY = 720415  # pg advisory lock id: one batch run across all workers
+MISSING = {"missing": True}  # Redis marker for pairs without a stored forecast
+
+
+class ForecastCacheService:
+    """Precompute, store and serve Model C forecasts per crop/province"""
+    
+    def __init__(
+        self,
+        run_hour: int = FORECAST_CACHE_HOUR,
+        ttl: int = FORECAST_CACHE_TTL,
+        miss_ttl: int = FORECAST_CACHE_MISS_TTL,
+        enabled: bool = FORECAST_CACHE_ENABLED
+    ):
+        self.run_hour = run_hour
+        self.ttl = ttl
+        self.miss_ttl = miss_ttl
+        self.enabled = enabled
+        self.last_run: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+    
+    # ------------------------------------------------------------------
+    # Versioning
+    # ------------------------------------------------------------------
+    
+    @staticmethod
+    def model_version() -> Optional[str]:
+        """Version string of the loaded Model C (None if not loaded)"""
+        from model_c_wrapper import model_c_wrapper
+        if not model_c_wrapper.model_loaded:
+            return None
+        return f"{model_c_wrapper.model_version}:{model_c_wrapper.training_date}"
+    
+    @staticmethod
+    def _format_watermark(count: int, latest_date, changed_at) -> str:
+        return "{}:{}:{}".format(
+            count,
+            latest_date.isoformat() if latest_date else "",
+            changed_at.isoformat() if changed_at else ""
+        )
+    
+    def compute_watermarks(self, pairs: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], str]:
+        """Current data watermark of each (crop_type, province)"""
+        pairs = list(dict.fromkeys(pairs))
+        if not pairs:
+            return {}
+        
+        from price_series_store import price_series_store, to_datetimes
+        if price_series_store.is_loaded():
+            watermarks = {}
+            for crop_type, province in pairs:
+                dates, _ = price_series_store.get_last(crop_type, province, 1)
+                watermarks[(crop_type, province)] = self._format_watermark(
+                    price_series_store.record_count(crop_type, province),
+                    to_datetimes(dates)[0] if len(dates) else None,
+                    price_series_store.latest_change(crop_type, province)
+                )
+            return watermarks
+        
+        from database import SessionLocal, CropPrice
+        from sqlalchemy import func, tuple_
+        
+        db = SessionLocal()
+        try:
+            rows = db.query(
+                CropPrice.crop_type,
+                CropPrice.province,
+                func.count(CropPrice.id),
+                func.max(CropPrice.date),
+                func.max(func.coalesce(CropPrice.updated_at, CropPrice.created_at))
+            ).filter(
+                tuple_(CropPrice.crop_type, CropPrice.province).in_(pairs),
+                CropPrice.price_per_kg.isnot(None),
+                CropPrice.date.isnot(None)
+            ).group_by(
+                CropPrice.crop_type,
+                CropPrice.province
+            ).all()
+            
+            stats = {(r[0], r[1]): r[2:] for r in rows}
+            return {
+                pair: self._format_watermark(*stats.get(pair, (0, None, None)))
+                for pair in pairs
+            }
+        finally:
+            db.close()
+    
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    
+    @staticmethod
+    def _cache_key(crop_type: str, province: str) -> str:
+        return f"forecast:{crop_type}:{province}"
+    
+    def get(self, crop_type: str, province: str) -> Optional[Dict[str, Any]]:
+        """
+        Stored forecast for a pair, if still valid
+        
+        Returns:
+            {"current_price", "predictions", "daily_forecasts", "historical_data"}
+            for a HORIZON_DAYS forecast, or None
+        """
+        if not self.enabled:
+            return None
+        
+        try:
+            version = self.model_version()
+            if version is None:
+                return None
+            
+            from cache import cache
+            key = self._cache_key(crop_type, province)
+            entry = cache.get(key)
+            
+            if entry is None:
+                entry = self._load_entry(crop_type, province)
+                cache.set(key, entry or MISSING, self.ttl if entry else self.miss_ttl)
+            
+            if not entry or entry.get("missing"):
+                return None
+            
+            # Forecast dates are relative to the day they were computed
+            if entry["model_version"] != version or entry["forecast_date"] != datetime.now().date().isoformat():
+                return None
+            
+            watermark = self.compute_watermarks([(crop_type, province)])[(crop_type, province)]
+            if entry["data_watermark"] != watermark:
+                return None
+            
+            return entry["forecast"]
+        
+        except Exception as e:
+            logger.warning(f"Forecast cache lookup failed for {crop_type}/{province}: {e}")
+            return None
+    
+    @staticmethod
+    def _load_entry(crop_type: str, province: str) -> Optional[Dict[str, Any]]:
+        from database import SessionLocal, ForecastCache
+        
+        db = SessionLocal()
+        try:
+            row = db.query(ForecastCache).filter(
+                ForecastCache.crop_type == crop_type,
+                ForecastCache.province == province
+            ).first()
+            return json.loads(row.forecast_data) if row else None
+        finally:
+            db.close()
+    
+    # ------------------------------------------------------------------
+    # Batch computation
+    # ------------------------------------------------------------------
+    
+    def recompute(self, pairs: Iterable[Tuple[str, str]]) -> Dict[str, Any]:
+        """
+        Compute and store forecasts for the given pairs
+        
+        Pairs whose forecast fails have their stored entry removed.
+        
+        Returns:
+            Run statistics (pairs, stored, failed, seconds, pairs_per_second)
+        """
+        pairs = list(dict.fromkeys(pairs))
+        start = time.time()
+        stored = 0
+        failed = 0
+        
+        version = self.model_version()
+        if version is None or not pairs:
+            return {"pairs": len(pairs), "stored": 0, "failed": len(pairs), "seconds": 0.0, "pairs_per_second": 0.0}
+        
+        from model_c_wrapper import model_c_wrapper
+        
+        with self._lock:
+            for i in range(0, len(pairs), BATCH_SIZE):
+                chunk = pairs[i:i + BATCH_SIZE]
+                
+                # Watermark before predicting: if prices change meanwhile the entry is just stale
+                watermarks = self.compute_watermarks(chunk)
+                results = model_c_wrapper.predict_prices_batch(chunk, days_ahead=HORIZON_DAYS)
+                forecast_date = datetime.now().date().isoformat()
+                
+                entries = {}
+                for pair, result in zip(chunk, results):
+                    if result.get("success"):
+                        entries[pair] = {
+                            "model_version": version,
+                            "data_watermark": watermarks[pair],
+                            "forecast_date": forecast_date,
+                            "horizon_days": HORIZON_DAYS,
+                            "forecast": {
+                                "current_price": result["current_price"],
+                                "predictions": result["predictions"],
+                                "daily_forecasts": result["daily_forecasts"],
+                                "historical_data": result["historical_data"]
+                            }
+                        }
+                    else:
+                        entries[pair] = None
+                        failed += 1
+                
+                self._store_entries(entries)
+                stored += sum(1 for entry in entries.values() if entry)
+        
+        seconds = time.time() - start
+        stats = {
+            "pairs": len(pairs),
+            "stored": stored,
+            "failed": failed,
+            "seconds": round(seconds, 2),
+            "pairs_per_second": round(len(pairs) / seconds, 2) if seconds > 0 else 0.0,
+            "model_version": version,
+            "finished_at": datetime.now().isoformat()
+        }
+        logger.info(f"✅ Forecast cache: {stored}/{len(pairs)} pairs stored in {stats['seconds']}s "
+                    f"({stats['pairs_per_second']} pairs/s)")
+        return stats
+    
+    def _store_entries(self, entries: Dict[Tuple[str, str], Optional[Dict[str, Any]]]):
+        """Upsert entries into forecast_cache and Redis (None removes the pair)"""
+        from database import SessionLocal, ForecastCache
+        from sqlalchemy import tuple_
+        from sqlalchemy.dialects.postgresql import insert
+        from cache import cache
+        
+        removed = [pair for pair, entry in entries.items() if entry is None]
+        computed_at = datetime.utcnow()
+        rows = [
+            {
+                "crop_type": crop_type,
+                "province": province,
+                "model_version": entry["model_version"],
+                "data_watermark": entry["data_watermark"],
+                "horizon_days": entry["horizon_days"],
+                "forecast_data": json.dumps(entry, ensure_ascii=False),
+                "computed_at": computed_at
+            }
+            for (crop_type, province), entry in entries.items() if entry is not None
+        ]
+        
+        db = SessionLocal()
+        try:
+            if removed:
+                db.query(ForecastCache).filter(
+                    tuple_(ForecastCache.crop_type, ForecastCache.province).in_(removed)
+                ).delete(synchronize_session=False)
+            
+            if rows:
+                # Concurrent writers (an ingest recompute during the batch) just overwrite each other
+                statement = insert(ForecastCache).values(rows)
+                db.execute(statement.on_conflict_do_update(
+                    index_elements=["crop_type", "province"],
+                    set_={
+                        column: statement.excluded[column]
+                        for column in ("model_version", "data_watermark", "horizon_days", "forecast_data", "computed_at")
+                    }
+                ))
+            
+            db.commit()
+        except Exception as e:
+            logger.error(f"Failed to store forecast cache entries: {e}")
+            db.rollback()
+            return
+        finally:
+            db.close()
+        
+        for (crop_type, province), entry in entries.items():
+            key = self._cache_key(crop_type, province)
+            if entry is None:
+                cache.delete(key)
+            else:
+                cache.set(key, entry, self.ttl)
+    
+    def available_pairs(self) -> List[Tuple[str, str]]:
+        """Every pair that passes DataAvailabilityChecker"""
+        from data_availability_checker import data_checker
+        from price_series_store import price_series_store
+        
+        if price_series_store.is_loaded():
+            candidates = price_series_store.get_pairs(min_records=MIN_RECORDS)
+        else:
+            from database import SessionLocal, CropPrice
+            from sqlalchemy import func
+            
+            db = SessionLocal()
+            try:
+                candidates = [
+                    (r[0], r[1]) for r in db.query(
+                        CropPrice.crop_type,
+                        CropPrice.province
+                    ).group_by(
+                        CropPrice.crop_type,
+                        CropPrice.province
+                    ).having(
+                        func.count(CropPrice.id) >= MIN_RECORDS
+                    ).all()
+                ]
+            finally:
+                db.close()
+        
+        availability = data_checker.check_bulk_availability(candidates, min_records=MIN_RECORDS)
+        return [pair for pair in candidates if availability.get(pair, {}).get("available")]
+    
+    @contextmanager
+    def _batch_lock(self):
+        """
+        Session-level Postgres advisory lock for the full batch
+        
+        Yields:
+            True if this process holds the lock, False if another one does
+        """
+        from database import engine
+        from sqlalchemy import text
+        
+        with engine.connect() as conn:
+            acquired = conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": BATCH_LOCK_KEY}).scalar()
+            try:
+                yield bool(acquired)
+            finally:
+                if acquired:
+                    conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": BATCH_LOCK_KEY})
+    
+    def run_batch(self) -> Optional[Dict[str, Any]]:
+        """
+        Recompute forecasts for every available pair
+        
+        Returns:
+            Run statistics, or None if another process is already running the batch
+        """
+        with self._batch_lock() as acquired:
+            if not acquired:
+                logger.info("ℹ️ Forecast cache batch already running in another process, skipping")
+                return None
+            
+            pairs = self.available_pairs()
+            logger.info(f"🔮 Forecast cache batch: {len(pairs)} pairs")
+            self.last_run = self.recompute(pairs)
+            return self.last_run
+    
+    # ------------------------------------------------------------------
+    # Nightly schedule
+    # ------------------------------------------------------------------
+    
+    def _seconds_until_next_run(self) -> float:
+        now = datetime.now()
+        next_run = now.replace(hour=self.run_hour, minute=0, second=0, microsecond=0)
+        if next_run <= now:
+            next_run += timedelta(days=1)
+        return (next_run - now).total_seconds()
+    
+    def start(self):
+        """Start the nightly batch thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._schedule_loop)
+            self._thread.daemon = True
+            self._thread.start()
+            logger.info(f"✅ Nightly forecast batch scheduled at {self.run_hour:02d}:00")
+    
+    def stop(self):
+        """Stop the nightly batch thread"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+        logger.info("🛑 Nightly forecast batch stopped")
+    
+    def _schedule_loop(self):
+        while not self._stop_event.wait(self._seconds_until_next_run()):
+            try:
+                self.run_batch()
+            except Exception as e:
+                logger.error(f"Nightly forecast batch failed: {e}")
+
+
+# Global instance
+forecast_cache = ForecastCacheService()
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    logging.basicConfig(level=logging.INFO)
+    
+    parser = argparse.ArgumentParser(description="Precompute Model C forecasts into forecast_cache")
+    parser.add_argument("--pair", action="append", default=[],
+                        help='Only recompute "crop_type:province" (repeatable)')
+    args = parser.parse_args()
+    
+    from database import create_tables
+    create_tables()
+    
+    if args.pair:
+        stats = forecast_cache.recompute([tuple(p.split(":", 1)) for p in args.pair])
+    else:
+        stats = forecast_cache.run_batch()
+    
+    print(json.dumps(stats, ensure_ascii=False, indent=2))
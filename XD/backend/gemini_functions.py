@@ -6,7 +6,6 @@ Defines all functions that Gemini can call to access ML models
 
 import logging
 from typing import Dict, Any, List, Optional
-import google.generativeai as genai
 
 logger = logging.getLogger(__name__)
 
@@ -237,27 +236,12 @@ class GeminiFunctionHandler:
     """Handler for executing Gemini function calls"""
     
     def __init__(self):
-        try:
-            from recommendation_model_service import recommendation_model_service
-        except ImportError:
-            logger.warning("⚠️ recommendation_model_service not available")
-            recommendation_model_service = None
-        
-        try:
-            from water_management_service import water_management_service
-        except ImportError:
-            logger.warning("⚠️ water_management_service not available")
-            water_management_service = None
+        # Model services load on first use through the service registry
+        from service_registry import service_registry
         
-        try:
-            from price_prediction_service import price_prediction_service
-        except ImportError:
-            logger.warning("⚠️ price_prediction_service not available")
-            price_prediction_service = None
-        
-        self.recommendation_service = recommendation_model_service
-        self.water_service = water_management_service
-        self.price_service = price_prediction_service
+        self.recommendation_service = service_registry.proxy("recommendation_model_service")
+        self.water_service = service_registry.proxy("water_management_service")
+        self.price_service = service_registry.proxy("price_prediction_service")
         
         logger.info("✅ Gemini Function Handler initialized")
     
@@ -743,18 +727,18 @@ class GeminiFunctionHandler:
             good_windows = []
             
             current_date = datetime.now()
+            target_dates = [current_date + timedelta(days=30 * month_offset) for month_offset in range(months_ahead)]
             
-            for month_offset in range(months_ahead):
-                target_date = current_date + timedelta(days=30 * month_offset)
+            # Predict all months with one predict_proba call
+            calendar = model_b.predict_calendar(
+                crop_type=crop_type,
+                province=province,
+                planting_dates=target_dates
+            )
+            
+            for target_date, result in zip(target_dates, calendar):
                 date_str = target_date.strftime('%Y-%m-%d')
                 
-                # Predict for this date
-                result = model_b.predict_planting_window(
-                    crop_type=crop_type,
-                    province=province,
-                    planting_date=date_str
-                )
-                
                 monthly_predictions.append({
                     'month': target_date.strftime('%Y-%m'),
                     'date': date_str,
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+Gunicorn configuration - preload-then-fork server mode
+
+The master imports the app, loads every model and reference dataset once
+(preload.preload_models) and only then forks the uvicorn workers, which
+share that memory copy-on-write instead of each unpickling its own copy.
+
+Usage:
+    gunicorn -c gunicorn.conf.py app.main:app
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "4"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+accesslog = "-"
+errorlog = "-"
+
+# Lets the workers report their siblings' memory (monitoring.get_worker_memory)
+os.environ["SERVER_PRELOAD"] = "1"
+
+
+def when_ready(server):
+    """Master, after the app import and before the first fork"""
+    from preload import preload_models
+    stats = preload_models()
+    server.log.info(f"Models preloaded in {stats['seconds']}s, forking {workers} workers")
+
+
+def post_fork(server, worker):
+    from preload import after_fork
+    after_fork()
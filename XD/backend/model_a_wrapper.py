@@ -20,6 +20,27 @@ sys.path.insert(0, str(remediation_dir / "Model_A_Fixed"))
 
 logger = logging.getLogger(__name__)
 
+# Water source -> crop water requirements it can supply (other values don't filter)
+WATER_MAPPING = {
+    'น้ำฝน': ['ต่ำมาก', 'ต่ำ', 'ปานกลาง'],
+    'น้ำบาดาล': ['ต่ำ', 'ปานกลาง', 'สูง'],
+    'ชลประทาน': ['ต่ำมาก', 'ต่ำ', 'ปานกลาง', 'สูง', 'สูงมาก'],
+    'แม่น้ำ/คลอง': ['ปานกลาง', 'สูง', 'สูงมาก']
+}
+
+# Goals with their own weighting (any other goal gets none)
+GOALS = ['profit', 'stability', 'sustainability']
+
+# Base yields (kg/rai)
+BASE_YIELDS = {
+    'ข้าว': 800, 'ข้าวโพด': 1000, 'อ้อย': 10000, 'มันสำปะหลัง': 3000,
+    'ถั่วเขียว': 400, 'ถั่วลิสง': 600, 'กระเทียม': 1200, 'หอมแดง': 1400,
+    'มะเขือเทศ': 3500, 'พริก': 2000, 'ถั่วฝักยาว': 1200, 'แตงโม': 4000
+}
+
+TOP_N = 10
+RECOMMENDATION_STORE_NAME = 'model_a_recommendations'
+
 class ModelAWrapper:
     """Wrapper for Model A with Full Personalization"""
     
@@ -32,17 +53,24 @@ class ModelAWrapper:
         self.model_path = None
         self.backend_dir = backend_dir
         
-        # Cache for datasets
+        # Cache for datasets (candidate crops)
         self.crops_df = None
-        self.cultivation_df = None
-        self.weather_df = None
-        self.price_df = None
+        
+        # Precomputed lookups, built once from the datasets at load time
+        self.encoder_index = {}  # encoder -> {label: code}
+        self.market_stats = None  # (province, crop_type, month) -> (plantings, mean revenue)
+        self.seasonal_types = None  # crop_type -> seasonal_type
+        self.weather_stats = None  # (province, month) -> avg_temp / total_rain / avg_humidity
+        self.price_stats = None  # (province, crop_type) -> avg_price / price_volatility
         
         # Load model
         self._load_model()
         
         # Load datasets
         self._load_datasets()
+        
+        # Materialized top-N per (province, month, water, goal) (None -> live inference only)
+        self.recommendation_store = self._load_recommendation_store()
     
     def _load_model(self):
         """Load Model A from backend/models"""
@@ -55,12 +83,15 @@ class ModelAWrapper:
                 "model_a_xgboost.pkl",
             ]
             
+            from onnx_backend import load_onnx_model
+            
             for model_file in model_files:
                 model_path = models_dir / model_file
-                if model_path.exists():
+                onnx_model = load_onnx_model(model_path.stem)
+                if onnx_model or model_path.exists():
                     try:
-                        self.model = joblib.load(model_path)
-                        self.model_path = model_path
+                        self.model = onnx_model[0] if onnx_model else joblib.load(model_path)
+                        self.model_path = onnx_model[0].path if onnx_model else model_path
                         self.model_loaded = True
                         
                         if hasattr(self.model, 'n_features_in_'):
@@ -78,10 +109,15 @@ class ModelAWrapper:
                         
                         if encoders_path.exists():
                             self.encoders = joblib.load(encoders_path)
+                            self.encoder_index = self._build_encoder_index(self.encoders)
                         
                         if metadata_path.exists():
                             self.metadata = joblib.load(metadata_path)
                         
+                        # Optional packed-array evaluator (MODEL_INFERENCE_BACKEND=compiled)
+                        from tree_evaluator import compile_for_serving
+                        self.model = compile_for_serving(self.model, f"Model A ({model_file})")
+                        
                         logger.info(f"✅ Model A Personalized loaded: {model_path.name}")
                         logger.info(f"   Features: {self.n_features}, R²: {self.metadata.get('r2_score', 'N/A') if self.metadata else 'N/A'}")
                         return
@@ -96,7 +132,12 @@ class ModelAWrapper:
             self.model_loaded = False
     
     def _load_datasets(self):
-        """Load datasets for personalization features"""
+        """
+        Load datasets for personalization features
+        
+        cultivation / weather / price are reduced to keyed aggregate tables and
+        not kept, so each request does dict lookups instead of DataFrame scans.
+        """
         try:
             import pandas as pd
             
@@ -106,33 +147,103 @@ class ModelAWrapper:
             crop_file = dataset_dir / "crop_characteristics.csv"
             if crop_file.exists():
                 self.crops_df = pd.read_csv(crop_file, encoding='utf-8')
+                self.seasonal_types = self._build_seasonal_types(self.crops_df)
                 logger.info(f"✅ Loaded {len(self.crops_df)} crops")
             
             # Load cultivation data (for market factors)
             cultivation_file = dataset_dir / "cultivation.csv"
             if cultivation_file.exists():
-                self.cultivation_df = pd.read_csv(cultivation_file, encoding='utf-8')
-                self.cultivation_df['planting_date'] = pd.to_datetime(self.cultivation_df['planting_date'])
-                self.cultivation_df['plant_month'] = self.cultivation_df['planting_date'].dt.month
-                logger.info(f"✅ Loaded {len(self.cultivation_df)} cultivation records")
+                cultivation_df = pd.read_csv(
+                    cultivation_file, encoding='utf-8',
+                    usecols=lambda col: col in ('province', 'crop_type', 'planting_date', 'revenue')
+                )
+                cultivation_df['plant_month'] = pd.to_datetime(cultivation_df['planting_date']).dt.month
+                self.market_stats = self._build_market_stats(cultivation_df)
+                logger.info(f"✅ Loaded {len(cultivation_df)} cultivation records")
             
             # Load weather data
             weather_file = dataset_dir / "weather.csv"
             if weather_file.exists():
-                self.weather_df = pd.read_csv(weather_file, encoding='utf-8')
-                self.weather_df['date'] = pd.to_datetime(self.weather_df['date'])
-                logger.info(f"✅ Loaded {len(self.weather_df)} weather records")
+                weather_df = pd.read_csv(
+                    weather_file, encoding='utf-8',
+                    usecols=lambda col: col in ('province', 'date', 'temperature_celsius', 'rainfall_mm', 'humidity_percent')
+                )
+                weather_df['month'] = pd.to_datetime(weather_df['date']).dt.month
+                self.weather_stats = self._build_weather_stats(weather_df)
+                logger.info(f"✅ Loaded {len(weather_df)} weather records")
             
             # Load price data
             price_file = dataset_dir / "price.csv"
             if price_file.exists():
-                self.price_df = pd.read_csv(price_file, encoding='utf-8')
-                self.price_df['date'] = pd.to_datetime(self.price_df['date'])
-                logger.info(f"✅ Loaded {len(self.price_df)} price records")
+                price_df = pd.read_csv(
+                    price_file, encoding='utf-8',
+                    usecols=lambda col: col in ('province', 'crop_type', 'price_per_kg')
+                )
+                self.price_stats = self._build_price_stats(price_df)
+                logger.info(f"✅ Loaded {len(price_df)} price records")
             
         except Exception as e:
             logger.warning(f"⚠️ Could not load some datasets: {e}")
     
+    @staticmethod
+    def _build_encoder_index(encoders) -> Dict[str, Dict[Any, int]]:
+        """label -> code for each LabelEncoder (same codes as transform)"""
+        return {
+            name: {label: code for code, label in enumerate(encoder.classes_)}
+            for name, encoder in (encoders or {}).items()
+            if hasattr(encoder, 'classes_')
+        }
+    
+    @staticmethod
+    def _build_seasonal_types(crops_df) -> Dict[str, Any]:
+        """crop_type -> seasonal_type of its first row"""
+        if 'seasonal_type' not in crops_df.columns:
+            return None
+        first = crops_df.drop_duplicates('crop_type')
+        return dict(zip(first['crop_type'], first['seasonal_type']))
+    
+    @staticmethod
+    def _build_market_stats(cultivation_df) -> Dict[tuple, tuple]:
+        """(province, crop_type, plant_month) -> (number of plantings, mean revenue or None)"""
+        groups = cultivation_df.groupby(['province', 'crop_type', 'plant_month'])
+        counts = groups.size()
+        if 'revenue' in cultivation_df.columns:
+            revenue = groups['revenue'].mean().to_numpy(dtype=float).tolist()
+        else:
+            revenue = [None] * len(counts)
+        stats = {
+            (province, crop_type, int(month)): (count, avg_revenue)
+            for (province, crop_type, month), count, avg_revenue in zip(counts.index, counts.tolist(), revenue)
+        }
+        logger.info(f"✅ Precomputed market stats for {len(stats)} province/crop/month keys")
+        return stats
+    
+    @staticmethod
+    def _build_weather_stats(weather_df) -> Dict[tuple, Dict[str, float]]:
+        """(province, month) -> avg_temp, total_rain, avg_humidity"""
+        table = weather_df.groupby(['province', 'month']).agg(
+            avg_temp=('temperature_celsius', 'mean'),
+            total_rain=('rainfall_mm', 'sum'),
+            avg_humidity=('humidity_percent', 'mean')
+        ).astype(float)
+        stats = {
+            (province, int(month)): row
+            for (province, month), row in zip(table.index, table.to_dict('records'))
+        }
+        logger.info(f"✅ Precomputed weather stats for {len(stats)} province/month keys")
+        return stats
+    
+    @staticmethod
+    def _build_price_stats(price_df) -> Dict[tuple, Dict[str, float]]:
+        """(province, crop_type) -> avg_price / price_volatility over all price records"""
+        table = price_df.groupby(['province', 'crop_type'])['price_per_kg'].agg(['mean', 'std']).astype(float)
+        stats = {
+            key: {'avg_price': avg_price, 'price_volatility': volatility}
+            for key, avg_price, volatility in zip(table.index, table['mean'].tolist(), table['std'].tolist())
+        }
+        logger.info(f"✅ Precomputed price stats for {len(stats)} province/crop pairs")
+        return stats
+    
     def get_market_demand_factor(self, province: str, crop_type: str, month: int) -> float:
         """
         Calculate market demand factor based on scarcity and price
@@ -141,24 +252,21 @@ class ModelAWrapper:
             float: Market demand factor (0.5 to 2.0)
         """
         try:
-            if self.cultivation_df is None:
+            if self.market_stats is None:
                 return 1.0
             
-            # Filter cultivation data
-            crop_in_province = self.cultivation_df[
-                (self.cultivation_df['province'] == province) &
-                (self.cultivation_df['crop_type'] == crop_type) &
-                (self.cultivation_df['plant_month'] == month)
-            ]
+            # Plantings of this crop in the province and month
+            stats = self.market_stats.get((province, crop_type, month))
             
-            if len(crop_in_province) > 0:
+            if stats is not None:
+                plantings, avg_revenue = stats
+                
                 # Scarcity factor: less planting = higher demand
-                scarcity_factor = 1.0 / (len(crop_in_province) + 1)
+                scarcity_factor = 1.0 / (plantings + 1)
                 scarcity_factor = min(scarcity_factor * 10, 1.0)  # Normalize
                 
                 # Price factor: higher revenue = higher demand
-                if 'revenue' in crop_in_province.columns:
-                    avg_revenue = crop_in_province['revenue'].mean()
+                if avg_revenue is not None:
                     price_factor = min(avg_revenue / 50000, 2.0)
                 else:
                     price_factor = 1.0
@@ -181,7 +289,7 @@ class ModelAWrapper:
             float: Seasonal bonus (0.8 to 1.2)
         """
         try:
-            if self.crops_df is None:
+            if self.seasonal_types is None:
                 return 1.0
             
             # Get season from month
@@ -193,11 +301,10 @@ class ModelAWrapper:
                 season = 'rainy'
             
             # Get crop info
-            crop_info = self.crops_df[self.crops_df['crop_type'] == crop_type]
-            if len(crop_info) == 0:
+            if crop_type not in self.seasonal_types:
                 return 1.0
             
-            seasonal_type = crop_info.iloc[0]['seasonal_type']
+            seasonal_type = self.seasonal_types[crop_type]
             
             # Calculate bonus
             if seasonal_type == 'ได้ทุกฤดู':
@@ -221,21 +328,13 @@ class ModelAWrapper:
             Dict with avg_temp, total_rain, avg_humidity
         """
         try:
-            if self.weather_df is None:
+            if self.weather_stats is None:
                 return {'avg_temp': 28.0, 'total_rain': 100.0, 'avg_humidity': 75.0}
             
-            # Filter weather data
-            province_weather = self.weather_df[
-                (self.weather_df['province'] == province) &
-                (self.weather_df['date'].dt.month == month)
-            ]
+            province_weather = self.weather_stats.get((province, month))
             
-            if len(province_weather) > 0:
-                return {
-                    'avg_temp': float(province_weather['temperature_celsius'].mean()),
-                    'total_rain': float(province_weather['rainfall_mm'].sum()),
-                    'avg_humidity': float(province_weather['humidity_percent'].mean())
-                }
+            if province_weather is not None:
+                return dict(province_weather)
             else:
                 return {'avg_temp': 28.0, 'total_rain': 100.0, 'avg_humidity': 75.0}
                 
@@ -251,20 +350,13 @@ class ModelAWrapper:
             Dict with avg_price, price_volatility
         """
         try:
-            if self.price_df is None:
+            if self.price_stats is None:
                 return {'avg_price': 50.0, 'price_volatility': 10.0}
             
-            # Filter price data
-            crop_price = self.price_df[
-                (self.price_df['province'] == province) &
-                (self.price_df['crop_type'] == crop_type)
-            ]
+            crop_price = self.price_stats.get((province, crop_type))
             
-            if len(crop_price) > 0:
-                return {
-                    'avg_price': float(crop_price['price_per_kg'].mean()),
-                    'price_volatility': float(crop_price['price_per_kg'].std())
-                }
+            if crop_price is not None:
+                return dict(crop_price)
             else:
                 return {'avg_price': 50.0, 'price_volatility': 10.0}
                 
@@ -400,6 +492,11 @@ class ModelAWrapper:
             weather_features = self.get_province_weather_features(province, month)
             logger.info(f"Weather for {province} in month {month}: {weather_features}")
             
+            # Materialized answer for in-grid inputs
+            result = self._stored_recommendations(province, water_availability, goal, month, weather_features)
+            if result is not None:
+                return result
+            
             # Use ML model with personalization
             return self._ml_recommendations_with_personalization(
                 province, soil_type, water_availability, budget_level, 
@@ -432,23 +529,7 @@ class ModelAWrapper:
                 "recommendations": []
             }
         
-        crops_df = self.crops_df.copy()
-        
-        # Apply filters (same as before)
-        if soil_type:
-            # Soil filtering logic...
-            pass
-        
-        if water_availability:
-            water_mapping = {
-                'น้ำฝน': ['ต่ำมาก', 'ต่ำ', 'ปานกลาง'],
-                'น้ำบาดาล': ['ต่ำ', 'ปานกลาง', 'สูง'],
-                'ชลประทาน': ['ต่ำมาก', 'ต่ำ', 'ปานกลาง', 'สูง', 'สูงมาก'],
-                'แม่น้ำ/คลอง': ['ปานกลาง', 'สูง', 'สูงมาก']
-            }
-            if water_availability in water_mapping:
-                allowed_water = water_mapping[water_availability]
-                crops_df = crops_df[crops_df['water_requirement'].isin(allowed_water)]
+        crops_df = self._filter_candidates(self.crops_df, soil_type, water_availability)
         
         if len(crops_df) == 0:
             return {
@@ -459,70 +540,64 @@ class ModelAWrapper:
                 "confidence": 0.0
             }
         
-        # Prepare recommendations
-        recommendations = []
+        # Score every candidate crop in one scaler / model call
+        try:
+            features, usable = self._candidate_features(crops_df, province, month)
+            predicted, scored = self._predict_roi(features, usable)
+        except Exception as e:
+            logger.warning(f"Error scoring crops: {e}")
+            predicted, scored = np.zeros(len(crops_df)), np.zeros(len(crops_df), dtype=bool)
         
-        # Base yields
-        base_yields = {
-            'ข้าว': 800, 'ข้าวโพด': 1000, 'อ้อย': 10000, 'มันสำปะหลัง': 3000,
-            'ถั่วเขียว': 400, 'ถั่วลิสง': 600, 'กระเทียม': 1200, 'หอมแดง': 1400,
-            'มะเขือเทศ': 3500, 'พริก': 2000, 'ถั่วฝักยาว': 1200, 'แตงโม': 4000
-        }
+        _, recommendations = self._build_recommendations(crops_df, province, predicted, np.flatnonzero(scored))
+        
+        if len(recommendations) == 0:
+            return {
+                "success": True,
+                "recommendations": [],
+                "message": "ไม่สามารถประมวลผลได้",
+                "model_used": "model_a_personalized",
+                "confidence": 0.0
+            }
+        
+        return self._personalized_response(recommendations, goal, month, weather_features)
+    
+    def _filter_candidates(self, crops_df, soil_type: str, water_availability: str):
+        """Candidate crops for the farmer's soil and water source"""
+        # Apply filters (same as before)
+        if soil_type:
+            # Soil filtering logic...
+            pass
+        
+        if water_availability in WATER_MAPPING:
+            allowed_water = WATER_MAPPING[water_availability]
+            crops_df = crops_df[crops_df['water_requirement'].isin(allowed_water)]
         
-        for idx, crop_row in crops_df.iterrows():
+        return crops_df.copy()
+    
+    def _build_recommendations(self, crops_df, province: str, predicted, rows):
+        """
+        Recommendation dicts for the given crops_df rows
+        
+        Args:
+            crops_df: Candidate crops
+            province: จังหวัด
+            predicted: Predicted ROI per crops_df row
+            rows: Positions in crops_df to build, in output order
+        
+        Returns:
+            (positions built, recommendation dicts) - a row that can't be
+            converted is skipped
+        """
+        built, recommendations = [], []
+        columns = {col: crops_df[col].tolist() for col in (
+            'crop_type', 'water_requirement', 'risk_level', 'growth_days', 'soil_preference', 'investment_cost'
+        )}
+        
+        for i in rows:
             try:
-                crop_name = crop_row['crop_type']
-                estimated_yield = base_yields.get(crop_name, 1000)
-                
-                # Prepare features for ML model (13 features)
-                current_month = month
-                plant_quarter = (current_month - 1) // 3 + 1
-                day_of_year = current_month * 30
-                
-                # Encode
-                province_encoded = 0
-                crop_encoded = 0
-                season_encoded = 0
-                
-                if self.encoders:
-                    try:
-                        if current_month in [11, 12, 1, 2]:
-                            season = 'winter'
-                        elif current_month in [3, 4, 5]:
-                            season = 'summer'
-                        else:
-                            season = 'rainy'
-                        
-                        province_encoded = self.encoders['province'].transform([province])[0] if province in self.encoders['province'].classes_ else 0
-                        crop_encoded = self.encoders['crop'].transform([crop_name])[0] if crop_name in self.encoders['crop'].classes_ else 0
-                        season_encoded = self.encoders['season'].transform([season])[0] if season in self.encoders['season'].classes_ else 0
-                    except:
-                        pass
-                
-                features = np.array([[
-                    float(current_month),
-                    float(plant_quarter),
-                    float(day_of_year),
-                    float(25),  # planting_area_rai
-                    float(0.5),  # farm_skill
-                    float(0.6),  # tech_adoption
-                    float(crop_row['growth_days']),
-                    float(crop_row['investment_cost']),
-                    float(crop_row.get('weather_sensitivity', 0.5)),
-                    float(crop_row.get('demand_elasticity', -0.5)),
-                    float(province_encoded),
-                    float(crop_encoded),
-                    float(season_encoded),
-                ]], dtype=np.float64)
-                
-                # Predict ROI
-                if self.scaler is not None:
-                    features_scaled = self.scaler.transform(features)
-                    predicted_roi = float(self.model.predict(features_scaled)[0])
-                else:
-                    predicted_roi = float(self.model.predict(features)[0])
-                
-                # Get price features
+                crop_name = columns['crop_type'][i]
+                estimated_yield = BASE_YIELDS.get(crop_name, 1000)
+                predicted_roi = float(predicted[i])
                 price_features = self.get_province_price_features(province, crop_name)
                 
                 recommendations.append({
@@ -530,36 +605,32 @@ class ModelAWrapper:
                     "predicted_roi": round(predicted_roi, 2),
                     "expected_yield_kg_per_rai": estimated_yield,
                     "estimated_revenue_per_rai": int(estimated_yield * (predicted_roi / 100) * 50),
-                    "water_requirement": crop_row['water_requirement'],
-                    "risk_level": crop_row['risk_level'],
-                    "growth_days": int(crop_row['growth_days']),
-                    "soil_preference": crop_row['soil_preference'],
-                    "investment_cost": int(crop_row['investment_cost']),
+                    "water_requirement": columns['water_requirement'][i],
+                    "risk_level": columns['risk_level'][i],
+                    "growth_days": int(columns['growth_days'][i]),
+                    "soil_preference": columns['soil_preference'][i],
+                    "investment_cost": int(columns['investment_cost'][i]),
                     "province": province,
                     "avg_price": price_features['avg_price'],
                     "price_volatility": price_features['price_volatility']
                 })
-                
+                built.append(int(i))
+            
             except Exception as e:
                 logger.warning(f"Error processing {crop_name}: {e}")
                 continue
         
-        if len(recommendations) == 0:
-            return {
-                "success": True,
-                "recommendations": [],
-                "message": "ไม่สามารถประมวลผลได้",
-                "model_used": "model_a_personalized",
-                "confidence": 0.0
-            }
-        
+        return built, recommendations
+    
+    def _personalized_response(self, recommendations: List[Dict], goal: str, month: int, weather_features: Dict) -> Dict[str, Any]:
+        """Goal weighting, ranking and the top-N response"""
         # Apply personalization
         logger.info(f"Applying personalization: goal={goal}, month={month}")
         recommendations = self.apply_goal_weighting(recommendations, goal, month)
         
         return {
             "success": True,
-            "recommendations": recommendations[:10],
+            "recommendations": recommendations[:TOP_N],
             "model_used": "model_a_personalized",
             "personalization": {
                 "goal": goal,
@@ -569,6 +640,231 @@ class ModelAWrapper:
             "confidence": 0.90
         }
     
+    def _candidate_features(self, crops_df, province: str, month: int):
+        """
+        Model A feature matrix (13 features) for every candidate crop
+        
+        Returns:
+            (features, usable) - rows whose growth_days / investment_cost or
+            other crop attributes are not numeric are marked unusable
+        """
+        import numpy as np
+        import pandas as pd
+        
+        n = len(crops_df)
+        
+        def numeric(column, default):
+            """Column as float64 and whether each value converts like float() does"""
+            if column not in crops_df.columns:
+                return np.full(n, default), np.ones(n, dtype=bool)
+            raw = crops_df[column]
+            values = pd.to_numeric(raw, errors='coerce').to_numpy(dtype=np.float64)
+            return values, ~np.isnan(values) | raw.isna().to_numpy()
+        
+        growth_days, growth_ok = numeric('growth_days', np.nan)
+        investment_cost, investment_ok = numeric('investment_cost', np.nan)
+        weather_sensitivity, weather_ok = numeric('weather_sensitivity', 0.5)
+        demand_elasticity, demand_ok = numeric('demand_elasticity', -0.5)
+        
+        # growth_days / investment_cost are also reported as ints
+        usable = (growth_ok & ~np.isnan(growth_days) & investment_ok & ~np.isnan(investment_cost)
+                  & weather_ok & demand_ok)
+        
+        if month in [11, 12, 1, 2]:
+            season = 'winter'
+        elif month in [3, 4, 5]:
+            season = 'summer'
+        else:
+            season = 'rainy'
+        
+        province_codes = self.encoder_index.get('province', {})
+        crop_codes = self.encoder_index.get('crop', {})
+        season_codes = self.encoder_index.get('season', {})
+        
+        features = np.empty((n, 13), dtype=np.float64)
+        features[:, 0] = month
+        features[:, 1] = (month - 1) // 3 + 1  # plant_quarter
+        features[:, 2] = month * 30  # day_of_year
+        features[:, 3] = 25  # planting_area_rai
+        features[:, 4] = 0.5  # farm_skill
+        features[:, 5] = 0.6  # tech_adoption
+        features[:, 6] = growth_days
+        features[:, 7] = investment_cost
+        features[:, 8] = weather_sensitivity
+        features[:, 9] = demand_elasticity
+        features[:, 10] = province_codes.get(province, 0)
+        features[:, 11] = [crop_codes.get(crop, 0) for crop in crops_df['crop_type']]
+        features[:, 12] = season_codes.get(season, 0)
+        
+        return features, usable
+    
+    def _predict_roi(self, features, usable):
+        """
+        Predicted ROI for every usable row
+        
+        Complete rows are scaled and predicted in one call; rows with missing
+        values go through the model one at a time, so one bad crop doesn't
+        fail the batch.
+        
+        Returns:
+            (predicted ROI, scored mask)
+        """
+        import numpy as np
+        
+        predicted = np.zeros(len(features))
+        scored = np.zeros(len(features), dtype=bool)
+        
+        batch = usable & np.isfinite(features).all(axis=1)
+        if batch.any():
+            X = features[batch]
+            if self.scaler is not None:
+                X = self.scaler.transform(X)
+            predicted[batch] = self.model.predict(X)
+            scored[batch] = True
+        
+        for i in np.flatnonzero(usable & ~batch):
+            try:
+                X = features[i:i + 1]
+                if self.scaler is not None:
+                    X = self.scaler.transform(X)
+                predicted[i] = float(self.model.predict(X)[0])
+                scored[i] = True
+            except Exception as e:
+                logger.warning(f"Error processing crop row {i}: {e}")
+        
+        return predicted, scored
+    
+    # ------------------------------------------------------------------
+    # Materialized recommendations
+    # ------------------------------------------------------------------
+    
+    @staticmethod
+    def _store_key(water_availability: str, goal: str) -> tuple:
+        """Grid (water, goal) a request maps to - values without an effect share one key"""
+        return (
+            water_availability if water_availability in WATER_MAPPING else None,
+            goal if goal in GOALS else None
+        )
+    
+    def _stored_recommendations(
+        self, province: str, water_availability: str, goal: str, month: int, weather_features: Dict
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Response from the recommendation store
+        
+        Returns:
+            The response, or None if the inputs are outside the stored grid
+        """
+        if self.recommendation_store is None:
+            return None
+        
+        try:
+            water, goal_key = self._store_key(water_availability, goal)
+            hit = self.recommendation_store.lookup(province, month, water, goal_key)
+            if hit is None:
+                return None
+            
+            ranked, predicted = hit
+            _, recommendations = self._build_recommendations(self.crops_df, province, predicted, ranked)
+            if len(recommendations) == 0:
+                return None
+            
+            return self._personalized_response(recommendations, goal, month, weather_features)
+        
+        except Exception as e:
+            logger.warning(f"Recommendation store lookup failed, using live inference: {e}")
+            return None
+    
+    def recommendation_store_version(self) -> str:
+        """Hash of the model files and the datasets behind the recommendations"""
+        from suitability_cube import file_digest
+        
+        models_dir = self.backend_dir / "models"
+        dataset_dir = self.backend_dir.parent / "buildingModel.py" / "Dataset"
+        digest = file_digest([
+            Path(str(self.model_path)),
+            models_dir / "model_a_scaler.pkl",
+            models_dir / "model_a_encoders.pkl",
+            dataset_dir / "crop_characteristics.csv",
+            dataset_dir / "cultivation.csv",
+            dataset_dir / "weather.csv",
+            dataset_dir / "price.csv"
+        ])
+        return f"{digest}-top{TOP_N}"
+    
+    def _load_recommendation_store(self):
+        """Memory-mapped store for the current model/data version, or None"""
+        try:
+            from config import RECOMMENDATION_STORE_ENABLED
+        except ImportError:
+            RECOMMENDATION_STORE_ENABLED = True
+        if not RECOMMENDATION_STORE_ENABLED or not self.model_loaded or self.crops_df is None:
+            return None
+        
+        try:
+            from recommendation_store import RecommendationStore
+            return RecommendationStore.load(RECOMMENDATION_STORE_NAME, self.recommendation_store_version())
+        except Exception as e:
+            logger.warning(f"⚠️ Could not load recommendation store: {e}")
+            return None
+    
+    def _store_provinces(self) -> List[str]:
+        """Provinces in the grid: the encoder's provinces plus any in the datasets"""
+        provinces = set(self.encoder_index.get('province', {}))
+        for table in (self.market_stats, self.weather_stats, self.price_stats):
+            provinces.update(key[0] for key in (table or {}))
+        return sorted(provinces, key=str)
+    
+    def build_recommendation_store(self):
+        """
+        Run Model A over every province x month x water x goal
+        
+        Returns:
+            RecommendationStore (save() it to serve from it)
+        """
+        import time
+        import numpy as np
+        from recommendation_store import RecommendationStore
+        
+        if not self.model_loaded or self.crops_df is None:
+            raise RuntimeError("Model A and crop_characteristics.csv are required to build the store")
+        
+        start = time.time()
+        crops_df = self.crops_df
+        provinces = self._store_provinces()
+        months = list(range(1, 13))
+        waters = [None] + list(WATER_MAPPING)
+        goals = [None] + GOALS
+        
+        allowed = {
+            water: self._filter_candidates(crops_df.assign(_position=np.arange(len(crops_df))), None, water)['_position'].to_numpy()
+            for water in waters
+        }
+        
+        predicted_roi = np.zeros((len(provinces), len(months), len(crops_df)), dtype=np.float64)
+        ranking = np.full((len(provinces), len(months), len(waters), len(goals), TOP_N), -1, dtype=np.int16)
+        
+        for i, province in enumerate(provinces):
+            for m, month in enumerate(months):
+                features, usable = self._candidate_features(crops_df, province, month)
+                predicted, scored = self._predict_roi(features, usable)
+                predicted_roi[i, m] = predicted
+                
+                for w, water in enumerate(waters):
+                    rows = allowed[water][scored[allowed[water]]]
+                    for g, goal in enumerate(goals):
+                        built, recommendations = self._build_recommendations(crops_df, province, predicted, rows)
+                        position = {id(rec): row for rec, row in zip(recommendations, built)}
+                        weighted = self.apply_goal_weighting(recommendations, goal, month)[:TOP_N]
+                        ranking[i, m, w, g, :len(weighted)] = [position[id(rec)] for rec in weighted]
+        
+        logger.info(f"✅ Evaluated {ranking.size // TOP_N} recommendation keys in {time.time() - start:.1f}s")
+        return RecommendationStore(
+            predicted_roi, ranking, provinces, months, waters, goals,
+            crops_df['crop_type'].tolist(), self.recommendation_store_version(),
+            metadata={'model_path': str(self.model_path), 'top_n': TOP_N}
+        )
+    
     def _calculate_suitability(self, predicted_roi, crop_row, soil_type, 
                                water_availability, budget_level, risk_tolerance):
         """Calculate suitability score"""
@@ -6,6 +6,7 @@ WeatherDataCache, ModelLoader, and FallbackManager
 
 import logging
 import pickle
+import warnings
 from pathlib import Path
 from typing import Dict, Optional, Tuple, List
 from datetime import datetime, timedelta
@@ -27,17 +28,27 @@ logger = logging.getLogger(__name__)
 # ============================================================================
 
 class WeatherDataCache:
-    """Cache weather data for fast access"""
+    """
+    Cache weather data for fast access
+    
+    Each province is held as a sorted datetime64 array plus one float array
+    per weather column; exact-date and trailing-window lookups are binary
+    searches, and the 12 monthly averages are computed once at load.
+    """
+    
+    COLUMNS = ('temperature_celsius', 'rainfall_mm', 'humidity_percent', 'drought_index')
+    RESULT_KEYS = ('temperature', 'rainfall', 'humidity', 'drought_index')
+    RECENT_DAYS = 7  # rows averaged when the exact date is missing
     
     def __init__(self, weather_csv_path: Path, config: ModelBConfig = None):
         self.weather_csv_path = weather_csv_path
         self.config = config or ModelBConfig()
         
         # Caches
-        self._cache: Dict[str, pd.DataFrame] = {}  # province -> dataframe
+        self._dates: Dict[str, np.ndarray] = {}  # province -> sorted datetime64[ns]
+        self._values: Dict[str, np.ndarray] = {}  # province -> (rows, len(COLUMNS)) float64
         self._monthly_cache: Dict[Tuple[str, int], Dict] = {}  # (province, month) -> weather dict
         self._loaded = False
-        self._df: Optional[pd.DataFrame] = None
     
     def load(self) -> bool:
         """
@@ -52,17 +63,25 @@ class WeatherDataCache:
                 return False
             
             # Load CSV
-            self._df = pd.read_csv(self.weather_csv_path, parse_dates=['date'])
-            logger.info(f"✅ Loaded weather data: {len(self._df)} records from {self.weather_csv_path}")
+            df = pd.read_csv(self.weather_csv_path, usecols=['province', 'date', *self.COLUMNS], parse_dates=['date'])
+            logger.info(f"✅ Loaded weather data: {len(df)} records from {self.weather_csv_path}")
+            
+            # Pre-cache by province as sorted arrays
+            df['date'] = pd.to_datetime(df['date'])
+            df = df.sort_values(['province', 'date'], kind='stable')
+            
+            dates, values, monthly = {}, {}, {}
+            for province, province_data in df.groupby('province', sort=False):
+                province_dates = province_data['date'].to_numpy(dtype='datetime64[ns]')
+                province_values = province_data[list(self.COLUMNS)].to_numpy(dtype=np.float64)
+                dates[province] = province_dates
+                values[province] = province_values
+                monthly.update(self._monthly_averages(province, province_dates, province_values))
             
-            # Pre-cache by province
-            for province in self._df['province'].unique():
-                province_data = self._df[self._df['province'] == province].copy()
-                province_data['date'] = pd.to_datetime(province_data['date'])
-                province_data = province_data.sort_values('date')
-                self._cache[province] = province_data
+            self._dates, self._values, self._monthly_cache = dates, values, monthly
             
-            logger.info(f"   Cached {len(self._cache)} provinces")
+            memory = sum(a.nbytes for a in dates.values()) + sum(a.nbytes for a in values.values())
+            logger.info(f"   Cached {len(self._dates)} provinces ({memory / 1e6:.1f} MB)")
             self._loaded = True
             return True
             
@@ -97,45 +116,41 @@ class WeatherDataCache:
             return None
         
         # Get province data from cache
-        if province not in self._cache:
+        if province not in self._dates:
             logger.warning(f"No weather data for province: {province}")
             return None
         
-        province_data = self._cache[province]
-        
         # If use_historical or date is in future, use monthly average
         if use_historical or date > pd.Timestamp.now():
             return self._get_monthly_average(province, date.month)
         
-        # Try exact date match
-        date_str = date.strftime('%Y-%m-%d')
-        exact_match = province_data[province_data['date'] == date_str]
+        dates = self._dates[province]
+        values = self._values[province]
         
-        if len(exact_match) > 0:
-            row = exact_match.iloc[0]
-            return {
-                'temperature': float(row['temperature_celsius']),
-                'rainfall': float(row['rainfall_mm']),
-                'humidity': float(row['humidity_percent']),
-                'drought_index': float(row['drought_index']),
-                'data_type': 'actual'
-            }
+        # Try exact date match
+        day = pd.Timestamp(date).normalize().to_datetime64()
+        pos = np.searchsorted(dates, day, side='left')
+        if pos < len(dates) and dates[pos] == day:
+            return self._to_weather(values[pos], 'actual')
         
         # Fall back to recent average (past 7 days)
-        past_data = province_data[province_data['date'] <= date].tail(7)
-        
-        if len(past_data) > 0:
-            return {
-                'temperature': float(past_data['temperature_celsius'].mean()),
-                'rainfall': float(past_data['rainfall_mm'].mean()),
-                'humidity': float(past_data['humidity_percent'].mean()),
-                'drought_index': float(past_data['drought_index'].mean()),
-                'data_type': 'recent_average'
-            }
+        hi = np.searchsorted(dates, pd.Timestamp(date).to_datetime64(), side='right')
+        if hi > 0:
+            with np.errstate(invalid='ignore'), warnings.catch_warnings():
+                warnings.simplefilter('ignore', RuntimeWarning)
+                recent = np.nanmean(values[max(0, hi - self.RECENT_DAYS):hi], axis=0)
+            return self._to_weather(recent, 'recent_average')
         
         # No data available
         return None
     
+    def _to_weather(self, row: np.ndarray, data_type: str) -> Dict:
+        """Weather dict from one row of column values"""
+        return {
+            **{key: float(value) for key, value in zip(self.RESULT_KEYS, row)},
+            'data_type': data_type
+        }
+    
     def _get_monthly_average(self, province: str, month: int) -> Optional[Dict]:
         """
         Get cached monthly average
@@ -147,51 +162,31 @@ class WeatherDataCache:
         Returns:
             Weather dict or None
         """
-        cache_key = (province, month)
-        
-        # Check cache
-        if cache_key in self._monthly_cache:
-            return self._monthly_cache[cache_key]
-        
-        # Calculate and cache
-        result = self._calculate_monthly_average(province, month)
-        if result:
-            self._monthly_cache[cache_key] = result
-        
-        return result
+        return self._monthly_cache.get((province, month))
     
-    def _calculate_monthly_average(self, province: str, month: int) -> Optional[Dict]:
+    def _monthly_averages(self, province: str, dates: np.ndarray, values: np.ndarray) -> Dict[Tuple[str, int], Dict]:
         """
-        Calculate monthly average from historical data
-        
-        Args:
-            province: Province name
-            month: Month number (1-12)
+        Average of every column per calendar month (NaNs skipped)
         
         Returns:
-            Weather dict or None
+            {(province, month): weather dict} for months with data
         """
-        if province not in self._cache:
-            return None
-        
-        province_data = self._cache[province].copy()
-        province_data['month'] = province_data['date'].dt.month
-        month_data = province_data[province_data['month'] == month]
-        
-        if len(month_data) == 0:
-            return None
-        
-        return {
-            'temperature': float(month_data['temperature_celsius'].mean()),
-            'rainfall': float(month_data['rainfall_mm'].mean()),
-            'humidity': float(month_data['humidity_percent'].mean()),
-            'drought_index': float(month_data['drought_index'].mean()),
-            'data_type': 'historical_average'
-        }
+        months = pd.DatetimeIndex(dates).month.to_numpy()
+        present = ~np.isnan(values)
+        
+        averages = {}
+        for month in np.unique(months):
+            in_month = months == month
+            counts = present[in_month].sum(axis=0)
+            sums = np.where(present[in_month], values[in_month], 0.0).sum(axis=0)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean = np.where(counts > 0, sums / counts, np.nan)
+            averages[(province, int(month))] = self._to_weather(mean, 'historical_average')
+        return averages
     
     def get_provinces(self) -> List[str]:
         """Get list of available provinces"""
-        return list(self._cache.keys())
+        return list(self._dates.keys())
 
 
 # ============================================================================
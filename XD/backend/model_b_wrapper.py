@@ -24,11 +24,144 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+from itertools import islice
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
+DATASET_DIR = Path(__file__).parent.parent / 'buildingModel.py' / 'Dataset'
+WEATHER_CSV_PATH = DATASET_DIR / 'weather.csv'
+CUBE_NAME = 'model_b'
+RAINY_DAY_MM = 0.1  # rainfall above this counts as a rainy day
+
+class WeatherWindowIndex:
+    """
+    Prefix sums over weather.csv for O(1) date-window aggregates
+    
+    Per province: date-sorted timestamps and cumulative sums/counts of
+    temperature, rainfall and rainy days, so a window's mean/sum/count is
+    the difference of two prefix entries found by binary search. Missing
+    values are skipped like pandas mean()/sum().
+    """
+    
+    def __init__(self, df: pd.DataFrame):
+        self._provinces: Dict[str, Dict[str, np.ndarray]] = {}
+        
+        for province, group in df.groupby('province', sort=False):
+            group = group.sort_values('date', kind='stable')
+            temp = group['temperature_celsius'].to_numpy(dtype=np.float64)
+            rain = group['rainfall_mm'].to_numpy(dtype=np.float64)
+            
+            self._provinces[province] = {
+                'dates': group['date'].to_numpy(dtype='datetime64[ns]'),
+                'temp_sum': self._prefix(np.nan_to_num(temp)),
+                'temp_count': self._prefix(~np.isnan(temp)),
+                'rain_sum': self._prefix(np.nan_to_num(rain)),
+                'rain_count': self._prefix(~np.isnan(rain)),
+                'rainy_days': self._prefix(rain > RAINY_DAY_MM),
+            }
+    
+    @staticmethod
+    def _prefix(values: np.ndarray) -> np.ndarray:
+        """Cumulative sum with a leading 0, so rows [lo, hi) sum to p[hi] - p[lo]"""
+        return np.concatenate([[0.0], np.cumsum(values, dtype=np.float64)])
+    
+    def __len__(self) -> int:
+        return len(self._provinces)
+    
+    @classmethod
+    def from_csv(cls, path: Optional[Path] = None) -> "WeatherWindowIndex":
+        df = pd.read_csv(path or WEATHER_CSV_PATH, usecols=['province', 'date', 'temperature_celsius', 'rainfall_mm'])
+        df['date'] = pd.to_datetime(df['date'])
+        return cls(df)
+    
+    def window(self, province: str, start: datetime, end: datetime) -> Optional[Dict[str, float]]:
+        """
+        Aggregates over start <= date <= end
+        
+        Returns:
+            {'avg_temp', 'avg_rainfall', 'total_rainfall', 'rainy_days', 'rows'}
+            or None if the province has no rows in the window
+        """
+        series = self._provinces.get(province)
+        if series is None:
+            return None
+        
+        dates = series['dates']
+        lo = np.searchsorted(dates, np.datetime64(start, 'ns'), side='left')
+        hi = np.searchsorted(dates, np.datetime64(end, 'ns'), side='right')
+        if hi <= lo:
+            return None
+        
+        def window_sum(key):
+            return float(series[key][hi] - series[key][lo])
+        
+        temp_count = window_sum('temp_count')
+        rain_count = window_sum('rain_count')
+        return {
+            'avg_temp': window_sum('temp_sum') / temp_count if temp_count else float('nan'),
+            'avg_rainfall': window_sum('rain_sum') / rain_count if rain_count else float('nan'),
+            'total_rainfall': window_sum('rain_sum'),
+            'rainy_days': window_sum('rainy_days'),
+            'rows': int(hi - lo)
+        }
+    
+    def windows(self, province: str, starts: np.ndarray, ends: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        window() for many date ranges at once (datetime64 arrays, inclusive)
+        
+        Returns:
+            Same keys as window(), as arrays; rows == 0 marks empty windows
+        """
+        n = len(starts)
+        series = self._provinces.get(province)
+        if series is None:
+            nan = np.full(n, np.nan)
+            return {'avg_temp': nan, 'avg_rainfall': nan.copy(), 'total_rainfall': np.zeros(n),
+                    'rainy_days': np.zeros(n), 'rows': np.zeros(n, dtype=np.int64)}
+        
+        dates = series['dates']
+        lo = np.searchsorted(dates, starts.astype('datetime64[ns]'), side='left')
+        hi = np.maximum(np.searchsorted(dates, ends.astype('datetime64[ns]'), side='right'), lo)
+        
+        def window_sum(key):
+            return series[key][hi] - series[key][lo]
+        
+        temp_count = window_sum('temp_count')
+        rain_count = window_sum('rain_count')
+        with np.errstate(invalid='ignore', divide='ignore'):
+            avg_temp = np.where(temp_count > 0, window_sum('temp_sum') / temp_count, np.nan)
+            avg_rainfall = np.where(rain_count > 0, window_sum('rain_sum') / rain_count, np.nan)
+        
+        return {
+            'avg_temp': avg_temp,
+            'avg_rainfall': avg_rainfall,
+            'total_rainfall': window_sum('rain_sum'),
+            'rainy_days': window_sum('rainy_days'),
+            'rows': hi - lo
+        }
+
+_weather_index: Optional[WeatherWindowIndex] = None
+_weather_index_lock = threading.Lock()
+
+def get_weather_index() -> WeatherWindowIndex:
+    """Process-wide weather index, built from weather.csv on first use"""
+    global _weather_index
+    if _weather_index is None:
+        with _weather_index_lock:
+            if _weather_index is None:
+                try:
+                    _weather_index = WeatherWindowIndex.from_csv()
+                    logger.info(f"✅ Weather window index built for {len(_weather_index)} provinces")
+                except Exception as e:
+                    logger.warning(f"⚠️ Weather dataset not available ({e}), using seasonal defaults")
+                    _weather_index = WeatherWindowIndex(pd.DataFrame(
+                        columns=['province', 'date', 'temperature_celsius', 'rainfall_mm']
+                    ))
+    return _weather_index
+
 class ModelBWrapper:
     """Wrapper for Model B - Planting Window Prediction"""
     
@@ -77,11 +210,26 @@ class ModelBWrapper:
         # Crop type mapping
         self.crop_type_mapping = self._create_crop_type_mapping()
         
+        # Precomputed province x crop x day cube (None -> live inference only)
+        self.cube = self._load_cube()
+        
         logger.info(f"✅ Model B loaded from {self.model_path}")
     
     def load_model(self):
         """Load trained model"""
         try:
+            # Exported ONNX model (MODEL_INFERENCE_BACKEND=onnx) - no unpickling
+            from onnx_backend import load_onnx_model, ScalerParams
+            onnx_model = load_onnx_model(self.model_path.stem)
+            if onnx_model:
+                self.model, metadata = onnx_model
+                scaler = metadata.get('scaler')
+                self.scaler = ScalerParams(scaler['mean'], scaler['scale']) if scaler else None
+                logger.info(f"✅ Model B loaded successfully (ONNX)")
+                logger.info(f"   Version: {metadata.get('version', 'unknown')}")
+                logger.info(f"   Algorithm: {metadata.get('algorithm', 'unknown')}")
+                return
+            
             with open(self.model_path, 'rb') as f:
                 model_wrapper = pickle.load(f)
             
@@ -109,6 +257,10 @@ class ModelBWrapper:
                 self.model = model_wrapper
                 self.scaler = None
                 logger.warning(f"⚠️ Model B loaded (old format - consider retraining)")
+            
+            # Optional packed-array evaluator (MODEL_INFERENCE_BACKEND=compiled)
+            from tree_evaluator import compile_for_serving
+            self.model = compile_for_serving(self.model, "Model B")
         except Exception as e:
             logger.error(f"❌ Failed to load Model B: {e}")
             raise
@@ -117,7 +269,7 @@ class ModelBWrapper:
         """Load crop characteristics from CSV dataset"""
         try:
             # Load from dataset
-            dataset_path = Path(__file__).parent.parent / 'buildingModel.py' / 'Dataset' / 'crop_characteristics.csv'
+            dataset_path = DATASET_DIR / 'crop_characteristics.csv'
             df = pd.read_csv(dataset_path)
             
             # Create mapping
@@ -164,7 +316,7 @@ class ModelBWrapper:
         """Create province to encoded mapping from cultivation dataset"""
         try:
             # Load from dataset
-            dataset_path = Path(__file__).parent.parent / 'buildingModel.py' / 'Dataset' / 'cultivation.csv'
+            dataset_path = DATASET_DIR / 'cultivation.csv'
             df = pd.read_csv(dataset_path)
             
             # Get unique provinces
@@ -227,35 +379,19 @@ class ModelBWrapper:
             Dict with weather features
         """
         try:
-            # Load weather dataset
-            dataset_path = Path(__file__).parent.parent / 'buildingModel.py' / 'Dataset' / 'weather.csv'
-            df = pd.read_csv(dataset_path)
-            df['date'] = pd.to_datetime(df['date'])
-            
             # Calculate date range (30 days before planting)
             end_date = planting_date - timedelta(days=1)
             start_date = end_date - timedelta(days=29)
             
-            # Filter data
-            mask = (
-                (df['province'] == province) &
-                (df['date'] >= start_date) &
-                (df['date'] <= end_date)
-            )
-            weather_data = df[mask]
+            # Prefix-sum lookup (weather.csv is indexed once per process)
+            window = get_weather_index().window(province, start_date, end_date)
             
-            if len(weather_data) > 0:
-                # Calculate features from actual data
-                avg_temp = weather_data['temperature_celsius'].mean()
-                total_rainfall = weather_data['rainfall_mm'].sum()
-                avg_rainfall = weather_data['rainfall_mm'].mean()
-                rainy_days = (weather_data['rainfall_mm'] > 0.1).sum()
-                
+            if window is not None:
                 return {
-                    'avg_temp_prev_30d': float(avg_temp),
-                    'avg_rainfall_prev_30d': float(avg_rainfall),
-                    'total_rainfall_prev_30d': float(total_rainfall),
-                    'rainy_days_prev_30d': float(rainy_days)
+                    'avg_temp_prev_30d': window['avg_temp'],
+                    'avg_rainfall_prev_30d': window['avg_rainfall'],
+                    'total_rainfall_prev_30d': window['total_rainfall'],
+                    'rainy_days_prev_30d': window['rainy_days']
                 }
             else:
                 # No data found, use seasonal defaults
@@ -265,30 +401,31 @@ class ModelBWrapper:
             logger.debug(f"⚠️ No historical weather data for {province} on {planting_date.date()}, using seasonal defaults")
             
             # Fallback to seasonal defaults
-            month = planting_date.month
-            season = self._get_season(month)
-            
-            if season == 'rainy':
-                return {
-                    'avg_temp_prev_30d': 28.0,
-                    'avg_rainfall_prev_30d': 150.0,
-                    'total_rainfall_prev_30d': 4500.0,
-                    'rainy_days_prev_30d': 20.0
-                }
-            elif season == 'summer':
-                return {
-                    'avg_temp_prev_30d': 32.0,
-                    'avg_rainfall_prev_30d': 50.0,
-                    'total_rainfall_prev_30d': 1500.0,
-                    'rainy_days_prev_30d': 8.0
-                }
-            else:  # winter
-                return {
-                    'avg_temp_prev_30d': 25.0,
-                    'avg_rainfall_prev_30d': 20.0,
-                    'total_rainfall_prev_30d': 600.0,
-                    'rainy_days_prev_30d': 5.0
-                }
+            return self._get_seasonal_weather_defaults(self._get_season(planting_date.month))
+    
+    def _get_seasonal_weather_defaults(self, season: str) -> Dict[str, float]:
+        """30-day weather features used when the dataset has no data for the window"""
+        if season == 'rainy':
+            return {
+                'avg_temp_prev_30d': 28.0,
+                'avg_rainfall_prev_30d': 150.0,
+                'total_rainfall_prev_30d': 4500.0,
+                'rainy_days_prev_30d': 20.0
+            }
+        elif season == 'summer':
+            return {
+                'avg_temp_prev_30d': 32.0,
+                'avg_rainfall_prev_30d': 50.0,
+                'total_rainfall_prev_30d': 1500.0,
+                'rainy_days_prev_30d': 8.0
+            }
+        else:  # winter
+            return {
+                'avg_temp_prev_30d': 25.0,
+                'avg_rainfall_prev_30d': 20.0,
+                'total_rainfall_prev_30d': 600.0,
+                'rainy_days_prev_30d': 5.0
+            }
     
     def prepare_features(
         self,
@@ -394,6 +531,17 @@ class ModelBWrapper:
             }
         """
         try:
+            if self.cube is not None:
+                # Cube lookup when it covers the date, one-row live pass otherwise
+                datetime.strptime(planting_date, '%Y-%m-%d')
+                result = self._predict_rows(
+                    np.array([crop_type], dtype=object),
+                    np.array([province], dtype=object),
+                    pd.to_datetime(pd.Series([planting_date]))
+                )[0]
+                result['features']['planting_date'] = planting_date
+                return result
+            
             # Prepare features
             X = self.prepare_features(crop_type, province, planting_date, db_session)
             
@@ -437,6 +585,325 @@ class ModelBWrapper:
             logger.error(f"❌ Prediction failed: {e}")
             raise
     
+    def prepare_features_batch(
+        self,
+        crop_type: str,
+        province: str,
+        planting_dates: List
+    ) -> pd.DataFrame:
+        """
+        prepare_features() for many planting dates of one crop/province
+        
+        Args:
+            crop_type: Crop type (e.g., 'พริก')
+            province: Province name (e.g., 'เชียงใหม่')
+            planting_dates: Dates (YYYY-MM-DD strings or datetimes)
+        
+        Returns:
+            DataFrame with one row of 17 features per date
+        """
+        dates = pd.to_datetime(pd.Series(list(planting_dates)), format='mixed')
+        n = len(dates)
+        return self._build_features(np.full(n, crop_type, dtype=object), np.full(n, province, dtype=object), dates)
+    
+    def _build_features(
+        self,
+        crop_types: np.ndarray,
+        provinces: np.ndarray,
+        dates: pd.Series,
+        weather_index: Optional[WeatherWindowIndex] = None
+    ) -> pd.DataFrame:
+        """
+        Feature matrix for per-row crop types, provinces and planting dates
+        
+        Weather windows come from one vectorized index lookup per province,
+        crop characteristics and encodings from one lookup per distinct
+        value, and the temporal features from array arithmetic, so the cost
+        barely grows with the number of rows.
+        """
+        n = len(dates)
+        default_chars = {'growth_days': 90, 'soil_preference': 'loam', 'seasonal_type': 'all_season'}
+        
+        # Planting days at midnight, like the YYYY-MM-DD strings of the single-date path
+        dates = dates.dt.normalize()
+        
+        month = dates.dt.month.to_numpy()
+        day_of_year = dates.dt.dayofyear.to_numpy()
+        season_by_month = {m: self._get_season(m) for m in range(1, 13)}
+        seasons = [season_by_month[m] for m in month]
+        
+        # 30-day windows ending the day before planting
+        planting = dates.to_numpy(dtype='datetime64[ns]')
+        ends = planting - np.timedelta64(1, 'D')
+        starts = ends - np.timedelta64(29, 'D')
+        
+        weather_columns = {
+            'avg_temp_prev_30d': np.empty(n),
+            'avg_rainfall_prev_30d': np.empty(n),
+            'total_rainfall_prev_30d': np.empty(n),
+            'rainy_days_prev_30d': np.empty(n)
+        }
+        rows = np.empty(n, dtype=np.int64)
+        province_encoded = np.empty(n, dtype=np.int64)
+        
+        index = weather_index if weather_index is not None else get_weather_index()
+        for province in pd.unique(provinces):
+            mask = provinces == province
+            weather = index.windows(province, starts[mask], ends[mask])
+            weather_columns['avg_temp_prev_30d'][mask] = weather['avg_temp']
+            weather_columns['avg_rainfall_prev_30d'][mask] = weather['avg_rainfall']
+            weather_columns['total_rainfall_prev_30d'][mask] = weather['total_rainfall']
+            weather_columns['rainy_days_prev_30d'][mask] = weather['rainy_days']
+            rows[mask] = weather['rows']
+            province_encoded[mask] = self.province_mapping.get(province, 0)
+        
+        for i in np.flatnonzero(rows == 0):
+            for name, value in self._get_seasonal_weather_defaults(seasons[i]).items():
+                weather_columns[name][i] = value
+        
+        growth_days = np.empty(n, dtype=np.int64)
+        crop_type_encoded = np.empty(n, dtype=np.int64)
+        soil_preference_encoded = np.empty(n, dtype=np.int64)
+        seasonal_type_encoded = np.empty(n, dtype=np.int64)
+        
+        for crop_type in pd.unique(crop_types):
+            mask = crop_types == crop_type
+            crop_chars = self.crop_characteristics.get(crop_type, default_chars)
+            growth_days[mask] = crop_chars['growth_days']
+            crop_type_encoded[mask] = self.crop_type_mapping.get(crop_type, 0)
+            soil_preference_encoded[mask] = self._get_soil_preference_encoded(crop_chars['soil_preference'])
+            seasonal_type_encoded[mask] = self._get_seasonal_type_encoded(crop_chars['seasonal_type'])
+        
+        features = {
+            'growth_days': growth_days,
+            **weather_columns,
+            'plant_month': month,
+            'plant_quarter': (month - 1) // 3 + 1,
+            'plant_day_of_year': day_of_year,
+            'month_sin': np.sin(2 * np.pi * month / 12),
+            'month_cos': np.cos(2 * np.pi * month / 12),
+            'day_sin': np.sin(2 * np.pi * day_of_year / 365),
+            'day_cos': np.cos(2 * np.pi * day_of_year / 365),
+            'crop_type_encoded': crop_type_encoded,
+            'province_encoded': province_encoded,
+            'season_encoded': np.array([self._get_season_encoded(s) for s in seasons], dtype=np.int64),
+            'soil_preference_encoded': soil_preference_encoded,
+            'seasonal_type_encoded': seasonal_type_encoded
+        }
+        
+        return pd.DataFrame(features)[self.required_features]
+    
+    def predict_calendar(
+        self,
+        crop_type: str,
+        province: str,
+        planting_dates: List
+    ) -> List[Dict[str, Any]]:
+        """
+        predict_planting_window() for many dates with one predict_proba call
+        
+        Args:
+            crop_type: Crop type (e.g., 'พริก')
+            province: Province name (e.g., 'เชียงใหม่')
+            planting_dates: Dates (YYYY-MM-DD strings or datetimes), e.g.
+                365 consecutive days for a daily calendar
+        
+        Returns:
+            One predict_planting_window()-style result per date, in order
+        """
+        if len(planting_dates) == 0:
+            return []
+        
+        dates = pd.to_datetime(pd.Series(list(planting_dates)), format='mixed')
+        n = len(dates)
+        crop_types = np.full(n, crop_type, dtype=object)
+        provinces = np.full(n, province, dtype=object)
+        return self._predict_rows(crop_types, provinces, dates)
+    
+    def _predict_rows(self, crop_types: np.ndarray, provinces: np.ndarray, dates: pd.Series) -> List[Dict[str, Any]]:
+        """
+        Predictions for rows, formatted like predict_planting_window()
+        
+        Rows the cube covers are looked up; the rest go through one
+        scaler/predict_proba pass.
+        """
+        n = len(dates)
+        dates = dates.reset_index(drop=True).dt.normalize()
+        month = dates.dt.month.to_numpy()
+        season_encoded = np.array([self._get_season_encoded(self._get_season(m)) for m in range(1, 13)])[month - 1]
+        
+        proba_good = np.empty(n)
+        proba_bad = np.empty(n)
+        is_good = np.empty(n, dtype=bool)
+        avg_temp = np.empty(n)
+        avg_rainfall = np.empty(n)
+        
+        hit = self._lookup_cube(crop_types, provinces, dates, proba_good, is_good)
+        if hit.any():
+            proba_bad[hit] = 1.0 - proba_good[hit]
+            
+            # Cube cells were evaluated with the seasonal weather defaults
+            for code, season in enumerate(['summer', 'rainy', 'winter']):
+                rows = hit & (season_encoded == code)
+                defaults = self._get_seasonal_weather_defaults(season)
+                avg_temp[rows] = defaults['avg_temp_prev_30d']
+                avg_rainfall[rows] = defaults['avg_rainfall_prev_30d']
+        
+        miss = ~hit
+        if miss.any():
+            X = self._build_features(crop_types[miss], provinces[miss], dates[miss].reset_index(drop=True))
+            X_scaled = self.scaler.transform(X) if self.scaler is not None else X
+            
+            probabilities = np.asarray(self.model.predict_proba(X_scaled), dtype=np.float64)
+            classes = np.asarray(getattr(self.model, 'classes_', [0, 1]))
+            proba_good[miss] = probabilities[:, 1]
+            proba_bad[miss] = probabilities[:, 0]
+            is_good[miss] = classes[np.argmax(probabilities, axis=1)] == 1
+            avg_temp[miss] = X['avg_temp_prev_30d'].to_numpy()
+            avg_rainfall[miss] = X['avg_rainfall_prev_30d'].to_numpy()
+        
+        date_strings = dates.dt.strftime('%Y-%m-%d').tolist()
+        season_names = ['summer', 'rainy', 'winter']
+        
+        results = []
+        for i, date_str in enumerate(date_strings):
+            is_good_window = bool(is_good[i])
+            confidence = float(proba_good[i])
+            
+            results.append({
+                'is_good_window': is_good_window,
+                'confidence': confidence,
+                'probability': {
+                    'good': confidence,
+                    'bad': float(proba_bad[i])
+                },
+                'recommendation': self._get_recommendation(is_good_window, confidence),
+                'reason': self._format_reason(avg_temp[i], avg_rainfall[i], int(season_encoded[i])),
+                'features': {
+                    'crop_type': crop_types[i],
+                    'province': provinces[i],
+                    'planting_date': date_str,
+                    'season': season_names[int(season_encoded[i])],
+                    'avg_temp': float(avg_temp[i]),
+                    'avg_rainfall': float(avg_rainfall[i])
+                }
+            })
+        
+        return results
+    
+    # ------------------------------------------------------------------
+    # Suitability cube
+    # ------------------------------------------------------------------
+    
+    @staticmethod
+    def _cube_date_key(day) -> tuple:
+        """The part of a planting date the features depend on (without weather rows)"""
+        return (day.month, day.timetuple().tm_yday)
+    
+    def cube_version(self) -> str:
+        """Hash of the model file and the datasets behind the features"""
+        from suitability_cube import file_digest
+        return file_digest([
+            self.model_path,
+            WEATHER_CSV_PATH,
+            DATASET_DIR / 'crop_characteristics.csv',
+            DATASET_DIR / 'cultivation.csv'
+        ])
+    
+    def _load_cube(self):
+        """Memory-mapped cube for the current model/data version, or None"""
+        try:
+            from config import SUITABILITY_CUBE_ENABLED
+        except ImportError:
+            SUITABILITY_CUBE_ENABLED = True
+        if not SUITABILITY_CUBE_ENABLED:
+            return None
+        
+        from suitability_cube import SuitabilityCube
+        return SuitabilityCube.load(CUBE_NAME, self.cube_version())
+    
+    def _lookup_cube(
+        self,
+        crop_types: np.ndarray,
+        provinces: np.ndarray,
+        dates: pd.Series,
+        proba_good: np.ndarray,
+        is_good: np.ndarray
+    ) -> np.ndarray:
+        """
+        Fill proba_good/is_good for rows the cube answers
+        
+        The cube holds predictions made with the seasonal weather defaults,
+        so it only answers dates whose 30-day window has no weather rows
+        (e.g. future dates) - exactly when live inference uses those defaults.
+        
+        Returns:
+            Boolean mask of the rows filled in
+        """
+        hit = np.zeros(len(dates), dtype=bool)
+        if self.cube is None:
+            return hit
+        
+        planting = dates.to_numpy(dtype='datetime64[ns]')
+        ends = planting - np.timedelta64(1, 'D')
+        starts = ends - np.timedelta64(29, 'D')
+        index = get_weather_index()
+        date_keys = list(zip(dates.dt.month.tolist(), dates.dt.dayofyear.tolist()))
+        
+        for province in pd.unique(provinces):
+            in_province = provinces == province
+            no_weather = np.zeros(len(dates), dtype=bool)
+            no_weather[in_province] = index.windows(province, starts[in_province], ends[in_province])['rows'] == 0
+            
+            for crop_type in pd.unique(crop_types[no_weather]):
+                rows = np.flatnonzero(no_weather & (crop_types == crop_type))
+                keys = [date_keys[i] for i in rows]
+                values = self.cube.lookup(province, crop_type, keys)
+                if values is None:
+                    continue
+                proba_good[rows] = values['proba_good']
+                is_good[rows] = values['is_good'].astype(bool)
+                hit[rows] = True
+        
+        return hit
+    
+    def build_cube(self):
+        """
+        Evaluate the model over every province x crop x calendar day
+        
+        Returns:
+            SuitabilityCube (save() it to serve from it)
+        """
+        from suitability_cube import build_cube
+        
+        no_weather = WeatherWindowIndex(pd.DataFrame(columns=['province', 'date', 'temperature_celsius', 'rainfall_mm']))
+        classes = np.asarray(getattr(self.model, 'classes_', [0, 1]))
+        
+        def evaluate(province, crops, dates):
+            crop_types = np.repeat(np.array(crops, dtype=object), len(dates))
+            X = self._build_features(
+                crop_types,
+                np.full(len(crop_types), province, dtype=object),
+                pd.to_datetime(pd.Series(list(dates) * len(crops))),
+                weather_index=no_weather
+            )
+            X_scaled = self.scaler.transform(X) if self.scaler is not None else X
+            probabilities = np.asarray(self.model.predict_proba(X_scaled), dtype=np.float64)
+            return {
+                'proba_good': probabilities[:, 1],
+                'is_good': classes[np.argmax(probabilities, axis=1)] == 1
+            }
+        
+        return build_cube(
+            rows=list(self.province_mapping),
+            crops=list(self.crop_characteristics),
+            date_key=self._cube_date_key,
+            evaluate=evaluate,
+            dtypes={'proba_good': np.float16, 'is_good': np.uint8},
+            version=self.cube_version(),
+            metadata={'model_path': str(self.model_path), 'date_key': ['month', 'day_of_year']}
+        )
+    
     def _get_recommendation(self, is_good_window: bool, confidence: float) -> str:
         """Generate recommendation text"""
         if is_good_window:
@@ -456,9 +923,15 @@ class ModelBWrapper:
     
     def _get_reason(self, is_good_window: bool, confidence: float, X: pd.DataFrame) -> str:
         """Generate reason text"""
-        temp = X['avg_temp_prev_30d'].values[0]
-        rainfall = X['avg_rainfall_prev_30d'].values[0]
-        season = ['summer', 'rainy', 'winter'][int(X['season_encoded'].values[0])]
+        return self._format_reason(
+            X['avg_temp_prev_30d'].values[0],
+            X['avg_rainfall_prev_30d'].values[0],
+            int(X['season_encoded'].values[0])
+        )
+    
+    def _format_reason(self, temp: float, rainfall: float, season_encoded: int) -> str:
+        """Reason text from the 30-day weather and season of one prediction"""
+        season = ['summer', 'rainy', 'winter'][season_encoded]
         
         reasons = []
         
@@ -486,33 +959,100 @@ class ModelBWrapper:
         db_session = None
     ) -> list:
         """
-        Predict for multiple records
+        Predict for multiple records with one feature matrix and one
+        scaler/predict_proba pass
         
         Args:
             data: List of dicts with crop_type, province, planting_date
-            db_session: Database session (optional)
+            db_session: Database session (optional, unused - weather comes
+                from the in-memory index)
         
         Returns:
-            List of prediction results
+            List of prediction results in input order; invalid records get
+            {'error': str, 'record': record} without failing the batch
         """
-        results = []
-        for record in data:
+        results: List[Optional[Dict[str, Any]]] = [None] * len(data)
+        valid_positions, crop_types, provinces, dates = [], [], [], []
+        
+        for position, record in enumerate(data):
+            error = self._validate_record(record)
+            if error:
+                results[position] = {'error': error, 'record': record}
+                continue
+            valid_positions.append(position)
+            crop_types.append(record['crop_type'])
+            provinces.append(record['province'])
+            dates.append(record['planting_date'])
+        
+        if valid_positions:
             try:
-                result = self.predict_planting_window(
-                    crop_type=record['crop_type'],
-                    province=record['province'],
-                    planting_date=record['planting_date'],
-                    db_session=db_session
+                predictions = self._predict_rows(
+                    np.array(crop_types, dtype=object),
+                    np.array(provinces, dtype=object),
+                    pd.to_datetime(pd.Series(dates), format='mixed')
                 )
-                results.append(result)
+                for position, prediction in zip(valid_positions, predictions):
+                    results[position] = prediction
             except Exception as e:
-                logger.error(f"❌ Batch prediction failed for {record}: {e}")
-                results.append({
-                    'error': str(e),
-                    'record': record
-                })
+                logger.error(f"❌ Batch prediction failed for {len(valid_positions)} records: {e}")
+                for position in valid_positions:
+                    results[position] = {'error': str(e), 'record': data[position]}
+        
+        failed = len(data) - len(valid_positions)
+        if failed:
+            logger.warning(f"⚠️ Batch prediction: {failed}/{len(data)} records rejected")
         
         return results
+    
+    def predict_batch_stream(
+        self,
+        records: Iterable[Dict[str, Any]],
+        chunk_size: int = 5000
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        predict_batch() over an iterable of any size, chunk by chunk
+        
+        At most chunk_size records (and their feature rows) are held in
+        memory at a time.
+        
+        Args:
+            records: Iterable of dicts with crop_type, province, planting_date
+            chunk_size: Records per predict_proba pass
+        
+        Yields:
+            Prediction results (or error dicts) in input order
+        """
+        records = iter(records)
+        while True:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                return
+            yield from self.predict_batch(chunk)
+    
+    @staticmethod
+    def _validate_record(record: Any) -> Optional[str]:
+        """Error message for an invalid batch record, or None"""
+        if not isinstance(record, dict):
+            return "Record must be a dict"
+        
+        missing = [key for key in ('crop_type', 'province', 'planting_date') if not record.get(key)]
+        if missing:
+            return f"Missing fields: {', '.join(missing)}"
+        
+        for key in ('crop_type', 'province'):
+            if not isinstance(record[key], str):
+                return f"{key} must be a string"
+        
+        planting_date = record['planting_date']
+        if isinstance(planting_date, str):
+            try:
+                datetime.strptime(planting_date, '%Y-%m-%d')
+            except ValueError:
+                return f"Invalid planting_date '{planting_date}', expected YYYY-MM-DD"
+        elif not isinstance(planting_date, datetime):
+            return "planting_date must be a YYYY-MM-DD string or datetime"
+        
+        return None
 
 # Singleton instance
 _model_b_instance = None
@@ -5,11 +5,10 @@ Supports both v7 (old) and v8 (new improved) models
 """
 
 import logging
-import pickle
 import sys
 import os
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 import numpy as np
 
@@ -51,6 +50,7 @@ class ModelCWrapper:
         """Load v8.0 improved models"""
         try:
             import json
+            from onnx_backend import load_estimator
             
             models_dir = Path(__file__).parent / "models"
             
@@ -66,18 +66,14 @@ class ModelCWrapper:
             if not all([model_low_path.exists(), model_medium_path.exists(), model_high_path.exists()]):
                 return False
             
-            # Load stratified models
-            with open(model_low_path, 'rb') as f:
-                self.model_low = pickle.load(f)
-            with open(model_medium_path, 'rb') as f:
-                self.model_medium = pickle.load(f)
-            with open(model_high_path, 'rb') as f:
-                self.model_high = pickle.load(f)
+            # Load stratified models (ONNX when exported and MODEL_INFERENCE_BACKEND=onnx)
+            self.model_low = load_estimator(model_low_path)
+            self.model_medium = load_estimator(model_medium_path)
+            self.model_high = load_estimator(model_high_path)
             
             # Load fallback model
             if fallback_path.exists():
-                with open(fallback_path, 'rb') as f:
-                    self.model_fallback = pickle.load(f)
+                self.model_fallback = load_estimator(fallback_path)
                 logger.info("✅ Loaded fallback model")
             else:
                 self.model_fallback = None
@@ -114,6 +110,8 @@ class ModelCWrapper:
                 self.training_date = "unknown"
                 self.model_metrics = {}
             
+            self._compile_models()
+            
             self.model_path = str(models_dir)
             self.model_loaded = True
             
@@ -139,6 +137,7 @@ class ModelCWrapper:
         """Load v7.0 models (fallback)"""
         try:
             import json
+            from onnx_backend import load_estimator
             
             models_dir = Path(__file__).parent / "models"
             
@@ -154,13 +153,10 @@ class ModelCWrapper:
                 self.model_loaded = False
                 return
             
-            # Load all 3 models
-            with open(model_low_path, 'rb') as f:
-                self.model_low = pickle.load(f)
-            with open(model_medium_path, 'rb') as f:
-                self.model_medium = pickle.load(f)
-            with open(model_high_path, 'rb') as f:
-                self.model_high = pickle.load(f)
+            # Load all 3 models (ONNX when exported and MODEL_INFERENCE_BACKEND=onnx)
+            self.model_low = load_estimator(model_low_path)
+            self.model_medium = load_estimator(model_medium_path)
+            self.model_high = load_estimator(model_high_path)
             
             self.model_fallback = None  # v7 doesn't have fallback
             
@@ -199,6 +195,8 @@ class ModelCWrapper:
                 self.training_date = "unknown"
                 self.model_metrics = {}
             
+            self._compile_models()
+            
             self.model_path = str(models_dir)
             self.model_loaded = True
             
@@ -218,13 +216,23 @@ class ModelCWrapper:
             self.model = None
 
     
+    def _compile_models(self):
+        """Swap in packed-array evaluators when MODEL_INFERENCE_BACKEND=compiled"""
+        from tree_evaluator import compile_for_serving
+        
+        self.model_low = compile_for_serving(self.model_low, "Model C LOW")
+        self.model_medium = compile_for_serving(self.model_medium, "Model C MEDIUM")
+        self.model_high = compile_for_serving(self.model_high, "Model C HIGH")
+        self.model_fallback = compile_for_serving(self.model_fallback, "Model C FALLBACK")
+    
     def predict_price(
         self,
         crop_type: str,
         province: str,
         days_ahead: int = 30,
         planting_area_rai: Optional[float] = None,
-        expected_yield_kg: Optional[float] = None
+        expected_yield_kg: Optional[float] = None,
+        use_cache: bool = True
     ) -> Dict[str, Any]:
         """
         Predict crop price for future dates using Model C
@@ -235,61 +243,66 @@ class ModelCWrapper:
             days_ahead: Number of days ahead to predict (7, 30, 90, or 180)
             planting_area_rai: Planting area in rai (optional)
             expected_yield_kg: Expected yield in kg (optional)
+            use_cache: Serve the precomputed forecast when it is still valid
         
         Returns:
             Dictionary with price predictions, trends, and insights
         """
+        if use_cache:
+            cached = self._predict_from_cache(crop_type, province, days_ahead)
+            if cached:
+                return cached
+        
         try:
-            # Check data availability FIRST
             from data_availability_checker import data_checker
-            
-            availability = data_checker.check_crop_province_availability(
-                crop_type, province, min_records=30
-            )
-            
-            if not availability["available"]:
-                logger.warning(f"❌ {availability['message']}")
-                return {
-                    "success": False,
-                    "error": "DATA_NOT_AVAILABLE",
-                    "message": availability["message"],
-                    "crop_type": crop_type,
-                    "province": province,
-                    "suggestions": availability["suggestions"],
-                    "available_provinces": availability["suggestions"][:5] if availability["suggestions"] else []
-                }
-            
-            logger.info(f"✅ {availability['message']}")
-            
-            if not self.model_loaded:
-                logger.error("Model not loaded")
-                return {
-                    "success": False,
-                    "error": "MODEL_NOT_LOADED",
-                    "message": "Model C ยังไม่พร้อมใช้งาน",
-                    "crop_type": crop_type,
-                    "province": province
-                }
-            
-            # Get database session
             from database import SessionLocal
+            
+            # One session for the whole request
             db = SessionLocal()
             
             try:
-                # Get current price from database
-                from database import CropPrice
-                current_price_query = db.query(CropPrice).filter(
-                    CropPrice.province == province,
-                    CropPrice.crop_type == crop_type
-                ).order_by(CropPrice.date.desc()).first()
+                # Load count, latest date, latest price and the last 90 prices
+                # in a single round trip, then reuse that context in every stage
+                context = data_checker.load_price_context(
+                    crop_type, province, min_records=30, history_limit=90, db=db
+                )
+                
+                # Check data availability FIRST
+                availability = context["availability"]
+                
+                if not availability["available"]:
+                    logger.warning(f"❌ {availability['message']}")
+                    return {
+                        "success": False,
+                        "error": "DATA_NOT_AVAILABLE",
+                        "message": availability["message"],
+                        "crop_type": crop_type,
+                        "province": province,
+                        "suggestions": availability["suggestions"],
+                        "available_provinces": availability["suggestions"][:5] if availability["suggestions"] else []
+                    }
+                
+                logger.info(f"✅ {availability['message']}")
+                
+                if not self.model_loaded:
+                    logger.error("Model not loaded")
+                    return {
+                        "success": False,
+                        "error": "MODEL_NOT_LOADED",
+                        "message": "Model C ยังไม่พร้อมใช้งาน",
+                        "crop_type": crop_type,
+                        "province": province
+                    }
                 
-                current_price = float(current_price_query.price_per_kg) if current_price_query else None
+                # Current price from the latest record
+                current_price = context["current_price"]
                 
                 # Use appropriate model version
                 logger.info(f"Using Model C {self.model_version} ({self.algorithm}) for prediction")
                 
-                # Load historical data for feature engineering
-                historical_prices = self._get_historical_prices(crop_type, province, days=90)
+                # Historical data for feature engineering (already loaded)
+                historical_prices = context["historical_prices"]
+                logger.info(f"✅ Got {len(historical_prices)} historical prices for {crop_type} in {province}")
                 
                 if not historical_prices or len(historical_prices) < 7:
                     logger.error(f"❌ Insufficient historical data: {len(historical_prices) if historical_prices else 0} records")
@@ -336,47 +349,23 @@ class ModelCWrapper:
                         "province": province
                     }
                 
-                # Analyze trend
                 if not current_price:
                     current_price = predictions[0]["predicted_price"]
                 
-                trend_analysis = self._analyze_price_trend(current_price, predictions)
-                
                 # Use historical data from model
                 historical_data = model_historical_data if model_historical_data else []
                 
-                # If no historical data from model, try to get from database
+                # If no historical data from model, use the records already loaded
                 if not historical_data:
-                    try:
-                        historical_records = db.query(CropPrice).filter(
-                            CropPrice.province == province,
-                            CropPrice.crop_type == crop_type
-                        ).order_by(CropPrice.date.desc()).limit(30).all()
-                    
-                        for record in reversed(historical_records):
-                            historical_data.append({
-                                "date": record.date.strftime("%Y-%m-%d"),
-                                "price": float(record.price_per_kg)
-                            })
-                    except Exception as e:
-                        logger.warning(f"Could not fetch historical data for chart: {e}")
-                
-                return {
-                    "success": True,
-                    "crop_type": crop_type,
-                    "province": province,
-                    "predictions": predictions,
-                    "historical_data": historical_data,
-                    "daily_forecasts": daily_forecasts,
-                    "current_price": round(float(current_price), 2),
-                    "price_trend": trend_analysis["trend"],
-                    "trend_percentage": trend_analysis["percentage"],
-                    "market_insights": self._generate_market_insights(crop_type, predictions, trend_analysis),
-                    "best_selling_period": self._recommend_selling_period(predictions),
-                    "model_used": f"model_c_v{self.model_version}_{self.algorithm}",
-                    "model_version": self.model_version,
-                    "confidence": round(np.mean([p["confidence"] for p in predictions]), 2)
-                }
+                    for record in reversed(context["history"][:30]):
+                        historical_data.append({
+                            "date": record["date"].strftime("%Y-%m-%d"),
+                            "price": record["price"]
+                        })
+                
+                return self._build_price_result(
+                    crop_type, province, current_price, predictions, daily_forecasts, historical_data
+                )
                 
             finally:
                 db.close()
@@ -393,6 +382,188 @@ class ModelCWrapper:
                 "province": province
             }
     
+    def _predict_from_cache(self, crop_type: str, province: str, days_ahead: int) -> Optional[Dict[str, Any]]:
+        """Build a predict_price result from the precomputed forecast, if valid"""
+        from forecast_cache import forecast_cache, HORIZON_DAYS
+        
+        if days_ahead > HORIZON_DAYS:
+            return None
+        
+        forecast = forecast_cache.get(crop_type, province)
+        if not forecast:
+            return None
+        
+        # Every horizon is a prefix of the stored HORIZON_DAYS forecast
+        predictions = [p for p in forecast["predictions"] if p["days_ahead"] <= days_ahead]
+        if not predictions:
+            return None
+        
+        logger.info(f"✅ Serving precomputed forecast for {crop_type} in {province}")
+        return self._build_price_result(
+            crop_type, province, forecast["current_price"], predictions,
+            forecast["daily_forecasts"][:days_ahead], forecast["historical_data"]
+        )
+    
+    def predict_prices_batch(
+        self,
+        pairs: List[Tuple[str, str]],
+        days_ahead: int = 30
+    ) -> List[Dict[str, Any]]:
+        """
+        Predict prices for many (crop_type, province) pairs at once
+        
+        Availability and price history for all pairs are fetched with a few
+        bulk queries, and the feature rows of every pair are stacked so each
+        price stratum model runs a single predict for the whole batch.
+        
+        Args:
+            pairs: List of (crop_type, province)
+            days_ahead: Number of days ahead to predict
+        
+        Returns:
+            One result per pair (same order), each shaped like predict_price()
+        """
+        pairs = [(crop_type, province) for crop_type, province in pairs]
+        unique_pairs = list(dict.fromkeys(pairs))
+        results: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        
+        try:
+            from data_availability_checker import data_checker
+            
+            availability = data_checker.check_bulk_availability(unique_pairs, min_records=30)
+            
+            ready_pairs = []
+            for crop_type, province in unique_pairs:
+                pair_availability = availability[(crop_type, province)]
+                if not pair_availability["available"]:
+                    results[(crop_type, province)] = {
+                        "success": False,
+                        "error": "DATA_NOT_AVAILABLE",
+                        "message": pair_availability["message"],
+                        "crop_type": crop_type,
+                        "province": province,
+                        "suggestions": pair_availability["suggestions"],
+                        "available_provinces": pair_availability["suggestions"][:5] if pair_availability["suggestions"] else []
+                    }
+                elif not self.model_loaded:
+                    results[(crop_type, province)] = {
+                        "success": False,
+                        "error": "MODEL_NOT_LOADED",
+                        "message": "Model C ยังไม่พร้อมใช้งาน",
+                        "crop_type": crop_type,
+                        "province": province
+                    }
+                else:
+                    ready_pairs.append((crop_type, province))
+            
+            histories = self._get_historical_prices_bulk(ready_pairs, limit=90)
+            
+            # Build every pair's feature row, then predict them all together
+            blocks = []
+            batch_pairs = []
+            for crop_type, province in ready_pairs:
+                current_price, historical_prices = histories.get((crop_type, province), (None, []))
+                
+                if len(historical_prices) < 7:
+                    results[(crop_type, province)] = {
+                        "success": False,
+                        "error": "INSUFFICIENT_DATA",
+                        "message": f"ข้อมูลไม่เพียงพอสำหรับการทำนาย (มีเพียง {len(historical_prices)} records, ต้องการอย่างน้อย 7)",
+                        "crop_type": crop_type,
+                        "province": province,
+                        "record_count": len(historical_prices)
+                    }
+                    continue
+                
+                if len(historical_prices) < 30:
+                    logger.warning(f"Insufficient historical data: {len(historical_prices)} prices")
+                    results[(crop_type, province)] = {
+                        "success": False,
+                        "error": "PREDICTION_FAILED",
+                        "message": "ไม่สามารถสร้างการทำนายได้",
+                        "crop_type": crop_type,
+                        "province": province
+                    }
+                    continue
+                
+                if not current_price:
+                    current_price = historical_prices[0]
+                
+                features = self._create_features(historical_prices[::-1], current_price)
+                blocks.append(self._feature_row(features))
+                batch_pairs.append((crop_type, province, current_price, historical_prices))
+            
+            if batch_pairs:
+                X_batch = np.vstack(blocks)
+                row_prices = np.array([item[2] for item in batch_pairs], dtype=np.float64)
+                batch_prices = self._predict_rows(X_batch, row_prices)
+                
+                for i, (crop_type, province, current_price, historical_prices) in enumerate(batch_pairs):
+                    horizon_prices = np.full(days_ahead, batch_prices[i])
+                    model_result = self._assemble_forecast(horizon_prices, historical_prices)
+                    
+                    if not model_result["predictions"]:
+                        results[(crop_type, province)] = {
+                            "success": False,
+                            "error": "PREDICTION_FAILED",
+                            "message": "ไม่สามารถสร้างการทำนายได้",
+                            "crop_type": crop_type,
+                            "province": province
+                        }
+                        continue
+                    
+                    results[(crop_type, province)] = self._build_price_result(
+                        crop_type, province, current_price,
+                        model_result["predictions"],
+                        model_result["daily_forecasts"],
+                        model_result["historical_data"]
+                    )
+            
+        except Exception as e:
+            logger.error(f"❌ Error in predict_prices_batch: {e}")
+            import traceback
+            logger.error(traceback.format_exc())
+            for crop_type, province in unique_pairs:
+                if (crop_type, province) not in results:
+                    results[(crop_type, province)] = {
+                        "success": False,
+                        "error": "INTERNAL_ERROR",
+                        "message": f"เกิดข้อผิดพลาดภายใน: {str(e)}",
+                        "crop_type": crop_type,
+                        "province": province
+                    }
+        
+        return [results[pair] for pair in pairs]
+    
+    def _build_price_result(
+        self,
+        crop_type: str,
+        province: str,
+        current_price: float,
+        predictions: List[Dict],
+        daily_forecasts: List[Dict],
+        historical_data: List[Dict]
+    ) -> Dict[str, Any]:
+        """Build the successful predict_price response"""
+        trend_analysis = self._analyze_price_trend(current_price, predictions)
+        
+        return {
+            "success": True,
+            "crop_type": crop_type,
+            "province": province,
+            "predictions": predictions,
+            "historical_data": historical_data,
+            "daily_forecasts": daily_forecasts,
+            "current_price": round(float(current_price), 2),
+            "price_trend": trend_analysis["trend"],
+            "trend_percentage": trend_analysis["percentage"],
+            "market_insights": self._generate_market_insights(crop_type, predictions, trend_analysis),
+            "best_selling_period": self._recommend_selling_period(predictions),
+            "model_used": f"model_c_v{self.model_version}_{self.algorithm}",
+            "model_version": self.model_version,
+            "confidence": round(np.mean([p["confidence"] for p in predictions]), 2)
+        }
+    
     def _predict_with_stratified_model(
         self,
         crop_type: str,
@@ -403,9 +574,6 @@ class ModelCWrapper:
     ) -> Dict:
         """Make predictions using stratified models with fallback"""
         try:
-            import pandas as pd
-            from datetime import datetime, timedelta
-            
             # Ensure we have enough historical data
             if len(historical_prices) < 30:
                 logger.warning(f"Insufficient historical data: {len(historical_prices)} prices")
@@ -417,75 +585,12 @@ class ModelCWrapper:
             # Create features
             features = self._create_features(prices_chrono, current_price)
             
-            # Generate daily predictions
-            daily_forecasts = []
-            predictions = []
-            dates = [datetime.now() - timedelta(days=i) for i in range(len(historical_prices)-1, -1, -1)]
-            
-            for day in range(1, days_ahead + 1):
-                future_date = (datetime.now() + timedelta(days=day)).strftime("%Y-%m-%d")
-                
-                # Prepare features for prediction
-                X = pd.DataFrame([features])[self.feature_names]
-                
-                # Make prediction using appropriate model based on current price
-                try:
-                    if current_price < self.low_threshold:
-                        pred_price = self.model_low.predict(X)[0]
-                        model_used = "low"
-                    elif current_price < self.high_threshold:
-                        pred_price = self.model_medium.predict(X)[0]
-                        model_used = "medium"
-                    else:
-                        pred_price = self.model_high.predict(X)[0]
-                        model_used = "high"
-                except Exception as e:
-                    # Use fallback model if category model fails
-                    if self.model_fallback:
-                        logger.warning(f"Category model failed, using fallback: {e}")
-                        pred_price = self.model_fallback.predict(X)[0]
-                        model_used = "fallback"
-                    else:
-                        logger.error(f"No fallback model available: {e}")
-                        raise
-                
-                # Clip to reasonable range
-                pred_price = self._clip_price(pred_price)
-                
-                # Add to daily forecasts
-                daily_forecasts.append({
-                    "date": future_date,
-                    "predicted_price": round(float(pred_price), 2)
-                })
-                
-                # Add to predictions for specific timeframes
-                if day in [7, 30, 90, 180]:
-                    confidence = self._calculate_confidence(day, historical_prices)
-                    price_range = self._calculate_price_range(pred_price, confidence)
-                    
-                    predictions.append({
-                        "days_ahead": day,
-                        "predicted_price": round(float(pred_price), 2),
-                        "confidence": confidence,
-                        "price_range": {
-                            "min": round(price_range[0], 2),
-                            "max": round(price_range[1], 2)
-                        }
-                    })
-            
-            # Generate historical data for chart
-            historical_data = []
-            for date, price in zip(dates[-30:], historical_prices[-30:]):
-                historical_data.append({
-                    "date": date.strftime("%Y-%m-%d"),
-                    "price": round(float(price), 2)
-                })
+            # The features don't depend on the future day, so every day of the
+            # horizon gets the same prediction: predict once and broadcast
+            predicted = self._predict_rows(self._feature_row(features), np.array([current_price], dtype=np.float64))
+            horizon_prices = np.full(days_ahead, predicted[0])
             
-            return {
-                "predictions": predictions,
-                "daily_forecasts": daily_forecasts,
-                "historical_data": historical_data
-            }
+            return self._assemble_forecast(horizon_prices, historical_prices)
             
         except Exception as e:
             logger.error(f"Error in stratified model prediction: {e}")
@@ -493,71 +598,107 @@ class ModelCWrapper:
             logger.error(traceback.format_exc())
             return None
     
-    def _create_features(self, prices_chrono: List[float], current_price: float) -> Dict:
-        """Create features from price history"""
-        features = {}
-        
-        # Price lags
-        if len(prices_chrono) >= 30:
-            features['price_lag_7'] = prices_chrono[-7]
-            features['price_lag_14'] = prices_chrono[-14]
-            features['price_lag_21'] = prices_chrono[-21]
-            features['price_lag_30'] = prices_chrono[-30]
-        else:
-            features['price_lag_7'] = prices_chrono[-min(7, len(prices_chrono))]
-            features['price_lag_14'] = prices_chrono[-min(14, len(prices_chrono))]
-            features['price_lag_21'] = prices_chrono[-min(21, len(prices_chrono))]
-            features['price_lag_30'] = prices_chrono[-min(30, len(prices_chrono))]
-        
-        # Moving averages (shifted by 7 days)
-        if len(prices_chrono) >= 14:
-            features['price_ma_7'] = np.mean(prices_chrono[-14:-7])
-            features['price_std_7'] = np.std(prices_chrono[-14:-7])
-            features['price_median_7'] = np.median(prices_chrono[-14:-7])
-        else:
-            features['price_ma_7'] = np.mean(prices_chrono)
-            features['price_std_7'] = np.std(prices_chrono)
-            features['price_median_7'] = np.median(prices_chrono)
-        
-        if len(prices_chrono) >= 21:
-            features['price_ma_14'] = np.mean(prices_chrono[-21:-7])
-            features['price_std_14'] = np.std(prices_chrono[-21:-7])
-            features['price_median_14'] = np.median(prices_chrono[-21:-7])
-        else:
-            features['price_ma_14'] = features['price_ma_7']
-            features['price_std_14'] = features['price_std_7']
-            features['price_median_14'] = features['price_median_7']
-        
-        if len(prices_chrono) >= 37:
-            features['price_ma_30'] = np.mean(prices_chrono[-37:-7])
-            features['price_std_30'] = np.std(prices_chrono[-37:-7])
-            features['price_median_30'] = np.median(prices_chrono[-37:-7])
-        else:
-            features['price_ma_30'] = features['price_ma_14']
-            features['price_std_30'] = features['price_std_14']
-            features['price_median_30'] = features['price_median_14']
+    def _feature_row(self, features: Dict) -> np.ndarray:
+        """Float matrix (1 x n_features) in self.feature_names order"""
+        return np.array(
+            [[features[name] for name in self.feature_names]], dtype=np.float64
+        )
+    
+    def _assemble_forecast(self, horizon_prices: np.ndarray, historical_prices: List[float]) -> Dict:
+        """Turn raw per-day predictions into daily forecasts, timeframe predictions and chart history"""
+        daily_forecasts = []
+        predictions = []
+        now = datetime.now()
+        dates = [now - timedelta(days=i) for i in range(len(historical_prices)-1, -1, -1)]
         
-        # Momentum
-        if features['price_lag_14'] > 0:
-            features['price_momentum_7d'] = (features['price_lag_7'] - features['price_lag_14']) / features['price_lag_14']
-        else:
-            features['price_momentum_7d'] = 0
+        for day in range(1, len(horizon_prices) + 1):
+            future_date = (now + timedelta(days=day)).strftime("%Y-%m-%d")
+            
+            # Clip to reasonable range
+            pred_price = self._clip_price(horizon_prices[day - 1])
+            
+            # Add to daily forecasts
+            daily_forecasts.append({
+                "date": future_date,
+                "predicted_price": round(float(pred_price), 2)
+            })
+            
+            # Add to predictions for specific timeframes
+            if day in [7, 30, 90, 180]:
+                confidence = self._calculate_confidence(day, historical_prices)
+                price_range = self._calculate_price_range(pred_price, confidence)
+                
+                predictions.append({
+                    "days_ahead": day,
+                    "predicted_price": round(float(pred_price), 2),
+                    "confidence": confidence,
+                    "price_range": {
+                        "min": round(price_range[0], 2),
+                        "max": round(price_range[1], 2)
+                    }
+                })
         
-        if features['price_lag_30'] > 0:
-            features['price_momentum_30d'] = (features['price_lag_7'] - features['price_lag_30']) / features['price_lag_30']
-        else:
-            features['price_momentum_30d'] = 0
+        # Generate historical data for chart
+        historical_data = []
+        for date, price in zip(dates[-30:], historical_prices[-30:]):
+            historical_data.append({
+                "date": date.strftime("%Y-%m-%d"),
+                "price": round(float(price), 2)
+            })
         
-        # Volatility
-        if features['price_ma_7'] > 0:
-            features['price_volatility_7d'] = features['price_std_7'] / features['price_ma_7']
-        else:
-            features['price_volatility_7d'] = 0
+        return {
+            "predictions": predictions,
+            "daily_forecasts": daily_forecasts,
+            "historical_data": historical_data
+        }
+    
+    def _predict_rows(self, X: np.ndarray, row_prices: np.ndarray) -> np.ndarray:
+        """
+        Predict many feature rows at once, routing each row to its price stratum
         
-        if features['price_ma_30'] > 0:
-            features['price_volatility_30d'] = features['price_std_30'] / features['price_ma_30']
-        else:
-            features['price_volatility_30d'] = 0
+        Args:
+            X: Float matrix (n_rows x n_features) in self.feature_names order
+            row_prices: Current price of each row, used to pick LOW/MEDIUM/HIGH
+        
+        Returns:
+            Raw (unclipped) predicted prices, one per row
+        """
+        import pandas as pd
+        
+        low_mask = row_prices < self.low_threshold
+        medium_mask = ~low_mask & (row_prices < self.high_threshold)
+        high_mask = ~(low_mask | medium_mask)
+        
+        result = np.empty(len(X), dtype=np.float64)
+        
+        for model, mask in (
+            (self.model_low, low_mask),
+            (self.model_medium, medium_mask),
+            (self.model_high, high_mask)
+        ):
+            if not mask.any():
+                continue
+            
+            X_stratum = pd.DataFrame(X[mask], columns=self.feature_names)
+            try:
+                result[mask] = model.predict(X_stratum)
+            except Exception as e:
+                # Use fallback model if category model fails
+                if self.model_fallback:
+                    logger.warning(f"Category model failed, using fallback: {e}")
+                    result[mask] = self.model_fallback.predict(X_stratum)
+                else:
+                    logger.error(f"No fallback model available: {e}")
+                    raise
+        
+        return result
+    
+    def _create_features(self, prices_chrono: List[float], current_price: float) -> Dict:
+        """Create features from price history"""
+        from price_feature_engine import PriceFeatureEngine
+        
+        # Price lags, shifted moving stats, momentum and volatility
+        features = PriceFeatureEngine(prices_chrono).model_c_features()
         
         # Time features (seasonal)
         now = datetime.now()
@@ -705,6 +846,73 @@ class ModelCWrapper:
             logger.error(f"Error getting historical prices: {e}")
             return []
     
+    def _get_historical_prices_bulk(
+        self,
+        pairs: List[Tuple[str, str]],
+        limit: int = 90
+    ) -> Dict[Tuple[str, str], Tuple[Optional[float], List[float]]]:
+        """
+        Get latest price and the last `limit` prices for many pairs in one query
+        
+        Returns:
+            {(crop_type, province): (current_price, prices newest first)}
+        """
+        if not pairs:
+            return {}
+        
+        from price_series_store import price_series_store
+        if price_series_store.is_loaded():
+            histories = {}
+            for crop_type, province in pairs:
+                _, prices = price_series_store.get_last(crop_type, province, limit)
+                prices = prices[::-1].tolist()
+                histories[(crop_type, province)] = (prices[0] if prices else None, prices)
+            return histories
+        
+        try:
+            from database import SessionLocal, CropPrice
+            from sqlalchemy import func, tuple_
+            
+            db = SessionLocal()
+            try:
+                ranked = db.query(
+                    CropPrice.crop_type,
+                    CropPrice.province,
+                    CropPrice.price_per_kg,
+                    func.row_number().over(
+                        partition_by=(CropPrice.crop_type, CropPrice.province),
+                        order_by=CropPrice.date.desc()
+                    ).label('rn')
+                ).filter(
+                    tuple_(CropPrice.crop_type, CropPrice.province).in_(pairs)
+                ).subquery()
+                
+                rows = db.query(
+                    ranked.c.crop_type,
+                    ranked.c.province,
+                    ranked.c.price_per_kg,
+                    ranked.c.rn
+                ).filter(
+                    ranked.c.rn <= limit
+                ).order_by(
+                    ranked.c.crop_type, ranked.c.province, ranked.c.rn
+                ).all()
+                
+                result: Dict[Tuple[str, str], Tuple[Optional[float], List[float]]] = {}
+                for crop_type, province, price, rn in rows:
+                    if rn == 1:
+                        result[(crop_type, province)] = (float(price) if price is not None else None, [])
+                    if price is not None:
+                        result[(crop_type, province)][1].append(float(price))
+                
+                logger.info(f"✅ Got historical prices for {len(result)}/{len(pairs)} pairs in one query")
+                return result
+            finally:
+                db.close()
+        except Exception as e:
+            logger.error(f"Error getting bulk historical prices: {e}")
+            return {}
+    
     def get_model_info(self) -> Dict[str, Any]:
         """Get model information"""
         info = {
@@ -722,3 +930,7 @@ class ModelCWrapper:
             info.update(self.model_metrics)
         
         return info
+
+
+# Global instance
+model_c_wrapper = ModelCWrapper()
@@ -8,7 +8,8 @@ import logging
 import pickle
 import sys
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
+import numpy as np
 
 # Add REMEDIATION_PRODUCTION to path
 backend_dir = Path(__file__).parent
@@ -26,6 +27,7 @@ class ModelDWrapper:
     def __init__(self):
         self.model_state = None
         self.bandit = None
+        self.engine = None
         self.model_loaded = False
         self.model_path = None
         
@@ -56,6 +58,7 @@ class ModelDWrapper:
                     if self.bandit:
                         posteriors = self.bandit.get_arm_posteriors()
                         logger.info(f"   Posteriors: {posteriors}")
+                        self.engine = self._create_engine()
                     
                 except Exception as e:
                     logger.error(f"Failed to load model_d_thompson_sampling.pkl: {e}")
@@ -68,6 +71,42 @@ class ModelDWrapper:
             logger.error(f"Error loading Model D: {e}")
             self.model_loaded = False
     
+    def _create_engine(self):
+        """Long-lived decision engine around the loaded bandit (None if unavailable)"""
+        try:
+            from Model_D_L4_Bandit.thompson_sampling import HarvestDecisionEngine
+            return HarvestDecisionEngine(bandit=self.bandit, record_history=False)
+        except Exception as e:
+            logger.warning(f"Could not create harvest decision engine: {e}")
+            return None
+    
+    @staticmethod
+    def _override_actions(price_increase, action_idx, profit_now, profit_wait_3d, profit_wait_7d):
+        """
+        HYBRID APPROACH: Override Thompson Sampling where it is clearly wrong
+        (the get_harvest_decision rules as masks over a batch)
+        
+        - Price up > 12% but harvest now -> Wait 7 Days (if it pays more)
+        - Price up > 7% but harvest now -> Wait 3 Days (if it pays more)
+        - Price down > 5% but wait -> Harvest Now
+        
+        Args:
+            Arrays with one value per decision
+        
+        Returns:
+            (action_idx after overrides, override mask)
+        """
+        harvest_now = action_idx == 0
+        up_strong = (price_increase > 0.12) & harvest_now
+        up = ~up_strong & (price_increase > 0.07) & harvest_now
+        down = ~up_strong & ~up & (price_increase < -0.05) & ~harvest_now
+        
+        to_wait_7d = up_strong & (profit_wait_7d > profit_now)
+        to_wait_3d = up & (profit_wait_3d > profit_now)
+        
+        action_idx = np.where(to_wait_7d, 2, np.where(to_wait_3d, 1, np.where(down, 0, action_idx)))
+        return action_idx, to_wait_7d | to_wait_3d | down
+    
     def get_harvest_decision(
         self,
         current_price: float,
@@ -99,16 +138,11 @@ class ModelDWrapper:
             
             # Use Thompson Sampling
             try:
-                from Model_D_L4_Bandit.thompson_sampling import (
-                    HarvestDecisionEngine, HarvestProfitCalculator
-                )
-                
-                # Create engine with loaded bandit
-                engine = HarvestDecisionEngine()
-                engine.bandit = self.bandit
+                if self.engine is None:
+                    raise RuntimeError("harvest decision engine not available")
                 
                 # Make decision with Thompson Sampling
-                decision = engine.decide(
+                decision = self.engine.decide(
                     current_price=current_price,
                     forecast_price_median=forecast_price,
                     forecast_price_std=forecast_std,
@@ -119,6 +153,7 @@ class ModelDWrapper:
                 )
                 
                 # HYBRID APPROACH: Override if Thompson Sampling is clearly wrong
+                # (same rules as _override_actions, for one decision)
                 price_increase = (forecast_price - current_price) / current_price
                 
                 # If price going up significantly but model says harvest now → override
@@ -185,6 +220,156 @@ class ModelDWrapper:
                 current_price, forecast_price, yield_kg, storage_cost_per_day
             )
     
+    def decide_batch(
+        self,
+        current_price,
+        forecast_price,
+        forecast_std=0.2,
+        yield_kg=15000,
+        plant_health=0.9,
+        storage_cost_per_day=10
+    ) -> Dict[str, Any]:
+        """
+        Harvest timing decisions for many plots at once (e.g. a co-op)
+        
+        Same decisions as get_harvest_decision per plot, but profits, the
+        Thompson samples and the hybrid overrides are computed for all plots
+        with array operations. Plots without a positive current price can't
+        be scored and get the rule-based fallback.
+        
+        Args:
+            current_price, forecast_price, forecast_std, yield_kg, plant_health,
+            storage_cost_per_day: Arrays with one value per plot, or scalars
+                shared by all plots (same meaning as in get_harvest_decision)
+        
+        Returns:
+            Dict of per-plot lists (JSON-ready): action, action_idx, override,
+            reason, model_used, model_confidence, profits {now, wait_3d,
+            wait_7d} and details {now, wait_3d, wait_7d} with profit / yield /
+            price / storage_cost; plus the arm posteriors as confidence (None
+            if no plot used Thompson Sampling)
+        """
+        try:
+            inputs = tuple(
+                np.atleast_1d(arr) for arr in np.broadcast_arrays(*(
+                    np.asarray(value, dtype=np.float64) for value in (
+                        current_price, forecast_price, forecast_std,
+                        yield_kg, plant_health, storage_cost_per_day
+                    )
+                ))
+            )
+        except Exception as e:
+            logger.error(f"Invalid harvest decision batch: {e}")
+            return {
+                "success": False,
+                "error": "INVALID_INPUT",
+                "message": str(e)
+            }
+        
+        current_price, forecast_price, _, yield_kg, _, storage_cost_per_day = inputs
+        
+        # Thompson Sampling where possible; rows without a positive price fall back
+        scored = current_price > 0
+        if not scored.all():
+            logger.warning(f"{int((~scored).sum())}/{len(scored)} plots have no positive current price")
+        
+        decisions, confidence = None, None
+        if self.model_loaded and self.bandit and self.engine is not None and scored.any():
+            try:
+                decisions, confidence = self._thompson_decision_batch(*(arr[scored] for arr in inputs))
+            except Exception as e:
+                logger.warning(f"Batched Thompson Sampling failed: {e}, using fallback")
+        
+        if decisions is None:
+            scored = np.zeros(len(current_price), dtype=bool)
+        
+        if not scored.all():
+            fallback = self._fallback_decision_batch(
+                current_price[~scored], forecast_price[~scored],
+                yield_kg[~scored], storage_cost_per_day[~scored]
+            )
+            decisions = fallback if decisions is None else self._merge_decisions(scored, decisions, fallback)
+        
+        return {
+            "success": True,
+            "n_decisions": len(scored),
+            **self._to_json(decisions),
+            "confidence": confidence
+        }
+    
+    def _thompson_decision_batch(
+        self, current_price, forecast_price, forecast_std, yield_kg, plant_health, storage_cost_per_day
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Thompson Sampling + hybrid overrides over arrays (current_price > 0)
+        
+        Returns:
+            (dict of per-plot arrays, arm posteriors)
+        """
+        decision = self.engine.decide_batch(
+            current_price=current_price,
+            forecast_price_median=forecast_price,
+            forecast_price_std=forecast_std,
+            yield_kg=yield_kg,
+            plant_health_score=plant_health,
+            storage_cost_per_day=storage_cost_per_day,
+            use_thompson=True
+        )
+        
+        profits = decision['expected_profit']
+        price_increase = (forecast_price - current_price) / current_price
+        action_idx, override = self._override_actions(
+            price_increase, decision['action_idx'], profits[:, 0], profits[:, 1], profits[:, 2]
+        )
+        if override.any():
+            logger.info(f"Override: {int(override.sum())}/{len(override)} decisions switched by price trend")
+        
+        details = {
+            key: {
+                "profit": profits[:, i],
+                "yield": decision['remaining_yield'][:, i],
+                "price": decision['expected_price'][:, i],
+                "storage_cost": decision['storage_cost'][:, i]
+            }
+            for i, key in enumerate(("now", "wait_3d", "wait_7d"))
+        }
+        n = len(action_idx)
+        
+        return {
+            "action": np.array(self.engine.ACTION_NAMES, dtype=object)[action_idx],
+            "action_idx": action_idx,
+            "override": override,
+            "reason": np.full(n, None, dtype=object),
+            "profits": {key: value["profit"] for key, value in details.items()},
+            "details": details,
+            "model_used": np.full(n, "thompson_sampling", dtype=object),
+            "model_confidence": np.full(n, 0.85)
+        }, decision['confidence']
+    
+    @classmethod
+    def _merge_decisions(cls, scored: np.ndarray, decisions: Dict[str, Any], fallback: Dict[str, Any]) -> Dict[str, Any]:
+        """Interleave Thompson (scored rows) and fallback (other rows) decision arrays"""
+        merged = {}
+        for key, value in decisions.items():
+            if isinstance(value, dict):
+                merged[key] = cls._merge_decisions(scored, value, fallback[key])
+                continue
+            
+            out = np.empty(len(scored), dtype=object)
+            out[scored] = list(value)
+            out[~scored] = list(fallback[key])
+            merged[key] = out
+        return merged
+    
+    @classmethod
+    def _to_json(cls, value):
+        """Nested dict of arrays -> dict of lists of Python scalars"""
+        if isinstance(value, dict):
+            return {key: cls._to_json(item) for key, item in value.items()}
+        if isinstance(value, np.ndarray):
+            return [item.item() if isinstance(item, np.generic) else item for item in value.tolist()]
+        return value
+    
     def _fallback_decision(
         self, current_price: float, forecast_price: float,
         yield_kg: float, storage_cost_per_day: float
@@ -232,6 +417,60 @@ class ModelDWrapper:
             "model_confidence": 0.65
         }
 
+    def _fallback_decision_batch(self, current_price, forecast_price, yield_kg, storage_cost_per_day) -> Dict[str, Any]:
+        """_fallback_decision over arrays with one value per plot"""
+        logger.warning(f"Using fallback harvest decision for {len(current_price)} plots")
+        
+        # No price trend without a positive current price
+        priced = current_price > 0
+        price_increase = np.divide(
+            forecast_price - current_price, current_price,
+            out=np.zeros(len(current_price)), where=priced
+        )
+        
+        # Calculate simple profits
+        profit_now = current_price * yield_kg
+        profit_wait_3d = forecast_price * yield_kg * 0.98 - (storage_cost_per_day * 3)
+        profit_wait_7d = forecast_price * yield_kg * 0.95 - (storage_cost_per_day * 7)
+        
+        # Decide
+        wait_7d = (price_increase > 0.10) & (profit_wait_7d > profit_now)
+        wait_3d = ~wait_7d & (price_increase > 0.05) & (profit_wait_3d > profit_now)
+        action_idx = np.where(wait_7d, 2, np.where(wait_3d, 1, 0))
+        
+        reasons = []
+        for idx, increase, has_price in zip(action_idx.tolist(), price_increase.tolist(), priced.tolist()):
+            if not has_price:
+                reasons.append("ไม่มีราคาปัจจุบัน ควรเก็บเกี่ยวเลย")
+            elif idx == 2:
+                reasons.append(f"ราคาคาดว่าจะขึ้น {increase*100:.1f}% (มาก)")
+            elif idx == 1:
+                reasons.append(f"ราคาคาดว่าจะขึ้น {increase*100:.1f}%")
+            elif increase < 0:
+                reasons.append(f"ราคาคาดว่าจะลง {abs(increase)*100:.1f}%")
+            else:
+                reasons.append("ราคาคงที่ ควรเก็บเกี่ยวเลย")
+        n = len(action_idx)
+        
+        return {
+            "action": np.array(["Harvest Now", "Wait 3 Days", "Wait 7 Days"], dtype=object)[action_idx],
+            "action_idx": action_idx,
+            "override": np.zeros(n, dtype=bool),
+            "reason": np.array(reasons, dtype=object),
+            "profits": {
+                "now": profit_now,
+                "wait_3d": profit_wait_3d,
+                "wait_7d": profit_wait_7d
+            },
+            "details": {
+                "now": {"profit": profit_now, "yield": yield_kg, "price": current_price, "storage_cost": np.zeros(n)},
+                "wait_3d": {"profit": profit_wait_3d, "yield": yield_kg * 0.98, "price": forecast_price, "storage_cost": storage_cost_per_day * 3},
+                "wait_7d": {"profit": profit_wait_7d, "yield": yield_kg * 0.95, "price": forecast_price, "storage_cost": storage_cost_per_day * 7}
+            },
+            "model_used": np.full(n, "fallback_rule_based", dtype=object),
+            "model_confidence": np.full(n, 0.65)
+        }
+
 
 # Global instance
 model_d_wrapper = ModelDWrapper()
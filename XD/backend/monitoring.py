@@ -3,6 +3,7 @@
 Production Monitoring for Farmme API
 """
 
+import os
 import time
 import logging
 from typing import Dict, Any
@@ -58,6 +59,12 @@ DATABASE_CONNECTIONS = Gauge(
     'Number of database connections'
 )
 
+WORKER_MEMORY = Gauge(
+    'farmme_worker_memory_bytes',
+    'Memory of each server process (pss counts shared pages once across processes)',
+    ['pid', 'role', 'type']
+)
+
 class MetricsCollector:
     """Collect system and application metrics"""
     
@@ -146,8 +153,59 @@ def record_cache_operation(operation: str, success: bool):
     except Exception as e:
         logger.error(f"Error recording cache operation metrics: {e}")
 
+def get_worker_memory() -> list:
+    """
+    Memory of every server process
+    
+    Under the preforking server (SERVER_PRELOAD=1, set by gunicorn.conf.py)
+    this covers the master and all its workers, so any worker can report
+    all of them; otherwise only the current process.
+    
+    Returns:
+        [{"pid", "role", "rss", "pss", "uss", "shared"}] in bytes
+    """
+    current = psutil.Process()
+    if os.getenv("SERVER_PRELOAD") == "1":
+        master = current.parent()
+        processes = [(master, "master")] + [(p, "worker") for p in master.children()]
+    else:
+        processes = [(current, "worker")]
+    
+    workers = []
+    for process, role in processes:
+        try:
+            info = process.memory_full_info()
+            workers.append({
+                "pid": process.pid,
+                "role": role,
+                "current": process.pid == current.pid,
+                "rss": info.rss,
+                "pss": getattr(info, 'pss', info.rss),
+                "uss": info.uss,
+                "shared": getattr(info, 'shared', 0)
+            })
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return workers
+
+def update_worker_memory_metrics():
+    """Refresh farmme_worker_memory_bytes (exited workers are dropped)"""
+    try:
+        workers = get_worker_memory()
+        WORKER_MEMORY.clear()
+        for worker in workers:
+            for kind in ("rss", "pss", "uss", "shared"):
+                WORKER_MEMORY.labels(
+                    pid=str(worker["pid"]),
+                    role=worker["role"],
+                    type=kind
+                ).set(worker[kind])
+    except Exception as e:
+        logger.error(f"Error collecting worker memory metrics: {e}")
+
 def get_metrics() -> str:
     """Get Prometheus metrics"""
+    update_worker_memory_metrics()
     return generate_latest()
 
 def get_health_status() -> Dict[str, Any]:
@@ -172,7 +230,8 @@ def get_health_status() -> Dict[str, Any]:
             "application": {
                 "uptime_seconds": time.time() - start_time,
                 "version": "1.0.0"
-            }
+            },
+            "workers": get_worker_memory()
         }
         
         # Health checks
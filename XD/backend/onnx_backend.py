@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+"""
+ONNX Runtime Backend
+Runs the exported production models with onnxruntime on CPU
+
+Models are exported once with scripts/export_onnx_models.py into
+models/onnx/<pickle name>.onnx, next to a <pickle name>.json sidecar with
+the input width, classifier flag, optional StandardScaler parameters and the
+parity result against the original pickle. With MODEL_INFERENCE_BACKEND=onnx
+the wrappers load these files instead of unpickling the estimators.
+"""
+
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    from config import MODEL_INFERENCE_BACKEND, ONNX_INTRA_OP_THREADS
+except ImportError:
+    MODEL_INFERENCE_BACKEND = os.getenv("MODEL_INFERENCE_BACKEND", "native").lower()
+    ONNX_INTRA_OP_THREADS = int(os.getenv("ONNX_INTRA_OP_THREADS", "1"))
+
+ONNX_DIR = Path(__file__).parent / "models" / "onnx"
+TARGET_OPSET = 15
+PARITY_RTOL = 1e-4   # TreeEnsembleRegressor sums in double but returns float32
+PARITY_ATOL = 1e-4
+
+
+# ============================================================================
+# Runtime
+# ============================================================================
+
+class ScalerParams:
+    """StandardScaler.transform from exported mean/scale (no pickle needed)"""
+    
+    def __init__(self, mean, scale):
+        self.mean_ = np.asarray(mean, dtype=np.float64)
+        self.scale_ = np.asarray(scale, dtype=np.float64)
+    
+    def transform(self, X) -> np.ndarray:
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+
+
+class OnnxModel:
+    """Drop-in predict / predict_proba backed by an onnxruntime InferenceSession"""
+    
+    def __init__(self, path: Path, metadata: Dict[str, Any], intra_op_threads: int = ONNX_INTRA_OP_THREADS):
+        import onnxruntime as ort
+        
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        
+        self.path = Path(path)
+        self.session = ort.InferenceSession(str(path), options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        self.output_names = [o.name for o in self.session.get_outputs()]
+        
+        self.is_classifier = metadata.get("is_classifier", False)
+        self.input_dtype = np.dtype(metadata.get("input_dtype", "float64"))
+        self.n_features_in_ = metadata["n_features"]
+        if metadata.get("feature_names"):
+            self.feature_names_in_ = np.array(metadata["feature_names"], dtype=object)
+        if self.is_classifier:
+            self.classes_ = np.array(metadata.get("classes", [0, 1]))
+    
+    def _run(self, X) -> np.ndarray:
+        # Round to the dtype the original model splits on, then feed as double
+        X = np.asarray(X, dtype=self.input_dtype).astype(np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        return self.session.run(self.output_names, {self.input_name: X})[0].ravel().astype(np.float64)
+    
+    def predict(self, X) -> np.ndarray:
+        if self.is_classifier:
+            return self.classes_[(self.predict_proba(X)[:, 1] > 0.5).astype(int)]
+        return self._run(X)
+    
+    def predict_proba(self, X) -> np.ndarray:
+        if not self.is_classifier:
+            raise AttributeError("predict_proba is only available for classifiers")
+        p = 1.0 / (1.0 + np.exp(-self._run(X)))
+        return np.column_stack([1.0 - p, p])
+
+
+def load_onnx_model(name: str) -> Optional[Tuple[OnnxModel, Dict[str, Any]]]:
+    """
+    Exported model and its sidecar metadata, when MODEL_INFERENCE_BACKEND=onnx
+    
+    Args:
+        name: Exported name (stem of the source pickle)
+    
+    Returns:
+        (OnnxModel, metadata) or None to fall back to the pickle
+    """
+    if MODEL_INFERENCE_BACKEND != "onnx":
+        return None
+    
+    onnx_path = ONNX_DIR / f"{name}.onnx"
+    meta_path = ONNX_DIR / f"{name}.json"
+    if not onnx_path.exists() or not meta_path.exists():
+        logger.warning(f"⚠️ ONNX model {name} not exported, using pickle")
+        return None
+    
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+        
+        if not metadata.get("parity_passed", False):
+            logger.warning(f"⚠️ ONNX model {name} failed its export parity check, using pickle")
+            return None
+        
+        model = OnnxModel(onnx_path, metadata)
+        logger.info(f"✅ {name}: onnxruntime backend ({ONNX_INTRA_OP_THREADS} intra-op threads, "
+                    f"parity max err {metadata.get('parity_max_err', 0):.2e})")
+        return model, metadata
+    
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to load ONNX model {name}: {e}, using pickle")
+        return None
+
+
+def load_estimator(path: Path) -> Any:
+    """ONNX model for a pickle path when exported and enabled, else the unpickled estimator"""
+    import pickle
+    
+    loaded = load_onnx_model(Path(path).stem)
+    if loaded:
+        return loaded[0]
+    
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+# ============================================================================
+# Export
+# ============================================================================
+
+def _to_onnx(compiled):
+    """
+    ONNX ModelProto with an ai.onnx.ml TreeEnsembleRegressor for a CompiledModel
+    
+    The graph is built from the same flat node arrays the compiled evaluator
+    walks, so sklearn and XGBoost models export the same way. Thresholds and
+    leaf values are stored as double tensors and the input is double, so
+    splits compare exactly like the original model; only the summed output
+    is float32. Classifiers export their margin (logistic applied at runtime).
+    """
+    from onnx import TensorProto, helper, numpy_helper
+    
+    e = compiled.ensemble
+    starts = np.sort(e.roots)
+    node_ids = np.arange(e.n_nodes)
+    tree_ids = np.searchsorted(starts, node_ids, side='right') - 1
+    local_ids = node_ids - starts[tree_ids]
+    
+    left = e.children[0::2]
+    right = e.children[1::2]
+    is_leaf = left == node_ids
+    
+    node = helper.make_node(
+        "TreeEnsembleRegressor",
+        inputs=["input"],
+        outputs=["variable"],
+        domain="ai.onnx.ml",
+        n_targets=1,
+        aggregate_function="AVERAGE" if e.average else "SUM",
+        post_transform="NONE",
+        nodes_treeids=tree_ids.tolist(),
+        nodes_nodeids=local_ids.tolist(),
+        nodes_featureids=e.feature.tolist(),
+        nodes_modes=["LEAF" if leaf else "BRANCH_LEQ" for leaf in is_leaf],
+        nodes_values_as_tensor=numpy_helper.from_array(e.threshold.astype(np.float64)),
+        nodes_truenodeids=np.where(is_leaf, 0, left - starts[tree_ids]).tolist(),
+        nodes_falsenodeids=np.where(is_leaf, 0, right - starts[tree_ids]).tolist(),
+        nodes_missing_value_tracks_true=(e.missing_left & ~is_leaf).astype(int).tolist(),
+        target_treeids=tree_ids[is_leaf].tolist(),
+        target_nodeids=local_ids[is_leaf].tolist(),
+        target_ids=[0] * int(is_leaf.sum()),
+        target_weights_as_tensor=numpy_helper.from_array(e.value[is_leaf].astype(np.float64)),
+        base_values_as_tensor=numpy_helper.from_array(np.array([e.base_score], dtype=np.float64))
+    )
+    
+    graph = helper.make_graph(
+        [node],
+        compiled.original_type,
+        [helper.make_tensor_value_info("input", TensorProto.DOUBLE, [None, e.n_features])],
+        [helper.make_tensor_value_info("variable", TensorProto.FLOAT, [None, 1])]
+    )
+    proto = helper.make_model(
+        graph,
+        opset_imports=[helper.make_opsetid("", TARGET_OPSET), helper.make_opsetid("ai.onnx.ml", 3)],
+        producer_name="farmme-backend"
+    )
+    proto.ir_version = 8
+    return proto
+
+
+def verify_parity(model, onnx_model: OnnxModel) -> Tuple[bool, float]:
+    """
+    Compare ONNX and original outputs on rows built from the model's split thresholds
+    
+    Returns:
+        (passed, max absolute error)
+    """
+    from tree_evaluator import compile_model, parity_sample
+    
+    X = parity_sample(compile_model(model))
+    X_original = X
+    feature_names = getattr(model, 'feature_names_in_', None)
+    if feature_names is None and hasattr(model, 'get_booster'):
+        feature_names = model.get_booster().feature_names
+    if feature_names is not None:
+        import pandas as pd
+        X_original = pd.DataFrame(X, columns=list(feature_names))
+    
+    if onnx_model.is_classifier:
+        expected = model.predict_proba(X_original)[:, 1]
+        actual = onnx_model.predict_proba(X)[:, 1]
+    else:
+        expected = np.asarray(model.predict(X_original), dtype=np.float64)
+        actual = onnx_model.predict(X)
+    
+    max_err = float(np.max(np.abs(expected - actual))) if len(expected) else 0.0
+    return bool(np.allclose(actual, expected, rtol=PARITY_RTOL, atol=PARITY_ATOL)), max_err
+
+
+def export_model(
+    model,
+    name: str,
+    source: Optional[Path] = None,
+    scaler=None,
+    extra_metadata: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Export a fitted model to ONNX_DIR/<name>.onnx with a parity-checked sidecar
+    
+    Args:
+        model: Fitted estimator
+        name: Export name (use the source pickle stem so wrappers find it)
+        source: Source pickle path (recorded in the sidecar)
+        scaler: Optional fitted StandardScaler applied before the model
+        extra_metadata: Extra sidecar fields (version, algorithm, ...)
+    
+    Returns:
+        Sidecar metadata
+    """
+    from tree_evaluator import compile_model
+    
+    compiled = compile_model(model)
+    n_features = compiled.n_features_in_
+    is_classifier = compiled.is_classifier
+    
+    ONNX_DIR.mkdir(parents=True, exist_ok=True)
+    onnx_path = ONNX_DIR / f"{name}.onnx"
+    meta_path = ONNX_DIR / f"{name}.json"
+    
+    proto = _to_onnx(compiled)
+    with open(onnx_path, 'wb') as f:
+        f.write(proto.SerializeToString())
+    
+    feature_names = getattr(model, 'feature_names_in_', None)
+    metadata = {
+        "name": name,
+        "source": str(source) if source else None,
+        "model_type": type(model).__name__,
+        "n_features": n_features,
+        "n_trees": compiled.n_trees,
+        "input_dtype": np.dtype(compiled.ensemble.input_dtype).name,
+        "feature_names": [str(c) for c in feature_names] if feature_names is not None else None,
+        "is_classifier": is_classifier,
+        "classes": [c.item() if hasattr(c, 'item') else c for c in getattr(model, 'classes_', [])] if is_classifier else None,
+        "exported_at": datetime.now().isoformat(),
+        **(extra_metadata or {})
+    }
+    if scaler is not None:
+        metadata["scaler"] = {"mean": scaler.mean_.tolist(), "scale": scaler.scale_.tolist()}
+    
+    passed, max_err = verify_parity(model, OnnxModel(onnx_path, metadata))
+    metadata["parity_passed"] = passed
+    metadata["parity_max_err"] = max_err
+    
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, ensure_ascii=False, indent=2)
+    
+    status = "✅" if passed else "❌"
+    logger.info(f"{status} Exported {name} -> {onnx_path.name} (parity max err {max_err:.2e})")
+    return metadata
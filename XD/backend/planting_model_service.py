@@ -20,6 +20,8 @@ warnings.filterwarnings('ignore', category=UserWarning)
 
 logger = logging.getLogger(__name__)
 
+PLANTING_CUBE_NAME = "planting_calendar"
+
 class PlantingCalendarModelService:
     """Production service for planting calendar predictions using the actual ML model"""
     
@@ -36,6 +38,9 @@ class PlantingCalendarModelService:
         self._load_model()
         self._load_dataset()
         
+        # Precomputed region x crop x day suitability scores (None -> live inference only)
+        self.cube = self._load_cube() if self.model_loaded else None
+        
         logger.info("✅ Planting Calendar Model Service initialized")
     
     def _load_model(self):
@@ -174,40 +179,48 @@ class PlantingCalendarModelService:
                 end_date = start_date + timedelta(days=365)
             
             recommendations = []
-            current_date = start_date
             
             # ✅ FIXED: Generate predictions for different planting dates (monthly for better variation)
             # Check monthly instead of weekly to get more diverse dates
-            while current_date <= end_date and len(recommendations) < top_n * 2:
+            planting_dates = []
+            current_date = start_date
+            while current_date <= end_date:
+                planting_dates.append(current_date)
+                current_date += timedelta(days=30)
+            
+            cube_scores = self._lookup_cube(province, crop_type, growth_days, planting_dates[:top_n * 2])
+            
+            for position, current_date in enumerate(planting_dates):
+                if len(recommendations) >= top_n * 2:
+                    break
                 try:
-                    # Prepare features for the model
-                    features = self._prepare_features(province, crop_type, current_date, growth_days)
-                    
-                    if features is not None:
+                    if cube_scores is not None and position < len(cube_scores):
+                        prediction = self._prediction_from_score(float(cube_scores[position]), crop_type)
+                    else:
+                        # Prepare features for the model
+                        features = self._prepare_features(province, crop_type, current_date, growth_days)
                         # Make prediction using the actual model
-                        prediction = self._make_model_prediction(features, crop_type)
+                        prediction = self._make_model_prediction(features, crop_type) if features is not None else None
+                    
+                    if prediction is not None:
+                        harvest_date = current_date + timedelta(days=growth_days)
                         
-                        if prediction is not None:
-                            harvest_date = current_date + timedelta(days=growth_days)
-                            
-                            recommendations.append({
-                                "planting_date": current_date.strftime("%Y-%m-%d"),
-                                "harvest_date": harvest_date.strftime("%Y-%m-%d"),
-                                "predicted_price": prediction.get('price', 25.0),
-                                "confidence": prediction.get('confidence', 0.8),
-                                "risk_score": prediction.get('risk_score', 0.2),
-                                "weather_suitability": prediction.get('weather_suitability', 0.8),
-                                "market_timing": prediction.get('market_timing', 0.7),
-                                "total_score": prediction.get('total_score', 0.75),
-                                "recommendation": self._generate_recommendation(prediction),
-                                "season": self._get_season_name(current_date.month),
-                                "rainfall": self._get_seasonal_rainfall(current_date.month)
-                            })
+                        recommendations.append({
+                            "planting_date": current_date.strftime("%Y-%m-%d"),
+                            "harvest_date": harvest_date.strftime("%Y-%m-%d"),
+                            "predicted_price": prediction.get('price', 25.0),
+                            "confidence": prediction.get('confidence', 0.8),
+                            "risk_score": prediction.get('risk_score', 0.2),
+                            "weather_suitability": prediction.get('weather_suitability', 0.8),
+                            "market_timing": prediction.get('market_timing', 0.7),
+                            "total_score": prediction.get('total_score', 0.75),
+                            "recommendation": self._generate_recommendation(prediction),
+                            "season": self._get_season_name(current_date.month),
+                            "rainfall": self._get_seasonal_rainfall(current_date.month)
+                        })
                 
                 except Exception as e:
                     logger.warning(f"Error predicting for date {current_date}: {e}")
-                
-                current_date += timedelta(days=30)  # ✅ FIXED: Check monthly for better date diversity
             
             # ✅ FIXED: Sort by total score and take top N (now with more diverse dates)
             recommendations.sort(key=lambda x: x.get('total_score', 0), reverse=True)
@@ -340,6 +353,36 @@ class PlantingCalendarModelService:
             logger.error(f"❌ Error preparing features: {e}", exc_info=True)
             return None
     
+    def _prediction_from_score(self, suitability_score: float, crop_type: str) -> Dict[str, Any]:
+        """Price, confidence and risk derived from the model's suitability score (0-100)"""
+        # Convert suitability score to price using realistic mapping
+        # Higher suitability = better timing = higher price
+        # ✅ FIXED: Use crop-specific base price instead of fixed 50.0
+        base_price = self._get_base_price(crop_type)
+        price_multiplier = 0.5 + (suitability_score / 100.0) * 1.5  # 0.5x to 2.0x
+        predicted_price = base_price * price_multiplier
+        
+        # Calculate confidence based on model performance
+        model_performance = self.model.get('performance', {})
+        base_confidence = model_performance.get('cv_mean', 0.8)
+        confidence = min(0.95, max(0.6, base_confidence))
+        
+        # Calculate risk score (inverse of suitability)
+        risk_score = max(0.1, min(0.9, 1.0 - (suitability_score / 100.0)))
+        
+        # Calculate total score
+        total_score = (suitability_score / 100.0) * confidence
+        
+        return {
+            'price': round(predicted_price, 2),
+            'suitability_score': round(suitability_score, 2),
+            'confidence': round(confidence, 3),
+            'risk_score': round(risk_score, 3),
+            'total_score': round(total_score, 3),
+            'weather_suitability': min(1.0, suitability_score / 80.0),
+            'market_timing': min(1.0, suitability_score / 90.0)
+        }
+    
     def _get_region_from_province(self, province: str) -> str:
         """Get region from province name"""
         PROVINCE_REGION_MAP = {
@@ -383,34 +426,7 @@ class PlantingCalendarModelService:
                     if hasattr(actual_model, 'predict'):
                         # The model predicts suitability score (0-100)
                         suitability_score = actual_model.predict(features)[0]
-                        
-                        # Convert suitability score to price using realistic mapping
-                        # Higher suitability = better timing = higher price
-                        # ✅ FIXED: Use crop-specific base price instead of fixed 50.0
-                        base_price = self._get_base_price(crop_type)
-                        price_multiplier = 0.5 + (suitability_score / 100.0) * 1.5  # 0.5x to 2.0x
-                        predicted_price = base_price * price_multiplier
-                        
-                        # Calculate confidence based on model performance
-                        model_performance = self.model.get('performance', {})
-                        base_confidence = model_performance.get('cv_mean', 0.8)
-                        confidence = min(0.95, max(0.6, base_confidence))
-                        
-                        # Calculate risk score (inverse of suitability)
-                        risk_score = max(0.1, min(0.9, 1.0 - (suitability_score / 100.0)))
-                        
-                        # Calculate total score
-                        total_score = (suitability_score / 100.0) * confidence
-                        
-                        return {
-                            'price': round(predicted_price, 2),
-                            'suitability_score': round(suitability_score, 2),
-                            'confidence': round(confidence, 3),
-                            'risk_score': round(risk_score, 3),
-                            'total_score': round(total_score, 3),
-                            'weather_suitability': min(1.0, suitability_score / 80.0),
-                            'market_timing': min(1.0, suitability_score / 90.0)
-                        }
+                        return self._prediction_from_score(suitability_score, crop_type)
                     else:
                         logger.warning("Best model doesn't have predict method")
                         return None
@@ -582,6 +598,117 @@ class PlantingCalendarModelService:
         else:
             return f"ไม่แนะนำ - คาดการณ์ราคา {price:.1f} ฿/กก."
     
+    # ------------------------------------------------------------------
+    # Suitability cube
+    # ------------------------------------------------------------------
+    
+    @staticmethod
+    def _cube_date_key(day) -> tuple:
+        """The part of a planting date the features depend on"""
+        return (day.month, day.timetuple().tm_yday, day.isocalendar()[1])
+    
+    def cube_version(self) -> str:
+        """Hash of the model file and the reference dataset"""
+        from suitability_cube import file_digest
+        return file_digest([Path(self.model_path), Path(self.dataset_path)])
+    
+    def _load_cube(self):
+        """Memory-mapped cube for the current model version, or None"""
+        try:
+            from config import SUITABILITY_CUBE_ENABLED
+        except ImportError:
+            SUITABILITY_CUBE_ENABLED = True
+        if not SUITABILITY_CUBE_ENABLED:
+            return None
+        
+        from suitability_cube import SuitabilityCube
+        return SuitabilityCube.load(PLANTING_CUBE_NAME, self.cube_version())
+    
+    def _lookup_cube(self, province: str, crop_type: str, growth_days: int, planting_dates: List[datetime]) -> Optional[np.ndarray]:
+        """Suitability scores from the cube (built for each crop's default growth_days), or None"""
+        if self.cube is None or not planting_dates or growth_days != self._get_growth_days(crop_type):
+            return None
+        
+        values = self.cube.lookup(
+            self._get_region_from_province(province),
+            crop_type,
+            [self._cube_date_key(d) for d in planting_dates]
+        )
+        return values['suitability_score'] if values is not None else None
+    
+    def _prepare_features_batch(self, region: str, crop_types: List[str], planting_dates: List[datetime], growth_days: List[int]) -> np.ndarray:
+        """_prepare_features() for many rows of one region"""
+        preprocessor = self.model['preprocessor']
+        numeric_features = preprocessor.get('numeric_features', [])
+        categorical_features = preprocessor.get('categorical_features', [])
+        
+        months = [d.month for d in planting_dates]
+        input_df = pd.DataFrame({
+            'month': months,
+            'day_of_year': [d.timetuple().tm_yday for d in planting_dates],
+            'week_of_year': [d.isocalendar()[1] for d in planting_dates],
+            'temperature_celsius': [self._get_seasonal_temperature(m) for m in months],
+            'rainfall_mm': [self._get_seasonal_rainfall(m) for m in months],
+            'humidity_percent': [self._get_seasonal_humidity(m) for m in months],
+            'is_rainy_season': [1 if m in [6, 7, 8, 9, 10] else 0 for m in months],
+            'is_winter': [1 if m in [11, 12, 1, 2] else 0 for m in months],
+            'growth_days': growth_days,
+            'planting_area_rai': 5.0,
+            'crop_type': crop_types,
+            'region': region,
+            'crop_category': [self._get_crop_category(c) for c in crop_types],
+            'water_requirement': [self._get_water_requirement(c) for c in crop_types]
+        })
+        
+        numeric = np.column_stack([
+            input_df[f].to_numpy(dtype=float) if f in input_df.columns else np.zeros(len(input_df))
+            for f in numeric_features
+        ])
+        categorical_df = pd.DataFrame({
+            f: input_df[f] if f in input_df.columns else 'Unknown'
+            for f in categorical_features
+        })
+        
+        return np.hstack([
+            preprocessor['scaler'].transform(numeric),
+            preprocessor['onehot_encoder'].transform(categorical_df)
+        ])
+    
+    def build_cube(self):
+        """
+        Evaluate the model over every region x crop x calendar day
+        
+        Returns:
+            SuitabilityCube (save() it to serve from it)
+        """
+        from suitability_cube import build_cube
+        
+        if not self.model_loaded or not isinstance(self.model, dict) or 'best_model' not in self.model:
+            raise RuntimeError("Planting calendar model not loaded")
+        
+        crops = [c['crop_type'] for c in self.get_available_crops()]
+        regions = sorted({self._get_region_from_province(p) for p in self.get_available_provinces()} | {'กลาง'})
+        
+        def evaluate(region, crops, dates):
+            crop_types = [c for c in crops for _ in dates]
+            features = self._prepare_features_batch(
+                region,
+                crop_types,
+                list(dates) * len(crops),
+                [self._get_growth_days(c) for c in crop_types]
+            )
+            return {'suitability_score': self.model['best_model'].predict(features)}
+        
+        return build_cube(
+            rows=regions,
+            crops=crops,
+            date_key=self._cube_date_key,
+            evaluate=evaluate,
+            dtypes={'suitability_score': np.float64},  # 6 regions - small enough to keep exact
+            version=self.cube_version(),
+            metadata={'model_path': self.model_path, 'date_key': ['month', 'day_of_year', 'week_of_year']}
+        )
+    
     def get_model_info(self) -> Dict[str, Any]:
         """Get model information"""
         return {
@@ -594,6 +721,7 @@ class PlantingCalendarModelService:
             "available_provinces": len(self.get_available_provinces()),
             "available_crops": len(self.get_available_crops()),
             "version": "1.0.0",
+            "cube_version": self.cube.version if self.cube is not None else None,
             "status": "active" if self.model_loaded else "fallback"
         }
 
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+Preload Models
+Loads every model and reference dataset once in the server master process
+so the forked workers share them copy-on-write (see gunicorn.conf.py)
+
+Pages stay shared as long as no worker writes to them. Two things write to
+otherwise read-only memory after a fork:
+- the cyclic GC, which updates the header of every tracked object it
+  visits - gc.freeze() moves everything loaded so far out of its reach
+- reference counting, which touches the object header (not the data) of
+  anything Python code handles; small NumPy arrays share heap pages with
+  such headers, so the compiled tree arrays and the price series are
+  copied into one separate read-only mapping with pack_arrays()
+"""
+
+import gc
+import logging
+import mmap
+import os
+import time
+from typing import Any, Dict, List
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ARRAY_ALIGNMENT = 64
+
+
+def pack_arrays(arrays: List[np.ndarray]) -> List[np.ndarray]:
+    """
+    Copy arrays into one anonymous memory mapping
+    
+    The mapping sits outside the Python heap, so refcount and GC writes to
+    nearby objects never dirty its pages after a fork.
+    
+    Returns:
+        Read-only views in the same order as `arrays`
+    """
+    offsets = []
+    total = 0
+    for arr in arrays:
+        offsets.append(total)
+        total += -(-arr.nbytes // ARRAY_ALIGNMENT) * ARRAY_ALIGNMENT
+    
+    buffer = mmap.mmap(-1, max(total, 1))
+    views = []
+    for arr, offset in zip(arrays, offsets):
+        view = np.frombuffer(buffer, dtype=arr.dtype, count=arr.size, offset=offset).reshape(arr.shape)
+        view[...] = arr
+        view.flags.writeable = False
+        views.append(view)
+    return views
+
+
+def _pack_compiled_models(service: Any) -> int:
+    """Pack the ensembles of CompiledModel attributes of a wrapper (bytes packed)"""
+    from tree_evaluator import CompiledModel
+    
+    packed = 0
+    for value in list(vars(service).values()):
+        if isinstance(value, CompiledModel):
+            packed += value.ensemble.pack()
+    return packed
+
+
+def preload_models() -> Dict[str, Any]:
+    """
+    Load every registered service, the price series store and freeze the heap
+    
+    Call once in the master process, before workers are forked.
+    
+    Returns:
+        {"warmup": service_registry.status(), "packed_bytes", "frozen_objects", "seconds"}
+    """
+    from service_registry import service_registry
+    
+    start = time.time()
+    warmup = service_registry.warmup()
+    
+    packed_bytes = 0
+    for service in service_registry.loaded_services().values():
+        if hasattr(service, '__dict__'):
+            packed_bytes += _pack_compiled_models(service)
+    
+    try:
+        from config import PRICE_STORE_ENABLED
+        from price_series_store import price_series_store
+        if PRICE_STORE_ENABLED and price_series_store.load():
+            packed_bytes += price_series_store.pack()
+    except Exception as e:
+        logger.warning(f"⚠️ Preload of price series store failed: {e}")
+    
+    # Everything allocated so far is shared with the workers from here on
+    gc.collect()
+    gc.freeze()
+    
+    stats = {
+        "warmup": warmup,
+        "packed_bytes": packed_bytes,
+        "frozen_objects": gc.get_freeze_count(),
+        "seconds": round(time.time() - start, 2)
+    }
+    logger.info(f"✅ Preloaded {warmup['loaded']}/{warmup['total']} services in {stats['seconds']}s "
+                f"({packed_bytes / 1e6:.1f} MB packed, {stats['frozen_objects']} objects frozen)")
+    return stats
+
+
+def after_fork():
+    """
+    Per-worker setup right after fork
+    
+    Pooled database connections opened by the master must not be shared,
+    so the worker drops its inherited pool without closing the sockets.
+    """
+    try:
+        from database import engine
+        engine.dispose(close=False)
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to reset database pool in worker {os.getpid()}: {e}")
@@ -0,0 +1,351 @@
+# -*- coding: utf-8 -*-
+"""
+Price Feature Engine
+Lag / rolling-window features for Model C
+
+- PriceFeatureEngine: streaming (incremental) features of one series, used
+  when serving and recursively forecasting
+- model_c_frame_features: the same lags and shifted rolling statistics for a
+  whole (province, crop_type) panel in one vectorized pass, used to build the
+  training set (buildingModel.py/train_model_c_v8_improved.py)
+"""
+
+import logging
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from typing import Dict, Iterable, Optional, Sequence
+import numpy as np
+import pandas as pd
+from pandas.api.indexers import BaseIndexer
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# Rolling Window
+# ============================================================================
+
+class RollingWindow:
+    """
+    Fixed-size ring buffer with running statistics
+    
+    Keeps running sums (sum, sum of squares, index-weighted sum) for O(1)
+    mean / std / linear-trend slope, and a sorted copy of the window for
+    median and percentile rank lookups by bisection.
+    """
+    
+    def __init__(self, size: int, reference: float = 0.0):
+        """
+        Args:
+            size: Window length
+            reference: Value subtracted before accumulating sums (keeps the
+                sum-of-squares variance numerically stable for large prices)
+        """
+        self.size = size
+        self.reference = reference
+        self._values: deque = deque()
+        self._sorted = []
+        self._sum = 0.0      # sum(x - ref)
+        self._sum_sq = 0.0   # sum((x - ref)^2)
+        self._sum_iy = 0.0   # sum(i * (x - ref)), i = 0..n-1 oldest first
+    
+    def __len__(self) -> int:
+        return len(self._values)
+    
+    @property
+    def is_full(self) -> bool:
+        """True once the window holds `size` values"""
+        return len(self._values) == self.size
+    
+    def push(self, value: float) -> Optional[float]:
+        """
+        Add a value, evicting the oldest one when the window is full
+        
+        Returns:
+            Evicted value or None
+        """
+        value = float(value)
+        y_new = value - self.reference
+        evicted = None
+        
+        if self.is_full:
+            evicted = self._values.popleft()
+            y_old = evicted - self.reference
+            # Shift every index down by one and append at index n-1
+            self._sum_iy += -(self._sum - y_old) + (self.size - 1) * y_new
+            self._sum += y_new - y_old
+            self._sum_sq += y_new * y_new - y_old * y_old
+            del self._sorted[bisect_left(self._sorted, evicted)]
+        else:
+            self._sum_iy += len(self._values) * y_new
+            self._sum += y_new
+            self._sum_sq += y_new * y_new
+        
+        self._values.append(value)
+        insort(self._sorted, value)
+        return evicted
+    
+    def mean(self) -> float:
+        """Arithmetic mean of the window"""
+        n = len(self._values)
+        if n == 0:
+            return 0.0
+        return self.reference + self._sum / n
+    
+    def std(self) -> float:
+        """Population standard deviation (same as np.std)"""
+        n = len(self._values)
+        if n == 0:
+            return 0.0
+        mean_y = self._sum / n
+        variance = self._sum_sq / n - mean_y * mean_y
+        return float(np.sqrt(variance)) if variance > 0 else 0.0
+    
+    def median(self) -> float:
+        """Median of the window (same as np.median)"""
+        n = len(self._sorted)
+        if n == 0:
+            return 0.0
+        mid = n // 2
+        if n % 2:
+            return self._sorted[mid]
+        return (self._sorted[mid - 1] + self._sorted[mid]) / 2.0
+    
+    def rank(self, value: float) -> float:
+        """Fraction of window values <= value"""
+        n = len(self._sorted)
+        if n == 0:
+            return 0.0
+        return bisect_right(self._sorted, value) / n
+    
+    def slope(self) -> float:
+        """Least-squares slope against 0..n-1 (same as np.polyfit(x, y, 1)[0])"""
+        n = len(self._values)
+        if n < 2:
+            return 0.0
+        centered_iy = self._sum_iy - (n - 1) / 2.0 * self._sum
+        return centered_iy / (n * (n * n - 1) / 12.0)
+
+
+# ============================================================================
+# Price Feature Engine
+# ============================================================================
+
+class PriceFeatureEngine:
+    """
+    Incremental feature engine for a single crop/province price series
+    
+    Seed it with the chronological history (oldest first), read features,
+    then `push()` each predicted price to roll every window forward without
+    re-scanning the history.
+    """
+    
+    LAGS = (7, 14, 21, 30)
+    SHIFTED_WINDOWS = (7, 14, 30)   # Model C v7/v8 moving stats, shifted by SHIFT days
+    RECENT_WINDOWS = (7, 14, 30)    # Unshifted windows ending at the latest price
+    SHIFT = 7
+    
+    def __init__(self, history: Iterable[float] = ()):
+        """
+        Args:
+            history: Chronological price history (oldest first)
+        """
+        history = [float(p) for p in history]
+        reference = history[-1] if history else 0.0
+        
+        self._buffer: deque = deque(maxlen=max(
+            max(self.LAGS),
+            self.SHIFT + max(self.SHIFTED_WINDOWS),
+            max(self.RECENT_WINDOWS)
+        ))
+        self._shifted = {w: RollingWindow(w, reference) for w in self.SHIFTED_WINDOWS}
+        self._recent = {w: RollingWindow(w, reference) for w in self.RECENT_WINDOWS}
+        self.count = 0
+        
+        for price in history:
+            self.push(price)
+    
+    def push(self, price: float):
+        """Append the next (observed or predicted) price"""
+        price = float(price)
+        self._buffer.append(price)
+        self.count += 1
+        
+        for window in self._recent.values():
+            window.push(price)
+        
+        # The price that just became SHIFT days old enters the shifted windows
+        if self.count > self.SHIFT:
+            entering = self._buffer[-(self.SHIFT + 1)]
+            for window in self._shifted.values():
+                window.push(entering)
+    
+    @property
+    def last(self) -> float:
+        """Most recent price"""
+        return self._buffer[-1]
+    
+    def lag(self, k: int) -> float:
+        """Price k positions from the end (lag 1 = latest), clamped to available history"""
+        return self._buffer[-min(k, len(self._buffer))]
+    
+    def recent(self, size: int) -> RollingWindow:
+        """Unshifted window ending at the latest price"""
+        return self._recent[size]
+    
+    def shifted(self, size: int) -> RollingWindow:
+        """Window of `size` prices ending SHIFT days before the latest price"""
+        return self._shifted[size]
+    
+    def model_c_features(self) -> Dict[str, float]:
+        """
+        Price features used by the Model C stratified models
+        
+        Returns:
+            Dict with price lags, shifted moving mean/std/median,
+            momentum and volatility features
+        """
+        features = {}
+        
+        for k in self.LAGS:
+            features[f'price_lag_{k}'] = self.lag(k)
+        
+        # Moving averages (shifted by 7 days); shorter histories fall back
+        # to the next smaller window, or the whole history for the smallest
+        previous = None
+        for w in self.SHIFTED_WINDOWS:
+            window = self._shifted[w]
+            if window.is_full:
+                stats = (window.mean(), window.std(), window.median())
+            elif previous is not None:
+                stats = previous
+            else:
+                values = np.asarray(self._buffer, dtype=np.float64)
+                stats = (float(np.mean(values)), float(np.std(values)), float(np.median(values)))
+            
+            features[f'price_ma_{w}'], features[f'price_std_{w}'], features[f'price_median_{w}'] = stats
+            previous = stats
+        
+        # Momentum
+        if features['price_lag_14'] > 0:
+            features['price_momentum_7d'] = (features['price_lag_7'] - features['price_lag_14']) / features['price_lag_14']
+        else:
+            features['price_momentum_7d'] = 0
+        
+        if features['price_lag_30'] > 0:
+            features['price_momentum_30d'] = (features['price_lag_7'] - features['price_lag_30']) / features['price_lag_30']
+        else:
+            features['price_momentum_30d'] = 0
+        
+        # Volatility
+        if features['price_ma_7'] > 0:
+            features['price_volatility_7d'] = features['price_std_7'] / features['price_ma_7']
+        else:
+            features['price_volatility_7d'] = 0
+        
+        if features['price_ma_30'] > 0:
+            features['price_volatility_30d'] = features['price_std_30'] / features['price_ma_30']
+        else:
+            features['price_volatility_30d'] = 0
+        
+        return features
+
+
+# ============================================================================
+# Vectorized panel features (training)
+# ============================================================================
+
+class GroupWindowIndexer(BaseIndexer):
+    """Trailing windows of `window_size` rows that never cross a group boundary"""
+    
+    def get_window_bounds(self, num_values=0, min_periods=None, center=None, closed=None, step=None):
+        end = np.arange(1, num_values + 1, dtype=np.int64)
+        start = np.maximum(end - self.window_size, self.group_start)
+        return start, end
+
+
+def group_starts(codes: np.ndarray) -> np.ndarray:
+    """Index of the first row of each row's group (rows grouped contiguously)"""
+    n = len(codes)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    is_first = np.ones(n, dtype=bool)
+    is_first[1:] = codes[1:] != codes[:-1]
+    return np.maximum.accumulate(np.where(is_first, np.arange(n), 0)).astype(np.int64)
+
+
+def grouped_shift(values: np.ndarray, starts: np.ndarray, k: int) -> np.ndarray:
+    """groupby().shift(k) for k >= 0 over contiguous groups"""
+    shifted = np.full(len(values), np.nan)
+    if k < len(values):
+        idx = np.arange(k, len(values))
+        valid = idx - k >= starts[idx]
+        shifted[idx[valid]] = values[idx[valid] - k]
+    return shifted
+
+
+def grouped_rolling(values: np.ndarray, starts: np.ndarray, window: int, stat: str) -> np.ndarray:
+    """groupby().rolling(window, min_periods=1).<stat>() over contiguous groups"""
+    indexer = GroupWindowIndexer(window_size=window, group_start=starts)
+    return getattr(pd.Series(values).rolling(indexer, min_periods=1), stat)().to_numpy()
+
+
+def model_c_frame_features(
+    df: pd.DataFrame,
+    price_col: str = 'price_per_kg',
+    group_cols: Sequence[str] = ('province', 'crop_type'),
+    weather_cols: Sequence[str] = ()
+) -> pd.DataFrame:
+    """
+    Model C v8 training features for every row of a price panel
+    
+    Equivalent to the per-group `transform(lambda x: x.shift(s).rolling(w,
+    min_periods=1).<stat>())` calls of the training script, but computed with
+    one windowed kernel per statistic over the whole panel.
+    
+    Args:
+        df: Panel, chronological within each group
+        price_col: Price column
+        group_cols: Series key columns
+        weather_cols: Weather columns to add shift(1) 7-day mean/std for
+    
+    Returns:
+        DataFrame aligned with df.index: price_lag_*, price_ma/std/median_*,
+        price_momentum_*, price_volatility_*, <weather>_ma_7/_std_7
+    """
+    codes = df.groupby(list(group_cols), sort=False).ngroup().to_numpy()
+    order = np.argsort(codes, kind='stable')
+    starts = group_starts(codes[order])
+    
+    features = {}
+    prices = df[price_col].to_numpy(dtype=np.float64)[order]
+    
+    # Price lags
+    for lag in PriceFeatureEngine.LAGS:
+        features[f'price_lag_{lag}'] = grouped_shift(prices, starts, lag)
+    
+    # Moving averages (shifted by 7 days to prevent leakage)
+    shifted = grouped_shift(prices, starts, PriceFeatureEngine.SHIFT)
+    for window in PriceFeatureEngine.SHIFTED_WINDOWS:
+        features[f'price_ma_{window}'] = grouped_rolling(shifted, starts, window, 'mean')
+        features[f'price_std_{window}'] = grouped_rolling(shifted, starts, window, 'std')
+        features[f'price_median_{window}'] = grouped_rolling(shifted, starts, window, 'median')
+    
+    # Momentum
+    features['price_momentum_7d'] = (features['price_lag_7'] - features['price_lag_14']) / (features['price_lag_14'] + 1e-6)
+    features['price_momentum_30d'] = (features['price_lag_7'] - features['price_lag_30']) / (features['price_lag_30'] + 1e-6)
+    
+    # Volatility
+    features['price_volatility_7d'] = features['price_std_7'] / (features['price_ma_7'] + 1e-6)
+    features['price_volatility_30d'] = features['price_std_30'] / (features['price_ma_30'] + 1e-6)
+    
+    # Weather: 7-day rolling mean/std up to the previous day
+    for col in weather_cols:
+        weather = grouped_shift(df[col].to_numpy(dtype=np.float64)[order], starts, 1)
+        features[f'{col}_ma_7'] = grouped_rolling(weather, starts, 7, 'mean')
+        features[f'{col}_std_7'] = grouped_rolling(weather, starts, 7, 'std')
+    
+    # Back to the caller's row order
+    inverse = np.empty_like(order)
+    inverse[order] = np.arange(len(order))
+    return pd.DataFrame({name: values[inverse] for name, values in features.items()}, index=df.index)
@@ -0,0 +1,367 @@
+# -*- coding: utf-8 -*-
+"""
+Price Series Store
+Process-local columnar copy of crop_prices, keyed by (province, crop_type)
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# Price Series
+# ============================================================================
+
+class PriceSeries:
+    """Contiguous, read-only, date-sorted arrays for one province/crop series"""
+    
+    __slots__ = ('ids', 'dates', 'prices')
+    
+    def __init__(self, ids: np.ndarray, dates: np.ndarray, prices: np.ndarray):
+        order = np.lexsort((ids, dates))
+        self.ids = np.ascontiguousarray(ids[order], dtype=np.int64)
+        self.dates = np.ascontiguousarray(dates[order], dtype='datetime64[us]')
+        self.prices = np.ascontiguousarray(prices[order], dtype=np.float64)
+        
+        # Slices handed out to services are views - keep them immutable
+        for arr in (self.ids, self.dates, self.prices):
+            arr.flags.writeable = False
+    
+    @classmethod
+    def from_sorted(cls, ids: np.ndarray, dates: np.ndarray, prices: np.ndarray) -> "PriceSeries":
+        """Wrap arrays that are already sorted and read-only (no copy)"""
+        series = cls.__new__(cls)
+        series.ids, series.dates, series.prices = ids, dates, prices
+        return series
+    
+    def __len__(self) -> int:
+        return len(self.prices)
+    
+    def merge(self, ids: np.ndarray, dates: np.ndarray, prices: np.ndarray) -> "PriceSeries":
+        """New series with rows replaced/added by id"""
+        keep = ~np.isin(self.ids, ids)
+        return PriceSeries(
+            np.concatenate([self.ids[keep], ids]),
+            np.concatenate([self.dates[keep], dates]),
+            np.concatenate([self.prices[keep], prices])
+        )
+
+
+# ============================================================================
+# Price Series Store
+# ============================================================================
+
+class PriceSeriesStore:
+    """
+    In-memory time-series store for crop prices
+    
+    Loads crop_prices once, then pulls only rows whose created_at/updated_at
+    is at or after the watermark (on an interval, or right after a price
+    write). Readers get zero-copy slices of the per-series arrays.
+    """
+    
+    def __init__(self, refresh_interval: int = 300):
+        self.refresh_interval = refresh_interval
+        
+        # String -> integer id interning
+        self._province_ids: Dict[str, int] = {}
+        self._crop_ids: Dict[str, int] = {}
+        self._provinces: List[str] = []
+        self._crops: List[str] = []
+        
+        self._series: Dict[Tuple[int, int], PriceSeries] = {}  # (province_id, crop_id) -> series
+        self._changed_at: Dict[Tuple[int, int], datetime] = {}  # latest created_at/updated_at per series
+        self._watermark: Optional[datetime] = None
+        self._loaded = False
+        self._lock = threading.Lock()
+        
+        self.last_refresh: Optional[datetime] = None
+        self._stop_event = threading.Event()
+        self._thread = None
+    
+    # ------------------------------------------------------------------
+    # Loading / refresh
+    # ------------------------------------------------------------------
+    
+    def load(self, db=None) -> bool:
+        """
+        Load every crop_prices row into memory
+        
+        Returns:
+            True if loaded successfully
+        """
+        try:
+            start = time.time()
+            rows = self._query_rows(db, since=None)
+            
+            with self._lock:
+                self._series = {}
+                self._changed_at = {}
+                self._merge_rows(rows)
+                self._loaded = True
+            
+            logger.info(f"✅ Price series store loaded: {len(rows)} rows, {len(self._series)} series "
+                        f"in {time.time() - start:.2f}s")
+            return True
+        
+        except Exception as e:
+            logger.error(f"Failed to load price series store: {e}")
+            self._loaded = False
+            return False
+    
+    def refresh(self, db=None) -> int:
+        """
+        Pull rows created/updated since the watermark
+        
+        Returns:
+            Number of rows merged (0 if the store is not loaded)
+        """
+        if not self._loaded:
+            return 0
+        
+        try:
+            rows = self._query_rows(db, since=self._watermark)
+            if rows:
+                with self._lock:
+                    self._merge_rows(rows)
+                logger.info(f"🔄 Price series store refreshed: {len(rows)} new/changed rows")
+            return len(rows)
+        
+        except Exception as e:
+            logger.error(f"Failed to refresh price series store: {e}")
+            return 0
+    
+    def _query_rows(self, db, since: Optional[datetime]) -> list:
+        """Query (id, province, crop_type, date, price, changed_at) rows"""
+        from database import SessionLocal, CropPrice
+        from sqlalchemy import func
+        
+        own_session = db is None
+        if own_session:
+            db = SessionLocal()
+        
+        try:
+            changed_at = func.coalesce(CropPrice.updated_at, CropPrice.created_at)
+            query = db.query(
+                CropPrice.id,
+                CropPrice.province,
+                CropPrice.crop_type,
+                CropPrice.date,
+                CropPrice.price_per_kg,
+                changed_at.label('changed_at')
+            ).filter(
+                CropPrice.price_per_kg.isnot(None),
+                CropPrice.date.isnot(None)
+            )
+            
+            # >= so rows committed with the same timestamp are not missed (merge is by id)
+            if since is not None:
+                query = query.filter(changed_at >= since)
+            
+            return query.all()
+        finally:
+            if own_session:
+                db.close()
+    
+    def _merge_rows(self, rows: list):
+        """Group rows by series and merge them in (caller holds the lock)"""
+        grouped: Dict[Tuple[int, int], Tuple[list, list, list]] = {}
+        
+        for row_id, province, crop_type, date, price, changed_at in rows:
+            key = (self._intern(self._province_ids, self._provinces, province),
+                   self._intern(self._crop_ids, self._crops, crop_type))
+            ids, dates, prices = grouped.setdefault(key, ([], [], []))
+            ids.append(row_id)
+            dates.append(date)
+            prices.append(price)
+            
+            if changed_at is not None:
+                if self._watermark is None or changed_at > self._watermark:
+                    self._watermark = changed_at
+                if key not in self._changed_at or changed_at > self._changed_at[key]:
+                    self._changed_at[key] = changed_at
+        
+        for key, (ids, dates, prices) in grouped.items():
+            ids = np.array(ids, dtype=np.int64)
+            dates = np.array(dates, dtype='datetime64[us]')
+            prices = np.array(prices, dtype=np.float64)
+            
+            existing = self._series.get(key)
+            # Replace the dict entry in one assignment so readers never see a partial series
+            self._series[key] = existing.merge(ids, dates, prices) if existing else PriceSeries(ids, dates, prices)
+        
+        self.last_refresh = datetime.now()
+    
+    @staticmethod
+    def _intern(ids: Dict[str, int], names: List[str], name: str) -> int:
+        if name not in ids:
+            ids[name] = len(names)
+            names.append(name)
+        return ids[name]
+    
+    def pack(self) -> int:
+        """
+        Move every series into one read-only shared block (before forking workers)
+        
+        Series merged later by refresh() get their own arrays again.
+        
+        Returns:
+            Bytes packed
+        """
+        from preload import pack_arrays
+        
+        with self._lock:
+            keys = list(self._series)
+            arrays = []
+            for key in keys:
+                series = self._series[key]
+                arrays.extend((series.ids, series.dates, series.prices))
+            
+            packed = pack_arrays(arrays)
+            for i, key in enumerate(keys):
+                self._series[key] = PriceSeries.from_sorted(*packed[3 * i:3 * i + 3])
+        
+        return sum(arr.nbytes for arr in packed)
+    
+    def start(self):
+        """Start periodic background refresh"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._refresh_loop)
+            self._thread.daemon = True
+            self._thread.start()
+            logger.info(f"✅ Price series refresh started (every {self.refresh_interval}s)")
+    
+    def stop(self):
+        """Stop periodic background refresh"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+        logger.info("🛑 Price series refresh stopped")
+    
+    def _refresh_loop(self):
+        while not self._stop_event.wait(self.refresh_interval):
+            if self._loaded:
+                self.refresh()
+            else:
+                self.load()
+    
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    
+    def is_loaded(self) -> bool:
+        """Check if the store has been loaded"""
+        return self._loaded
+    
+    def get_series(self, crop_type: str, province: str) -> Optional[PriceSeries]:
+        """Full series for a crop/province, or None"""
+        province_id = self._province_ids.get(province)
+        crop_id = self._crop_ids.get(crop_type)
+        if province_id is None or crop_id is None:
+            return None
+        return self._series.get((province_id, crop_id))
+    
+    def get_window(
+        self,
+        crop_type: str,
+        province: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Dates and prices with start <= date < end (zero-copy views, oldest first)
+        """
+        series = self.get_series(crop_type, province)
+        if series is None:
+            return np.empty(0, dtype='datetime64[us]'), np.empty(0, dtype=np.float64)
+        
+        lo = 0 if start is None else np.searchsorted(series.dates, np.datetime64(start, 'us'), side='left')
+        hi = len(series) if end is None else np.searchsorted(series.dates, np.datetime64(end, 'us'), side='left')
+        return series.dates[lo:hi], series.prices[lo:hi]
+    
+    def get_last(self, crop_type: str, province: str, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Last n dates and prices (zero-copy views, oldest first)"""
+        series = self.get_series(crop_type, province)
+        if series is None:
+            return np.empty(0, dtype='datetime64[us]'), np.empty(0, dtype=np.float64)
+        return series.dates[-n:], series.prices[-n:]
+    
+    def record_count(self, crop_type: str, province: str) -> int:
+        """Number of price records for a crop/province"""
+        series = self.get_series(crop_type, province)
+        return len(series) if series is not None else 0
+    
+    def latest_change(self, crop_type: str, province: str) -> Optional[datetime]:
+        """Latest created_at/updated_at seen for a crop/province"""
+        province_id = self._province_ids.get(province)
+        crop_id = self._crop_ids.get(crop_type)
+        if province_id is None or crop_id is None:
+            return None
+        return self._changed_at.get((province_id, crop_id))
+    
+    def get_pairs(self, min_records: int = 0) -> List[Tuple[str, str]]:
+        """All (crop_type, province) pairs with at least min_records prices"""
+        return [
+            (self._crops[crop_id], self._provinces[province_id])
+            for (province_id, crop_id), series in list(self._series.items())
+            if len(series) >= min_records
+        ]
+    
+    def get_crops_for_province(self, province: str) -> List[str]:
+        """Crop types that have prices in a province"""
+        province_id = self._province_ids.get(province)
+        if province_id is None:
+            return []
+        return [self._crops[crop_id] for (p_id, crop_id) in list(self._series) if p_id == province_id]
+    
+    def get_province_counts(self, crop_type: str, min_records: int = 0) -> List[Tuple[str, int]]:
+        """(province, record_count) for a crop, most records first"""
+        crop_id = self._crop_ids.get(crop_type)
+        if crop_id is None:
+            return []
+        counts = [
+            (self._provinces[province_id], len(series))
+            for (province_id, c_id), series in list(self._series.items())
+            if c_id == crop_id and len(series) >= min_records
+        ]
+        return sorted(counts, key=lambda item: item[1], reverse=True)
+    
+    def get_stats(self) -> Dict:
+        """Store statistics"""
+        series = list(self._series.values())
+        return {
+            'loaded': self._loaded,
+            'series': len(series),
+            'rows': sum(len(s) for s in series),
+            'provinces': len(self._provinces),
+            'crops': len(self._crops),
+            'memory_bytes': sum(s.ids.nbytes + s.dates.nbytes + s.prices.nbytes for s in series),
+            'watermark': self._watermark.isoformat() if self._watermark else None,
+            'last_refresh': self.last_refresh.isoformat() if self.last_refresh else None
+        }
+
+
+def to_datetimes(dates: np.ndarray) -> List[datetime]:
+    """datetime64 array -> list of datetime objects"""
+    return dates.astype('datetime64[us]').tolist()
+
+
+def to_date_strings(dates: np.ndarray) -> List[str]:
+    """datetime64 array -> list of 'YYYY-MM-DD' strings"""
+    return np.datetime_as_string(dates, unit='D').tolist()
+
+
+# Global instance
+try:
+    from config import PRICE_STORE_REFRESH_SECONDS
+except ImportError:
+    PRICE_STORE_REFRESH_SECONDS = 300
+
+price_series_store = PriceSeriesStore(refresh_interval=PRICE_STORE_REFRESH_SECONDS)
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+Recommendation Store
+Materialized Model A recommendations for the discrete input grid
+
+Model A's answer depends only on province, month, water availability (which
+filters the candidate crops) and goal (which re-weights them); soil type,
+budget and risk tolerance don't change it. The store keeps, for every grid
+key, the top-N candidate crops in ranked order plus the model's predicted
+ROI per (province, month, crop), so a request rebuilds its N recommendation
+dicts with the same code as live inference instead of scoring every crop.
+Built offline with scripts/build_suitability_cubes.py into models/cube/:
+    
+    <name>.json                 grid labels, crops, version, build info
+    <name>.predicted_roi.npy    (provinces, months, crops) float64
+    <name>.ranking.npy          (provinces, months, waters, goals, top_n) crop
+                                positions, -1 padded
+
+Arrays are opened with mmap_mode='r' like the suitability cubes; a store
+whose version no longer matches is ignored and requests are served live.
+"""
+
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+import numpy as np
+
+from suitability_cube import CUBE_DIR
+
+logger = logging.getLogger(__name__)
+
+STORE_FORMAT = 1
+
+
+class RecommendationStore:
+    """Read-only (province, month, water, goal) -> ranked top-N crops lookup"""
+    
+    def __init__(
+        self,
+        predicted_roi: np.ndarray,
+        ranking: np.ndarray,
+        provinces: List[str],
+        months: List[int],
+        waters: List[Optional[str]],
+        goals: List[Optional[str]],
+        crops: List[str],
+        version: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        self.predicted_roi = predicted_roi
+        self.ranking = ranking
+        self.provinces = list(provinces)
+        self.months = list(months)
+        self.waters = list(waters)
+        self.goals = list(goals)
+        self.crops = list(crops)
+        self.version = version
+        self.metadata = metadata or {}
+        
+        self._province_index = {p: i for i, p in enumerate(self.provinces)}
+        self._month_index = {m: i for i, m in enumerate(self.months)}
+        self._water_index = {w: i for i, w in enumerate(self.waters)}
+        self._goal_index = {g: i for i, g in enumerate(self.goals)}
+    
+    @property
+    def nbytes(self) -> int:
+        return self.predicted_roi.nbytes + self.ranking.nbytes
+    
+    @property
+    def top_n(self) -> int:
+        return self.ranking.shape[-1]
+    
+    def lookup(
+        self, province: str, month: int, water: Hashable, goal: Hashable
+    ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Ranked crops for one grid key
+        
+        Returns:
+            (crop positions in ranked order, predicted ROI per crop position),
+            or None if the key is outside the grid or has no ranked crops
+        """
+        i = self._province_index.get(province)
+        m = self._month_index.get(month)
+        w = self._water_index.get(water)
+        g = self._goal_index.get(goal)
+        if i is None or m is None or w is None or g is None:
+            return None
+        
+        ranked = self.ranking[i, m, w, g]
+        ranked = ranked[ranked >= 0]
+        if len(ranked) == 0:
+            return None
+        
+        return ranked, self.predicted_roi[i, m]
+    
+    # ------------------------------------------------------------------
+    # Files
+    # ------------------------------------------------------------------
+    
+    def save(self, name: str, directory: Optional[Path] = None) -> Path:
+        """Write <name>.json, <name>.predicted_roi.npy and <name>.ranking.npy"""
+        directory = Path(directory or CUBE_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / f"{name}.predicted_roi.npy", np.ascontiguousarray(self.predicted_roi))
+        np.save(directory / f"{name}.ranking.npy", np.ascontiguousarray(self.ranking))
+        
+        meta_path = directory / f"{name}.json"
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "name": name,
+                "format": STORE_FORMAT,
+                "version": self.version,
+                "shape": list(self.ranking.shape),
+                "provinces": self.provinces,
+                "months": self.months,
+                "waters": self.waters,
+                "goals": self.goals,
+                "crops": self.crops,
+                "built_at": datetime.now().isoformat(),
+                **self.metadata
+            }, f, ensure_ascii=False)
+        
+        logger.info(f"✅ Recommendation store {name} saved: {int(np.prod(self.ranking.shape[:-1]))} keys, "
+                    f"top {self.top_n} ({self.nbytes / 1e6:.1f} MB)")
+        return meta_path
+    
+    @classmethod
+    def load(cls, name: str, version: str, directory: Optional[Path] = None) -> Optional["RecommendationStore"]:
+        """
+        Memory-map a saved store
+        
+        Returns:
+            The store, or None if it is missing or was built for another version
+        """
+        directory = Path(directory or CUBE_DIR)
+        meta_path = directory / f"{name}.json"
+        if not meta_path.exists():
+            logger.info(f"ℹ️ Recommendation store {name} not built, using live inference")
+            return None
+        
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
+            
+            if metadata.get("format") != STORE_FORMAT or metadata.get("version") != version:
+                logger.warning(f"⚠️ Recommendation store {name} is stale (built for {metadata.get('version')}, "
+                               f"current {version}), using live inference")
+                return None
+            
+            store = cls(
+                np.load(directory / f"{name}.predicted_roi.npy", mmap_mode='r'),
+                np.load(directory / f"{name}.ranking.npy", mmap_mode='r'),
+                metadata["provinces"], metadata["months"], metadata["waters"],
+                metadata["goals"], metadata["crops"], version, metadata
+            )
+            logger.info(f"✅ Recommendation store {name} mapped ({store.nbytes / 1e6:.1f} MB, version {version})")
+            return store
+        
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to load recommendation store {name}: {e}, using live inference")
+            return None
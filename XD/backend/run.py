@@ -12,6 +12,11 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 if __name__ == "__main__":
+    # python run.py --profile-startup: per-module import / per-service init breakdown
+    if "--profile-startup" in sys.argv:
+        from startup_profiler import main
+        sys.exit(main([arg for arg in sys.argv[1:] if arg != "--profile-startup"]))
+    
     print("🚀 Starting Farmme Backend API...")
     print("📍 Server will be available at: http://localhost:8000")
     print("📚 API Documentation: http://localhost:8000/docs")
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Build Suitability Cubes Script
+Evaluates Model B (province x crop x day) and the planting calendar model
+(region x crop x day) once, materializes Model A's top-N recommendations
+(province x month x water x goal) and writes the results to backend/models/cube
+
+Re-run after retraining a model or importing new weather / crop data; the
+services ignore a cube whose version no longer matches and serve live.
+
+Usage:
+    python scripts/build_suitability_cubes.py
+"""
+
+import os
+import sys
+import json
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import logging
+
+from suitability_cube import CUBE_DIR
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def build_model_b() -> dict:
+    """Model B good-window probabilities"""
+    from model_b_wrapper import ModelBWrapper, CUBE_NAME
+    
+    cube = ModelBWrapper().build_cube()
+    cube.save(CUBE_NAME)
+    return {"name": CUBE_NAME, "version": cube.version, "shape": list(cube.fields["proba_good"].shape), "bytes": cube.nbytes}
+
+
+def build_planting_calendar() -> dict:
+    """Planting calendar model suitability scores"""
+    from planting_model_service import PlantingCalendarModelService, PLANTING_CUBE_NAME
+    
+    cube = PlantingCalendarModelService().build_cube()
+    cube.save(PLANTING_CUBE_NAME)
+    return {"name": PLANTING_CUBE_NAME, "version": cube.version, "shape": list(cube.fields["suitability_score"].shape), "bytes": cube.nbytes}
+
+
+def build_model_a_recommendations() -> dict:
+    """Model A top-N recommendations"""
+    from model_a_wrapper import ModelAWrapper, RECOMMENDATION_STORE_NAME
+    
+    store = ModelAWrapper().build_recommendation_store()
+    store.save(RECOMMENDATION_STORE_NAME)
+    return {"name": RECOMMENDATION_STORE_NAME, "version": store.version, "shape": list(store.ranking.shape), "bytes": store.nbytes}
+
+
+def main():
+    logger.info(f"Building suitability cubes in {CUBE_DIR}")
+    
+    results = []
+    failed = 0
+    for step in (build_model_b, build_planting_calendar, build_model_a_recommendations):
+        try:
+            results.append(step())
+        except Exception as e:
+            failed += 1
+            logger.error(f"❌ {step.__name__} failed: {e}")
+    
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
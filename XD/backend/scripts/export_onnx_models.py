@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+Export ONNX Models Script
+Converts the production Model A / B / C pickles in backend/models to ONNX
+(backend/models/onnx) and checks each export against its pickle
+
+Usage:
+    python scripts/export_onnx_models.py
+Then run the API with MODEL_INFERENCE_BACKEND=onnx
+"""
+
+import os
+import sys
+import json
+import pickle
+from pathlib import Path
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import joblib
+import logging
+
+from onnx_backend import export_model, ONNX_DIR
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MODELS_DIR = Path(__file__).parent.parent / "models"
+
+# Same search order as the wrappers
+MODEL_A_FILES = ["model_a_gradient_boosting.pkl", "model_a_xgboost.pkl"]
+MODEL_B_FILES = ["model_b_xgboost.pkl", "model_b_xgboost_v2.pkl"]
+MODEL_C_FILES = [
+    "model_c_v8_stratified_low.pkl",
+    "model_c_v8_stratified_medium.pkl",
+    "model_c_v8_stratified_high.pkl",
+    "model_c_v8_fallback.pkl",
+    "model_c_stratified_low_final.pkl",
+    "model_c_stratified_medium_final.pkl",
+    "model_c_stratified_high_final.pkl",
+]
+
+
+def export_model_a() -> list:
+    """Model A estimators (the scaler stays a separate, plain StandardScaler)"""
+    results = []
+    for model_file in MODEL_A_FILES:
+        path = MODELS_DIR / model_file
+        if path.exists():
+            results.append(export_model(joblib.load(path), path.stem, source=path))
+    return results
+
+
+def export_model_b() -> list:
+    """Model B classifier with the bundled scaler written to the sidecar"""
+    results = []
+    for model_file in MODEL_B_FILES:
+        path = MODELS_DIR / model_file
+        if not path.exists():
+            continue
+        
+        with open(path, 'rb') as f:
+            bundle = pickle.load(f)
+        
+        if isinstance(bundle, dict):
+            extra = {k: bundle.get(k) for k in ("version", "algorithm", "trained_date", "split_strategy", "feature_names")}
+            results.append(export_model(bundle["model"], path.stem, source=path, scaler=bundle.get("scaler"), extra_metadata=extra))
+        else:
+            results.append(export_model(bundle, path.stem, source=path))
+    return results
+
+
+def export_model_c() -> list:
+    """Model C stratified (and fallback) regressors"""
+    results = []
+    for model_file in MODEL_C_FILES:
+        path = MODELS_DIR / model_file
+        if path.exists():
+            with open(path, 'rb') as f:
+                results.append(export_model(pickle.load(f), path.stem, source=path))
+    return results
+
+
+def main():
+    logger.info(f"Exporting production models to {ONNX_DIR}")
+    
+    results = []
+    for step in (export_model_a, export_model_b, export_model_c):
+        try:
+            results.extend(step())
+        except Exception as e:
+            logger.error(f"❌ {step.__name__} failed: {e}")
+    
+    summary = [
+        {"name": r["name"], "parity_passed": r["parity_passed"], "parity_max_err": r["parity_max_err"]}
+        for r in results
+    ]
+    print(json.dumps(summary, indent=2))
+    
+    return 0 if results and all(r["parity_passed"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
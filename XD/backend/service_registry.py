@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+Service Registry
+Lazily loaded model services and datasets
+
+Nothing heavy is imported when the API starts: each service is imported and
+built on first use (get / proxy) or by the background warmup started in the
+app lifespan. /health/ready reports the warmup progress.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime
+from importlib import import_module
+from types import FunctionType
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# name -> (module, attribute), in warmup order; functions are lazy getters
+# called once to build the service
+SERVICES = [
+    ("model_c_wrapper", "model_c_wrapper", "model_c_wrapper"),
+    ("model_b_wrapper", "model_b_wrapper", "get_model_b"),
+    ("model_a_wrapper", "model_a_wrapper", "model_a_wrapper"),
+    ("model_d_wrapper", "model_d_wrapper", "model_d_wrapper"),
+    ("planting_model_service", "planting_model_service", "planting_model_service"),
+    ("price_prediction_service", "price_prediction_service", "price_prediction_service"),
+    ("recommendation_model_service", "recommendation_model_service", "recommendation_model_service"),
+    ("water_management_service", "water_management_service", "water_management_service"),
+    ("unified_model_service", "unified_model_service", "unified_model_service"),
+    ("gemini_function_handler", "gemini_functions", "function_handler"),
+    ("gemini_sdk", "app.routers.chat", "get_genai"),
+]
+
+
+class LazyService:
+    """Attribute access proxy that loads the registered service on first use"""
+    
+    def __init__(self, registry: "ServiceRegistry", name: str):
+        object.__setattr__(self, "_registry", registry)
+        object.__setattr__(self, "_name", name)
+    
+    def __getattr__(self, attr):
+        return getattr(self._registry.get(self._name), attr)
+    
+    def __bool__(self) -> bool:
+        return self._registry.get_optional(self._name) is not None
+    
+    def __repr__(self) -> str:
+        return f"<LazyService {self._name}>"
+
+
+class ServiceRegistry:
+    """Load-on-first-use registry with background warmup"""
+    
+    def __init__(self):
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._warmup_thread = None
+        self.warmup_started_at: Optional[datetime] = None
+        self.warmup_finished_at: Optional[datetime] = None
+    
+    def register(self, name: str, module: str, attr: str):
+        """Register a service as `module.attr` (a function is called to build it)"""
+        self._entries[name] = {
+            "module": module,
+            "attr": attr,
+            "state": "pending",      # pending | loading | loaded | failed
+            "instance": None,
+            "seconds": None,
+            "error": None,
+            "lock": threading.Lock()
+        }
+    
+    # ------------------------------------------------------------------
+    # Access
+    # ------------------------------------------------------------------
+    
+    def get(self, name: str) -> Any:
+        """
+        Service instance, loading it now if needed
+        
+        Raises:
+            KeyError: Unknown service
+            RuntimeError: The service failed to load (now or earlier)
+        """
+        entry = self._entries[name]
+        if entry["state"] == "loaded":
+            return entry["instance"]
+        
+        # Failures stick: a broken model is not re-imported on every request
+        with entry["lock"]:
+            if entry["state"] == "pending":
+                self._load(name, entry)
+        if entry["state"] == "failed":
+            raise RuntimeError(f"Service {name} failed to load: {entry['error']}")
+        return entry["instance"]
+    
+    def get_optional(self, name: str) -> Optional[Any]:
+        """Service instance, or None if it cannot be loaded"""
+        try:
+            return self.get(name)
+        except Exception as e:
+            logger.warning(f"⚠️ {name} not available: {e}")
+            return None
+    
+    def proxy(self, name: str) -> LazyService:
+        """Stand-in for a module-level singleton that loads on first attribute access"""
+        return LazyService(self, name)
+    
+    def is_loaded(self, name: str) -> bool:
+        return name in self._entries and self._entries[name]["state"] == "loaded"
+    
+    def loaded_services(self) -> Dict[str, Any]:
+        """Instances of every service loaded so far"""
+        return {name: e["instance"] for name, e in self._entries.items() if e["state"] == "loaded"}
+    
+    def _load(self, name: str, entry: Dict[str, Any]):
+        """Import and build a service (caller holds the entry lock)"""
+        entry["state"] = "loading"
+        entry["error"] = None
+        start = time.time()
+        try:
+            instance = getattr(import_module(entry["module"]), entry["attr"])
+            if isinstance(instance, FunctionType):
+                instance = instance()
+            entry["instance"] = instance
+            entry["state"] = "loaded"
+            entry["seconds"] = round(time.time() - start, 3)
+            logger.info(f"✅ {name} loaded in {entry['seconds']:.2f}s")
+        except Exception as e:
+            entry["state"] = "failed"
+            entry["error"] = str(e)
+            entry["seconds"] = round(time.time() - start, 3)
+            logger.error(f"❌ {name} failed to load: {e}")
+    
+    # ------------------------------------------------------------------
+    # Warmup
+    # ------------------------------------------------------------------
+    
+    def warmup(self, names: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Load services in registration order (failures are recorded, not raised)"""
+        self.warmup_started_at = self.warmup_started_at or datetime.now()
+        for name in names or list(self._entries):
+            self.get_optional(name)
+        self.warmup_finished_at = datetime.now()
+        
+        status = self.status()
+        logger.info(f"✅ Service warmup finished: {status['loaded']}/{status['total']} loaded, "
+                    f"{status['failed']} failed")
+        return status
+    
+    def start_warmup(self):
+        """Warm up every service in a background thread"""
+        if self._warmup_thread is None or not self._warmup_thread.is_alive():
+            self.warmup_started_at = datetime.now()
+            self.warmup_finished_at = None
+            self._warmup_thread = threading.Thread(target=self.warmup)
+            self._warmup_thread.daemon = True
+            self._warmup_thread.start()
+            logger.info(f"🔥 Service warmup started ({len(self._entries)} services)")
+    
+    def status(self) -> Dict[str, Any]:
+        """Warmup progress and per-service state"""
+        services = {
+            name: {
+                "state": e["state"],
+                "seconds": e["seconds"],
+                **({"error": e["error"]} if e["error"] else {})
+            }
+            for name, e in self._entries.items()
+        }
+        total = len(services)
+        loaded = sum(1 for s in services.values() if s["state"] == "loaded")
+        failed = sum(1 for s in services.values() if s["state"] == "failed")
+        
+        return {
+            "complete": loaded + failed == total,
+            "total": total,
+            "loaded": loaded,
+            "failed": failed,
+            "progress": round((loaded + failed) / total, 3) if total else 1.0,
+            "started_at": self.warmup_started_at.isoformat() if self.warmup_started_at else None,
+            "finished_at": self.warmup_finished_at.isoformat() if self.warmup_finished_at else None,
+            "services": services
+        }
+
+
+# Global instance
+service_registry = ServiceRegistry()
+for _name, _module, _attr in SERVICES:
+    service_registry.register(_name, _module, _attr)
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+Startup Profiler
+Per-module import time and per-service init time of a cold API start
+
+Import times come from `python -X importtime -c "import app.main"` in a
+fresh interpreter; init times come from loading every service registered
+in service_registry, plus the cache and database connections.
+
+Usage:
+    python run.py --profile-startup
+    python startup_profiler.py --top 40
+"""
+
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List
+
+BACKEND_DIR = Path(__file__).parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+def _local_packages() -> set:
+    """Top-level module names that belong to this backend"""
+    names = {p.stem for p in BACKEND_DIR.glob("*.py")}
+    names.update(p.name for p in BACKEND_DIR.iterdir() if (p / "__init__.py").exists())
+    return names
+
+
+def profile_imports(target: str = "app.main") -> Dict[str, Any]:
+    """
+    Import `target` in a fresh interpreter with -X importtime
+    
+    Returns:
+        {"modules": [{"module", "self_us", "cumulative_us", "local"}],
+         "total_us", "returncode", "error"}
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=str(BACKEND_DIR),
+        capture_output=True,
+        text=True,
+        env={**os.environ, "SERVICE_WARMUP_ENABLED": "false"}
+    )
+    
+    local = _local_packages()
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            _, self_us, cumulative_us, name = [part.strip() for part in line.replace("import time:", "|").split("|")]
+            modules.append({
+                "module": name,
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+                "local": name.split(".")[0] in local
+            })
+        except ValueError:
+            continue
+    
+    error = None
+    if result.returncode != 0:
+        messages = [line for line in result.stderr.splitlines() if line.strip() and not line.startswith("import time:")]
+        error = messages[-1] if messages else "import failed"
+    
+    return {
+        "modules": modules,
+        "total_us": sum(m["self_us"] for m in modules),
+        "returncode": result.returncode,
+        "error": error
+    }
+
+
+def profile_init() -> List[Dict[str, Any]]:
+    """Time cache/database connections and every registered service load"""
+    timings = []
+    
+    start = time.time()
+    try:
+        from cache import cache
+        backend = type(cache._cache).__name__
+        timings.append({"name": f"cache ({backend})", "seconds": time.time() - start, "state": "loaded"})
+    except Exception as e:
+        timings.append({"name": "cache", "seconds": time.time() - start, "state": "failed", "error": str(e)})
+    
+    start = time.time()
+    try:
+        from database import engine
+        with engine.connect():
+            pass
+        timings.append({"name": "database connection", "seconds": time.time() - start, "state": "loaded"})
+    except Exception as e:
+        timings.append({"name": "database connection", "seconds": time.time() - start, "state": "failed",
+                        "error": str(e).splitlines()[0]})
+    
+    from service_registry import service_registry
+    status = service_registry.warmup()
+    for name, service in status["services"].items():
+        timings.append({"name": name, **service})
+    
+    return timings
+
+
+def print_report(imports: Dict[str, Any], init: List[Dict[str, Any]], top: int = 25):
+    """Print the import and init breakdown"""
+    print("=" * 80)
+    print("STARTUP PROFILE")
+    print("=" * 80)
+    
+    if imports["error"]:
+        print(f"⚠️ import app.main failed: {imports['error']}")
+    
+    by_package = defaultdict(int)
+    for m in imports["modules"]:
+        by_package[m["module"].split(".")[0]] += m["self_us"]
+    
+    print(f"\nImport time by top-level package (total {imports['total_us'] / 1e6:.2f}s)")
+    print(f"{'package':<40} {'self [s]':>10} {'share':>8}")
+    for package, us in sorted(by_package.items(), key=lambda kv: -kv[1])[:top]:
+        share = us / imports["total_us"] if imports["total_us"] else 0
+        print(f"{package:<40} {us / 1e6:>10.3f} {share:>8.1%}")
+    
+    local = [m for m in imports["modules"] if m["local"]]
+    print("\nBackend modules by cumulative import time")
+    print(f"{'module':<40} {'cumulative [s]':>15} {'self [s]':>10}")
+    for m in sorted(local, key=lambda m: -m["cumulative_us"])[:top]:
+        print(f"{m['module']:<40} {m['cumulative_us'] / 1e6:>15.3f} {m['self_us'] / 1e6:>10.3f}")
+    
+    print("\nInit time (cache, database, lazily loaded services)")
+    print(f"{'service':<40} {'seconds':>10}  state")
+    for t in init:
+        error = f"  ({t['error'][:60]})" if t.get("error") else ""
+        print(f"{t['name']:<40} {(t['seconds'] or 0):>10.3f}  {t['state']}{error}")
+    
+    total_init = sum(t["seconds"] or 0 for t in init)
+    print(f"\nImport {imports['total_us'] / 1e6:.2f}s + init {total_init:.2f}s "
+          f"= {imports['total_us'] / 1e6 + total_init:.2f}s cold start")
+    print("=" * 80)
+
+
+def main(argv: List[str] = None) -> int:
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Per-module import and per-service init time of the API")
+    parser.add_argument("--top", type=int, default=25, help="Rows per table")
+    parser.add_argument("--no-init", action="store_true", help="Only profile imports")
+    args = parser.parse_args(argv)
+    
+    imports = profile_imports()
+    init = [] if args.no_init else profile_init()
+    print_report(imports, init, top=args.top)
+    return 0 if imports["returncode"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+Suitability Cube
+Precomputed model outputs for every (row, crop, calendar day) key
+
+A cube is a dense array per output field, indexed by a row (province or
+region), a crop and a calendar date key - the part of the planting date the
+model's features actually depend on, e.g. (month, day_of_year). Built
+offline with scripts/build_suitability_cubes.py into models/cube/:
+    
+    <name>.json            index maps, date keys, version, build info
+    <name>.<field>.npy     one (rows, crops, date keys) array per field
+
+The .npy files are opened with mmap_mode='r', so lookups are direct array
+indexing and every worker shares the same page-cache copy. A cube whose
+version (hash of the model and its input datasets) no longer matches is
+ignored and the service falls back to live inference.
+"""
+
+import hashlib
+import json
+import logging
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CUBE_DIR = Path(__file__).parent / "models" / "cube"
+CUBE_FORMAT = 1
+
+# Every weekday/leap-year combination of the Gregorian calendar occurs in 28 years
+CALENDAR_CYCLE_YEARS = range(2000, 2028)
+
+
+def file_digest(paths: Sequence[Path]) -> str:
+    """sha256 over the contents of `paths` (missing files hash by name)"""
+    digest = hashlib.sha256(f"cube-format-{CUBE_FORMAT}".encode())
+    for path in paths:
+        path = Path(path)
+        digest.update(path.name.encode())
+        if path.exists():
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+        else:
+            digest.update(b'missing')
+    return digest.hexdigest()[:16]
+
+
+def calendar_keys(date_key: Callable[[date], Hashable]) -> Tuple[List[Hashable], List[date]]:
+    """
+    Every distinct date key over a full calendar cycle
+    
+    Returns:
+        (keys, one representative date per key)
+    """
+    keys, dates, seen = [], [], set()
+    day = date(CALENDAR_CYCLE_YEARS[0], 1, 1)
+    end = date(CALENDAR_CYCLE_YEARS[-1], 12, 31)
+    while day <= end:
+        key = date_key(day)
+        if key not in seen:
+            seen.add(key)
+            keys.append(key)
+            dates.append(day)
+        day += timedelta(days=1)
+    return keys, dates
+
+
+class SuitabilityCube:
+    """Read-only (row, crop, date key) -> field value lookup table"""
+    
+    def __init__(
+        self,
+        fields: Dict[str, np.ndarray],
+        rows: List[str],
+        crops: List[str],
+        date_keys: List[Hashable],
+        version: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        self.fields = fields
+        self.rows = list(rows)
+        self.crops = list(crops)
+        self.date_keys = [tuple(k) if isinstance(k, list) else k for k in date_keys]
+        self.version = version
+        self.metadata = metadata or {}
+        
+        self._row_index = {r: i for i, r in enumerate(self.rows)}
+        self._crop_index = {c: i for i, c in enumerate(self.crops)}
+        self._date_index = {k: i for i, k in enumerate(self.date_keys)}
+    
+    @property
+    def nbytes(self) -> int:
+        return sum(arr.nbytes for arr in self.fields.values())
+    
+    def lookup(self, row: str, crop: str, keys: Sequence[Hashable]) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Field values for one row/crop at many date keys
+        
+        Returns:
+            {field: array aligned with keys}, or None if the row, crop or any
+            date key is not in the cube
+        """
+        i = self._row_index.get(row)
+        j = self._crop_index.get(crop)
+        if i is None or j is None:
+            return None
+        
+        positions = [self._date_index.get(k) for k in keys]
+        if None in positions:
+            return None
+        
+        positions = np.asarray(positions, dtype=np.intp)
+        return {name: arr[i, j, positions] for name, arr in self.fields.items()}
+    
+    # ------------------------------------------------------------------
+    # Files
+    # ------------------------------------------------------------------
+    
+    def save(self, name: str, directory: Optional[Path] = None) -> Path:
+        """Write <name>.json and one <name>.<field>.npy per field"""
+        directory = Path(directory or CUBE_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        for field, arr in self.fields.items():
+            np.save(directory / f"{name}.{field}.npy", np.ascontiguousarray(arr))
+        
+        meta_path = directory / f"{name}.json"
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "name": name,
+                "format": CUBE_FORMAT,
+                "version": self.version,
+                "fields": {field: arr.dtype.name for field, arr in self.fields.items()},
+                "shape": list(next(iter(self.fields.values())).shape),
+                "rows": self.rows,
+                "crops": self.crops,
+                "date_keys": [list(k) if isinstance(k, tuple) else k for k in self.date_keys],
+                "built_at": datetime.now().isoformat(),
+                **self.metadata
+            }, f, ensure_ascii=False)
+        
+        logger.info(f"✅ Cube {name} saved: {len(self.rows)}x{len(self.crops)}x{len(self.date_keys)} "
+                    f"({self.nbytes / 1e6:.1f} MB)")
+        return meta_path
+    
+    @classmethod
+    def load(cls, name: str, version: str, directory: Optional[Path] = None) -> Optional["SuitabilityCube"]:
+        """
+        Memory-map a saved cube
+        
+        Returns:
+            The cube, or None if it is missing or was built for another version
+        """
+        directory = Path(directory or CUBE_DIR)
+        meta_path = directory / f"{name}.json"
+        if not meta_path.exists():
+            logger.info(f"ℹ️ Cube {name} not built, using live inference")
+            return None
+        
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
+            
+            if metadata.get("version") != version:
+                logger.warning(f"⚠️ Cube {name} is stale (built for {metadata.get('version')}, "
+                               f"current {version}), using live inference")
+                return None
+            
+            fields = {
+                field: np.load(directory / f"{name}.{field}.npy", mmap_mode='r')
+                for field in metadata["fields"]
+            }
+            cube = cls(fields, metadata["rows"], metadata["crops"], metadata["date_keys"], version, metadata)
+            logger.info(f"✅ Cube {name} mapped ({cube.nbytes / 1e6:.1f} MB, version {version})")
+            return cube
+        
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to load cube {name}: {e}, using live inference")
+            return None
+
+
+def build_cube(
+    rows: List[str],
+    crops: List[str],
+    date_key: Callable[[date], Hashable],
+    evaluate: Callable[[str, List[str], List[date]], Dict[str, np.ndarray]],
+    dtypes: Dict[str, Any],
+    version: str,
+    metadata: Optional[Dict[str, Any]] = None
+) -> SuitabilityCube:
+    """
+    Evaluate a model over rows x crops x calendar date keys
+    
+    Args:
+        rows: Row labels (provinces or regions)
+        crops: Crop labels
+        date_key: Calendar date -> key the model's features depend on
+        evaluate: (row, crops, dates) -> {field: array of len(crops) * len(dates),
+            crop-major}; called once per row
+        dtypes: Storage dtype per field
+        version: Version string stored in the cube
+        metadata: Extra metadata fields
+    """
+    start = time.time()
+    keys, dates = calendar_keys(date_key)
+    shape = (len(rows), len(crops), len(keys))
+    fields = {name: np.empty(shape, dtype=dtype) for name, dtype in dtypes.items()}
+    
+    for i, row in enumerate(rows):
+        values = evaluate(row, crops, dates)
+        for name in fields:
+            fields[name][i] = np.asarray(values[name]).reshape(len(crops), len(keys))
+    
+    logger.info(f"✅ Evaluated {np.prod(shape)} cube cells in {time.time() - start:.1f}s")
+    return SuitabilityCube(fields, rows, crops, keys, version, metadata)
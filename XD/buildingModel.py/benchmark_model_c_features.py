@@ -0,0 +1,92 @@
+"""
+Benchmark Model C feature engineering
+======================================
+Compares the per-group lambda transforms the v8 training script used to run
+with the vectorized price_feature_engine.model_c_frame_features on the same
+panel, checks the outputs match and prints the timings.
+
+Usage (from XD/):
+    python buildingModel.py/benchmark_model_c_features.py [path/to/FARMME_GPU_DATASET.csv]
+"""
+
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from price_feature_engine import model_c_frame_features
+
+WEATHER_COLS = ['temperature_celsius', 'rainfall_mm', 'humidity_percent']
+
+
+def legacy_features(df, weather_cols):
+    """Feature block of train_model_c_v8_improved.py before vectorization"""
+    out = pd.DataFrame(index=df.index)
+    grouped = df.groupby(['province', 'crop_type'])
+    
+    for lag in [7, 14, 21, 30]:
+        out[f'price_lag_{lag}'] = grouped['price_per_kg'].shift(lag)
+    
+    for window in [7, 14, 30]:
+        out[f'price_ma_{window}'] = grouped['price_per_kg'].transform(
+            lambda x: x.shift(7).rolling(window, min_periods=1).mean()
+        )
+        out[f'price_std_{window}'] = grouped['price_per_kg'].transform(
+            lambda x: x.shift(7).rolling(window, min_periods=1).std()
+        )
+        out[f'price_median_{window}'] = grouped['price_per_kg'].transform(
+            lambda x: x.shift(7).rolling(window, min_periods=1).median()
+        )
+    
+    out['price_momentum_7d'] = (out['price_lag_7'] - out['price_lag_14']) / (out['price_lag_14'] + 1e-6)
+    out['price_momentum_30d'] = (out['price_lag_7'] - out['price_lag_30']) / (out['price_lag_30'] + 1e-6)
+    out['price_volatility_7d'] = out['price_std_7'] / (out['price_ma_7'] + 1e-6)
+    out['price_volatility_30d'] = out['price_std_30'] / (out['price_ma_30'] + 1e-6)
+    
+    for col in weather_cols:
+        out[f'{col}_ma_7'] = grouped[col].transform(
+            lambda x: x.shift(1).rolling(7, min_periods=1).mean()
+        )
+        out[f'{col}_std_7'] = grouped[col].transform(
+            lambda x: x.shift(1).rolling(7, min_periods=1).std()
+        )
+    
+    return out
+
+
+def main(path='buildingModel.py/Dataset/FARMME_GPU_DATASET.csv'):
+    print(f"📊 Loading {path}...")
+    df = pd.read_csv(path)
+    df['date'] = pd.to_datetime(df['date'])
+    df = df.sort_values(['province', 'crop_type', 'date']).reset_index(drop=True)
+    weather_cols = [col for col in WEATHER_COLS if col in df.columns]
+    print(f"✅ {len(df):,} rows, {df.groupby(['province', 'crop_type']).ngroups:,} series")
+    
+    start = time.perf_counter()
+    legacy = legacy_features(df, weather_cols)
+    legacy_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    vectorized = model_c_frame_features(df, weather_cols=weather_cols)
+    vectorized_time = time.perf_counter() - start
+    
+    max_err = 0.0
+    for col in legacy.columns:
+        a = legacy[col].to_numpy(dtype=np.float64)
+        b = vectorized[col].to_numpy(dtype=np.float64)
+        assert np.array_equal(np.isnan(a), np.isnan(b)), f"NaN mismatch in {col}"
+        diff = np.abs(a - b)[~np.isnan(a)]
+        scale = np.maximum(np.abs(a[~np.isnan(a)]), 1.0)
+        max_err = max(max_err, float((diff / scale).max()) if len(diff) else 0.0)
+    
+    print(f"\n{'implementation':<20} {'seconds':>10}")
+    print(f"{'lambda transforms':<20} {legacy_time:>10.2f}")
+    print(f"{'vectorized':<20} {vectorized_time:>10.2f}")
+    print(f"\n🚀 Speedup: {legacy_time / vectorized_time:.1f}x, max relative difference {max_err:.1e} "
+          f"over {len(legacy.columns)} features")
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,251 @@
+"""
+Parallel training orchestrator for Model C
+==========================================
+Runs independent fits (algorithm comparison, per-stratum and fallback
+models) as jobs in a process pool with a fixed core budget.
+
+The training/test matrices are written once as .npy files and every worker
+opens them with mmap_mode='r'; a job only carries file names and the name of
+its row subset, never a pickled copy of the data. Each job's n_jobs and
+BLAS/OpenMP threads are capped at its share of the budget so concurrent
+HistGradientBoosting / RandomForest / XGBoost fits don't oversubscribe.
+
+Workers are loky processes (joblib), which import this module but not the
+calling training script, so the script itself needs no __main__ guard.
+
+Usage:
+    with MatrixStore(features, 'target_price_7d') as store:
+        store.add('train', train_df)
+        store.add_subset('train.low', 'train', train_df['price_category'] == 'low')
+        ...
+        results, report = run_jobs(jobs, store, n_cores=8)
+    print_report([report])
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from threadpoolctl import threadpool_limits
+from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
+
+
+def regression_metrics(y_true, y_pred):
+    """MAE / RMSE / R² / MAPE as reported by the v8 training script"""
+    y_true = np.asarray(y_true, dtype=np.float64)
+    y_pred = np.asarray(y_pred, dtype=np.float64)
+    return {
+        'mae': mean_absolute_error(y_true, y_pred),
+        'rmse': np.sqrt(mean_squared_error(y_true, y_pred)),
+        'r2': r2_score(y_true, y_pred),
+        'mape': np.mean(np.abs((y_true - y_pred) / (y_true + 1e-6))) * 100
+    }
+
+
+class MatrixStore:
+    """Feature matrices on disk, shared with the workers through memory maps"""
+    
+    def __init__(self, features, target, directory=None):
+        self.features = list(features)
+        self.target = target
+        self.directory = directory or tempfile.mkdtemp(prefix='model_c_train_')
+        self._owns_directory = directory is None
+        os.makedirs(self.directory, exist_ok=True)
+        self.matrices = {}
+        self.subsets = {}
+    
+    def add(self, name, frame):
+        """Write frame[features] and frame[target] as <name>.X.npy / <name>.y.npy"""
+        x_path = os.path.join(self.directory, f'{name}.X.npy')
+        y_path = os.path.join(self.directory, f'{name}.y.npy')
+        np.save(x_path, frame[self.features].to_numpy(dtype=np.float64))
+        np.save(y_path, frame[self.target].to_numpy(dtype=np.float64))
+        self.matrices[name] = {'X': x_path, 'y': y_path, 'rows': None, 'size': len(frame)}
+        self.subsets[name] = self.matrices[name]
+    
+    def add_subset(self, name, parent, mask):
+        """Register the rows of `parent` selected by a boolean mask (order kept)"""
+        rows = np.flatnonzero(np.asarray(mask, dtype=bool))
+        rows_path = os.path.join(self.directory, f'{name}.rows.npy')
+        np.save(rows_path, rows)
+        self.subsets[name] = {**self.matrices[parent], 'rows': rows_path, 'size': len(rows)}
+    
+    def size(self, name):
+        return self.subsets[name]['size']
+    
+    def spec(self, name):
+        """Picklable description of a subset (file paths and column names)"""
+        return {**self.subsets[name], 'features': self.features}
+    
+    @property
+    def nbytes(self):
+        return sum(os.path.getsize(os.path.join(self.directory, f)) for f in os.listdir(self.directory))
+    
+    def cleanup(self):
+        if self._owns_directory:
+            shutil.rmtree(self.directory, ignore_errors=True)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.cleanup()
+
+
+def load_subset(spec):
+    """Open a subset in a worker: memory-mapped matrix, rows gathered on demand"""
+    X = np.load(spec['X'], mmap_mode='r')
+    y = np.load(spec['y'], mmap_mode='r')
+    if spec['rows'] is not None:
+        rows = np.load(spec['rows'])
+        X, y = X[rows], y[rows]
+    return pd.DataFrame(X, columns=spec['features']), np.asarray(y)
+
+
+def _run_job(job, train_spec, test_spec, threads):
+    """Fit and evaluate one estimator inside a worker process"""
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    
+    with threadpool_limits(limits=threads):
+        params = dict(job['params'])
+        if 'n_jobs' in params:
+            params['n_jobs'] = threads
+        model = job['estimator'](**params)
+        if job.get('quiet') and hasattr(model, 'verbose'):
+            model.verbose = 0
+        
+        X_train, y_train = load_subset(train_spec)
+        start = time.perf_counter()
+        model.fit(X_train, y_train)
+        train_time = time.perf_counter() - start
+        del X_train, y_train
+        
+        # The saved model keeps the configured n_jobs for inference
+        if 'n_jobs' in params:
+            model.set_params(n_jobs=job['params']['n_jobs'])
+        
+        X_test, y_test = load_subset(test_spec)
+        start = time.perf_counter()
+        y_pred = model.predict(X_test)
+        predict_time = time.perf_counter() - start
+    
+    return {
+        'name': job['name'],
+        'model': model,
+        'metrics': regression_metrics(y_test, y_pred),
+        'train_samples': train_spec['size'],
+        'test_samples': test_spec['size'],
+        'train_time': train_time,
+        'predict_time': predict_time,
+        'wall_time': time.perf_counter() - wall_start,
+        'cpu_time': time.process_time() - cpu_start,
+        'threads': threads,
+        'pid': os.getpid()
+    }
+
+
+def _safe_run_job(job, train_spec, test_spec, threads):
+    """_run_job that reports a failure instead of cancelling the other jobs"""
+    try:
+        return _run_job(job, train_spec, test_spec, threads)
+    except Exception as e:
+        return {'name': job['name'], 'error': str(e)}
+
+
+def resolve_cores(n_cores=None):
+    """Core budget: n_cores if set (negative counts back from all cores), else all cores"""
+    available = os.cpu_count() or 1
+    if n_cores is None or n_cores == 0:
+        return available
+    if n_cores < 0:
+        return max(1, available + 1 + n_cores)
+    return min(n_cores, available)
+
+
+def run_jobs(jobs, store, n_cores=None, stage='training'):
+    """
+    Run fit/evaluate jobs concurrently within a core budget
+    
+    Args:
+        jobs: List of {'name', 'estimator' (class), 'params', 'train', 'test'
+            (subset names in store), 'quiet' (optional, sets verbose=0)}
+        store: MatrixStore holding the subsets
+        n_cores: Core budget (None = all cores)
+        stage: Label for the report
+    
+    Returns:
+        ({job name: result dict}, stage report); a failed job's result is
+        {'name', 'error'}
+    """
+    budget = resolve_cores(n_cores)
+    if not jobs:
+        return {}, {'stage': stage, 'cores': budget, 'workers': 0, 'threads_per_job': 0, 'wall_time': 0.0,
+                    'cpu_time': 0.0, 'utilization': 0.0, 'serial_wall_time': 0.0, 'jobs': []}
+    
+    workers = min(len(jobs), budget)
+    threads = max(1, budget // workers)
+    
+    # Largest fits first so the longest job isn't started last
+    ordered = sorted(jobs, key=lambda job: -store.size(job['train']))
+    
+    wall_start = time.perf_counter()
+    outputs = Parallel(n_jobs=workers, backend='loky', max_nbytes=None)(
+        delayed(_safe_run_job)(job, store.spec(job['train']), store.spec(job['test']), threads)
+        for job in ordered
+    )
+    wall_time = time.perf_counter() - wall_start
+    
+    results = {out['name']: out for out in outputs}
+    cpu_time = sum(out.get('cpu_time', 0.0) for out in outputs)
+    report = {
+        'stage': stage,
+        'cores': budget,
+        'workers': workers,
+        'threads_per_job': threads,
+        'wall_time': wall_time,
+        'cpu_time': cpu_time,
+        'utilization': cpu_time / (wall_time * budget) if wall_time > 0 else 0.0,
+        'serial_wall_time': sum(out.get('wall_time', 0.0) for out in outputs),
+        'jobs': [
+            {key: out[key] for key in ('name', 'wall_time', 'cpu_time', 'threads', 'pid', 'error') if key in out}
+            for out in (results[job['name']] for job in jobs)
+        ]
+    }
+    return results, report
+
+
+def print_report(reports):
+    """Wall-clock and CPU utilization per stage and job"""
+    print("\n" + "="*80)
+    print("⏱️  TRAINING RESOURCE REPORT")
+    print("="*80)
+    
+    total_wall = total_cpu = total_core_seconds = 0.0
+    for report in reports:
+        print(f"\n📦 {report['stage']}: {report['workers']} workers x {report['threads_per_job']} threads "
+              f"(budget {report['cores']} cores)")
+        print(f"   {'Job':<24} {'Wall(s)':>10} {'CPU(s)':>10} {'Cores used':>12} {'Threads':>8}")
+        print("   " + "-" * 68)
+        for job in report['jobs']:
+            if 'error' in job:
+                print(f"   {job['name']:<24} ❌ {job['error']}")
+                continue
+            cores_used = job['cpu_time'] / job['wall_time'] if job['wall_time'] > 0 else 0.0
+            print(f"   {job['name']:<24} {job['wall_time']:>10.1f} {job['cpu_time']:>10.1f} "
+                  f"{cores_used:>12.2f} {job['threads']:>8}")
+        
+        speedup = report['serial_wall_time'] / report['wall_time'] if report['wall_time'] > 0 else 0.0
+        print(f"   Stage wall: {report['wall_time']:.1f}s (jobs back to back: {report['serial_wall_time']:.1f}s, "
+              f"{speedup:.2f}x), CPU: {report['cpu_time']:.1f}s, utilization: {report['utilization']:.0%}")
+        
+        total_wall += report['wall_time']
+        total_cpu += report['cpu_time']
+        total_core_seconds += report['wall_time'] * report['cores']
+    
+    utilization = total_cpu / total_core_seconds if total_core_seconds > 0 else 0.0
+    print(f"\n   Total parallel wall: {total_wall:.1f}s, CPU: {total_cpu:.1f}s, utilization: {utilization:.0%}")
+    print("="*80)
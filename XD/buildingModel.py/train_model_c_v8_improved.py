@@ -21,10 +21,17 @@ from sklearn.model_selection import TimeSeriesSplit
 import pickle
 import json
 import os
+import sys
 from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+# Shared with the serving wrapper (backend/price_feature_engine.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from price_feature_engine import model_c_frame_features
+from parallel_training import MatrixStore, run_jobs, print_report
+import atexit
+
 # Try to import XGBoost (optional)
 try:
     import xgboost as xgb
@@ -56,6 +63,7 @@ CONFIG = {
     'train_fallback': True,  # Train fallback model for missing categories
     'include_weather': True,  # Include weather features
     'include_seasonal': True,  # Include seasonal features
+    'n_cores': None,  # Core budget for parallel fits (None = all cores, -1 = all but one)
     'verbose': 1
 }
 
@@ -96,12 +104,26 @@ if not XGBOOST_AVAILABLE and 'xgboost' in CONFIG['algorithms_to_test']:
     print(f"   ⚠️  XGBoost removed (not installed)")
 print()
 
+ALGORITHM_CLASSES = {
+    'hist_gbr': HistGradientBoostingRegressor,
+    'random_forest': RandomForestRegressor
+}
+if XGBOOST_AVAILABLE:
+    ALGORITHM_CLASSES['xgboost'] = xgb.XGBRegressor
+
 # ============================================================================
 # Load and Prepare Data
 # ============================================================================
 print("📊 Loading FULL dataset...")
-df = pd.read_csv('buildingModel.py/Dataset/FARMME_GPU_DATASET.csv')
-df['date'] = pd.to_datetime(df['date'])
+# Only the columns this script uses; province / crop_type as categoricals
+MODEL_C_COLUMNS = ['date', 'province', 'crop_type', 'price_per_kg',
+                   'temperature_celsius', 'rainfall_mm', 'humidity_percent']
+df = pd.read_csv(
+    'buildingModel.py/Dataset/FARMME_GPU_DATASET.csv',
+    usecols=lambda col: col in MODEL_C_COLUMNS,
+    dtype={'province': 'category', 'crop_type': 'category'},
+    parse_dates=['date']
+)
 df = df.sort_values(['province', 'crop_type', 'date']).reset_index(drop=True)
 print(f"✅ Loaded {len(df):,} rows")
 print(f"   Date range: {df['date'].min()} to {df['date'].max()}")
@@ -125,60 +147,28 @@ if existing_leaky:
 # Create Target
 # ============================================================================
 print("\n🎯 Creating target (7-day ahead price)...")
-df['target_price_7d'] = df.groupby(['province', 'crop_type'])['price_per_kg'].shift(-7)
+df['target_price_7d'] = df.groupby(['province', 'crop_type'], observed=True)['price_per_kg'].shift(-7)
 print(f"✅ Target created")
 
 # ============================================================================
 # Feature Engineering
 # ============================================================================
 print("\n🔧 Creating features...")
-grouped = df.groupby(['province', 'crop_type'])
-
-# Price lags
-print("   - Price lags (7, 14, 21, 30 days)...")
-for lag in [7, 14, 21, 30]:
-    df[f'price_lag_{lag}'] = grouped['price_per_kg'].shift(lag)
-
-# Moving averages (shifted by 7 days to prevent leakage)
-print("   - Moving averages (7, 14, 30 days)...")
-for window in [7, 14, 30]:
-    df[f'price_ma_{window}'] = grouped['price_per_kg'].transform(
-        lambda x: x.shift(7).rolling(window, min_periods=1).mean()
-    )
-    df[f'price_std_{window}'] = grouped['price_per_kg'].transform(
-        lambda x: x.shift(7).rolling(window, min_periods=1).std()
-    )
-    # Add median for outlier resistance
-    df[f'price_median_{window}'] = grouped['price_per_kg'].transform(
-        lambda x: x.shift(7).rolling(window, min_periods=1).median()
-    )
-
-# Momentum features
-print("   - Momentum features...")
-df['price_momentum_7d'] = (df['price_lag_7'] - df['price_lag_14']) / (df['price_lag_14'] + 1e-6)
-df['price_momentum_30d'] = (df['price_lag_7'] - df['price_lag_30']) / (df['price_lag_30'] + 1e-6)
-
-# Volatility
-print("   - Volatility features...")
-df['price_volatility_7d'] = df['price_std_7'] / (df['price_ma_7'] + 1e-6)
-df['price_volatility_30d'] = df['price_std_30'] / (df['price_ma_30'] + 1e-6)
+print("   - Price lags (7, 14, 21, 30 days), moving averages (7, 14, 30 days), momentum, volatility...")
 
 # Weather features (if available)
+available_weather = []
 if CONFIG['include_weather']:
     print("   - Weather features...")
     weather_cols = ['temperature_celsius', 'rainfall_mm', 'humidity_percent']
     available_weather = [col for col in weather_cols if col in df.columns]
-    
-    for col in available_weather:
-        # 7-day rolling average
-        df[f'{col}_ma_7'] = grouped[col].transform(
-            lambda x: x.shift(1).rolling(7, min_periods=1).mean()
-        )
-        # 7-day rolling std
-        df[f'{col}_std_7'] = grouped[col].transform(
-            lambda x: x.shift(1).rolling(7, min_periods=1).std()
-        )
-    
+
+# Lags, shifted moving mean/std/median, momentum, volatility and weather
+# rolling stats in one vectorized pass over the sorted panel
+price_features = model_c_frame_features(df, weather_cols=available_weather)
+df[price_features.columns] = price_features
+
+if CONFIG['include_weather']:
     print(f"      Added: {available_weather}")
 
 # Seasonal features
@@ -299,6 +289,19 @@ for cat in ['low', 'medium', 'high']:
     pct = count / len(test_df) * 100
     print(f"      {cat:8s}: {count:8,} ({pct:5.1f}%)")
 
+# ============================================================================
+# Shared Training Matrices (memory-mapped by the parallel workers)
+# ============================================================================
+store = MatrixStore(available_features, 'target_price_7d')
+atexit.register(store.cleanup)
+store.add('train', train_df)
+store.add('test', test_df)
+for cat in ['low', 'medium', 'high']:
+    store.add_subset(f'train.{cat}', 'train', train_df['price_category'] == cat)
+    store.add_subset(f'test.{cat}', 'test', test_df['price_category'] == cat)
+training_reports = []
+print(f"\n💾 Shared matrices: {store.nbytes / 1e6:.1f} MB in {store.directory}")
+
 # ============================================================================
 # Algorithm Comparison (if enabled)
 # ============================================================================
@@ -307,65 +310,48 @@ if CONFIG['compare_algorithms']:
     print("="*80)
     
     # Use medium category for comparison (usually has most data)
-    train_medium = train_df[train_df['price_category'] == 'medium']
-    test_medium = test_df[test_df['price_category'] == 'medium']
+    print(f"   Comparison dataset: {store.size('train.medium'):,} train, {store.size('test.medium'):,} test")
     
-    X_train_comp = train_medium[available_features]
-    y_train_comp = train_medium['target_price_7d']
-    X_test_comp = test_medium[available_features]
-    y_test_comp = test_medium['target_price_7d']
-    
-    print(f"   Comparison dataset: {len(train_medium):,} train, {len(test_medium):,} test")
+    comparison_jobs = []
+    for algo_name in CONFIG['algorithms_to_test']:
+        if algo_name not in ALGORITHM_CLASSES:
+            print(f"   ⚠️  Skipping {algo_name} (not installed)")
+            continue
+        comparison_jobs.append({
+            'name': algo_name,
+            'estimator': ALGORITHM_CLASSES[algo_name],
+            'params': ALGORITHM_PARAMS[algo_name],
+            'train': 'train.medium',
+            'test': 'test.medium'
+        })
+    
+    # All candidates are fitted concurrently
+    print(f"   Testing {', '.join(job['name'].upper() for job in comparison_jobs)} in parallel...")
+    comparison_results, comparison_report = run_jobs(
+        comparison_jobs, store, CONFIG['n_cores'], stage='Algorithm comparison'
+    )
+    training_reports.append(comparison_report)
     
     algorithm_comparison = {}
     
-    for algo_name in CONFIG['algorithms_to_test']:
-        print(f"\n🤖 Testing {algo_name.upper()}...")
+    for job in comparison_jobs:
+        algo_name = job['name']
+        result = comparison_results[algo_name]
+        print(f"\n🤖 {algo_name.upper()}")
         
-        try:
-            # Create model
-            if algo_name == 'hist_gbr':
-                model = HistGradientBoostingRegressor(**ALGORITHM_PARAMS['hist_gbr'])
-            elif algo_name == 'random_forest':
-                model = RandomForestRegressor(**ALGORITHM_PARAMS['random_forest'])
-            elif algo_name == 'xgboost':
-                if not XGBOOST_AVAILABLE:
-                    print(f"   ⚠️  Skipping (not installed)")
-                    continue
-                model = xgb.XGBRegressor(**ALGORITHM_PARAMS['xgboost'])
-            
-            # Train
-            import time
-            start_time = time.time()
-            model.fit(X_train_comp, y_train_comp)
-            train_time = time.time() - start_time
-            
-            # Predict
-            start_time = time.time()
-            y_pred = model.predict(X_test_comp)
-            predict_time = time.time() - start_time
-            
-            # Evaluate
-            mae = mean_absolute_error(y_test_comp, y_pred)
-            rmse = np.sqrt(mean_squared_error(y_test_comp, y_pred))
-            r2 = r2_score(y_test_comp, y_pred)
-            mape = np.mean(np.abs((y_test_comp - y_pred) / (y_test_comp + 1e-6))) * 100
-            
-            algorithm_comparison[algo_name] = {
-                'mae': mae,
-                'rmse': rmse,
-                'r2': r2,
-                'mape': mape,
-                'train_time': train_time,
-                'predict_time': predict_time
-            }
-            
-            print(f"   ✅ MAE: {mae:.2f}, RMSE: {rmse:.2f}, R²: {r2:.4f}, MAPE: {mape:.2f}%")
-            print(f"   ⏱️  Train: {train_time:.1f}s, Predict: {predict_time:.3f}s")
-            
-        except Exception as e:
-            print(f"   ❌ Failed: {e}")
+        if 'error' in result:
+            print(f"   ❌ Failed: {result['error']}")
             continue
+        
+        metrics = result['metrics']
+        algorithm_comparison[algo_name] = {
+            **metrics,
+            'train_time': result['train_time'],
+            'predict_time': result['predict_time']
+        }
+        
+        print(f"   ✅ MAE: {metrics['mae']:.2f}, RMSE: {metrics['rmse']:.2f}, R²: {metrics['r2']:.4f}, MAPE: {metrics['mape']:.2f}%")
+        print(f"   ⏱️  Train: {result['train_time']:.1f}s, Predict: {result['predict_time']:.3f}s")
     
     # Select best algorithm based on MAE
     print("\n" + "="*80)
@@ -416,92 +402,63 @@ models = {}
 results = {}
 
 # Get model class and params for selected algorithm
-if selected_algorithm == 'hist_gbr':
-    ModelClass = HistGradientBoostingRegressor
-    model_params = ALGORITHM_PARAMS['hist_gbr']
-elif selected_algorithm == 'random_forest':
-    ModelClass = RandomForestRegressor
-    model_params = ALGORITHM_PARAMS['random_forest']
-elif selected_algorithm == 'xgboost':
-    ModelClass = xgb.XGBRegressor
-    model_params = ALGORITHM_PARAMS['xgboost']
+ModelClass = ALGORITHM_CLASSES[selected_algorithm]
+model_params = ALGORITHM_PARAMS[selected_algorithm]
 
+# LOW / MEDIUM / HIGH and the fallback main model (for cases where category
+# models fail) are independent fits, trained concurrently
+stratum_jobs = []
 for category in ['low', 'medium', 'high']:
-    print(f"\n🔄 Training {category.upper()} model...")
-    
-    train_cat = train_df[train_df['price_category'] == category]
-    test_cat = test_df[test_df['price_category'] == category]
-    
-    if len(train_cat) < 100:
-        print(f"   ⚠️  Insufficient data ({len(train_cat)} samples), skipping...")
+    if store.size(f'train.{category}') < 100:
+        print(f"   ⚠️  {category.upper()}: insufficient data ({store.size(f'train.{category}')} samples), skipping...")
         continue
-    
-    X_train_cat = train_cat[available_features]
-    y_train_cat = train_cat['target_price_7d']
-    X_test_cat = test_cat[available_features]
-    y_test_cat = test_cat['target_price_7d']
-    
-    print(f"   Training on {len(train_cat):,} samples...")
-    model = ModelClass(**model_params)
-    
-    # Set verbose to 0 for cleaner output
-    if hasattr(model, 'verbose'):
-        model.verbose = 0
-    
-    model.fit(X_train_cat, y_train_cat)
-    
-    # Evaluate
-    y_pred_test = model.predict(X_test_cat)
-    test_mae = mean_absolute_error(y_test_cat, y_pred_test)
-    test_rmse = np.sqrt(mean_squared_error(y_test_cat, y_pred_test))
-    test_r2 = r2_score(y_test_cat, y_pred_test)
-    test_mape = np.mean(np.abs((y_test_cat - y_pred_test) / (y_test_cat + 1e-6))) * 100
-    
-    models[category] = model
-    results[category] = {
-        'test_mae': test_mae,
-        'test_rmse': test_rmse,
-        'test_r2': test_r2,
-        'test_mape': test_mape,
-        'train_samples': len(train_cat),
-        'test_samples': len(test_cat)
-    }
-    
-    print(f"   ✅ MAE: {test_mae:.2f}, RMSE: {test_rmse:.2f}, R²: {test_r2:.4f}, MAPE: {test_mape:.2f}%")
+    stratum_jobs.append({
+        'name': category,
+        'estimator': ModelClass,
+        'params': model_params,
+        'train': f'train.{category}',
+        'test': f'test.{category}',
+        'quiet': True
+    })
 
-# ============================================================================
-# Train Fallback Main Model (Critical for Robustness!)
-# ============================================================================
 if CONFIG['train_fallback']:
-    print(f"\n🔄 Training FALLBACK main model (for robustness)...")
-    print(f"   This model handles cases where category models fail")
-    
-    X_train_all = train_df[available_features]
-    y_train_all = train_df['target_price_7d']
-    X_test_all = test_df[available_features]
-    y_test_all = test_df['target_price_7d']
-    
-    fallback_model = ModelClass(**model_params)
-    if hasattr(fallback_model, 'verbose'):
-        fallback_model.verbose = 0
-    
-    fallback_model.fit(X_train_all, y_train_all)
-    
-    y_pred_fallback = fallback_model.predict(X_test_all)
-    fallback_mae = mean_absolute_error(y_test_all, y_pred_fallback)
-    fallback_rmse = np.sqrt(mean_squared_error(y_test_all, y_pred_fallback))
-    fallback_r2 = r2_score(y_test_all, y_pred_fallback)
-    fallback_mape = np.mean(np.abs((y_test_all - y_pred_fallback) / (y_test_all + 1e-6))) * 100
-    
-    models['fallback'] = fallback_model
-    results['fallback'] = {
-        'test_mae': fallback_mae,
-        'test_rmse': fallback_rmse,
-        'test_r2': fallback_r2,
-        'test_mape': fallback_mape
+    stratum_jobs.append({
+        'name': 'fallback',
+        'estimator': ModelClass,
+        'params': model_params,
+        'train': 'train',
+        'test': 'test',
+        'quiet': True
+    })
+
+for job in stratum_jobs:
+    print(f"   🔄 {job['name'].upper()}: {store.size(job['train']):,} training samples")
+print(f"   Training {len(stratum_jobs)} models in parallel...")
+
+stratum_results, stratum_report = run_jobs(stratum_jobs, store, CONFIG['n_cores'], stage='Stratified models')
+training_reports.append(stratum_report)
+
+for job in stratum_jobs:
+    result = stratum_results[job['name']]
+    if 'error' in result:
+        raise RuntimeError(f"{job['name']} model failed: {result['error']}")
+    
+    metrics = result['metrics']
+    models[job['name']] = result['model']
+    results[job['name']] = {
+        'test_mae': metrics['mae'],
+        'test_rmse': metrics['rmse'],
+        'test_r2': metrics['r2'],
+        'test_mape': metrics['mape'],
+        'train_samples': result['train_samples'],
+        'test_samples': result['test_samples']
     }
     
-    print(f"   ✅ Fallback MAE: {fallback_mae:.2f}, RMSE: {fallback_rmse:.2f}, R²: {fallback_r2:.4f}, MAPE: {fallback_mape:.2f}%")
+    label = 'Fallback ' if job['name'] == 'fallback' else f"{job['name'].upper()} "
+    print(f"   ✅ {label}MAE: {metrics['mae']:.2f}, RMSE: {metrics['rmse']:.2f}, R²: {metrics['r2']:.4f}, MAPE: {metrics['mape']:.2f}%")
+
+print_report(training_reports)
+store.cleanup()
 
 # ============================================================================
 # Evaluate Combined Stratified Performance
@@ -622,6 +579,7 @@ metadata = {
     ],
     'config': CONFIG,
     'algorithm_params': model_params,
+    'training_resources': training_reports,
     'dataset': {
         'total_size': len(df_clean),
         'train_size': len(train_df),
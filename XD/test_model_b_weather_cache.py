@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Test Model B Weather Data Cache
+Checks the array-backed WeatherDataCache against the per-province
+DataFrame lookups it replaced: exact dates, 7-row recent averages for
+gaps, duplicate dates, NaN columns and monthly averages for future dates
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# Add backend to path
+backend_dir = Path(__file__).parent / "backend"
+sys.path.insert(0, str(backend_dir))
+
+from model_b_components import WeatherDataCache
+
+PROVINCES = ['เชียงใหม่', 'ขอนแก่น', 'สงขลา']
+RESULT_KEYS = ('temperature', 'rainfall', 'humidity', 'drought_index')
+
+
+def write_weather(path, seed=0):
+    """weather.csv with gaps, duplicate dates, scattered NaNs and an all-NaN column"""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i, province in enumerate(PROVINCES):
+        days = pd.date_range('2023-01-01', '2024-12-31', freq='D')
+        days = days[rng.random(len(days)) > 0.2]  # gaps
+        days = days.append(days[rng.random(len(days)) < 0.05])  # duplicate dates
+        frames.append(pd.DataFrame({
+            'date': days.strftime('%Y-%m-%d'),
+            'province': province,
+            'temperature_celsius': rng.uniform(18, 40, len(days)),
+            'rainfall_mm': rng.gamma(0.8, 6.0, len(days)),
+            'humidity_percent': rng.uniform(40, 95, len(days)),
+            'drought_index': np.nan if i == 2 else rng.uniform(0, 1, len(days)),
+        }))
+    df = pd.concat(frames, ignore_index=True).sample(frac=1, random_state=seed).reset_index(drop=True)
+    for col in ('temperature_celsius', 'rainfall_mm', 'humidity_percent'):
+        df.loc[rng.random(len(df)) < 0.05, col] = np.nan
+    df.to_csv(path, index=False)
+    return pd.read_csv(path)
+
+
+class LegacyWeatherCache:
+    """Per-province DataFrame lookups (previous implementation)"""
+    
+    def __init__(self, path):
+        df = pd.read_csv(path, parse_dates=['date'])
+        self._cache = {}
+        for province in df['province'].unique():
+            province_data = df[df['province'] == province].copy()
+            # Stable, so duplicate dates keep file order (the first row wins)
+            self._cache[province] = province_data.sort_values('date', kind='stable')
+    
+    def get_weather(self, province, date, use_historical=False):
+        if province not in self._cache:
+            return None
+        province_data = self._cache[province]
+        
+        if use_historical or date > pd.Timestamp.now():
+            province_data = province_data.copy()
+            month_data = province_data[province_data['date'].dt.month == date.month]
+            if len(month_data) == 0:
+                return None
+            return self._to_weather(month_data.mean(numeric_only=True), 'historical_average')
+        
+        exact_match = province_data[province_data['date'] == date.strftime('%Y-%m-%d')]
+        if len(exact_match) > 0:
+            return self._to_weather(exact_match.iloc[0], 'actual')
+        
+        past_data = province_data[province_data['date'] <= date].tail(7)
+        if len(past_data) > 0:
+            return self._to_weather(past_data.mean(numeric_only=True), 'recent_average')
+        return None
+    
+    @staticmethod
+    def _to_weather(row, data_type):
+        return {
+            'temperature': float(row['temperature_celsius']),
+            'rainfall': float(row['rainfall_mm']),
+            'humidity': float(row['humidity_percent']),
+            'drought_index': float(row['drought_index']),
+            'data_type': data_type
+        }
+
+
+def assert_weather_matches(actual, expected, label):
+    if expected is None:
+        assert actual is None, label
+        return
+    assert actual['data_type'] == expected['data_type'], label
+    for key in RESULT_KEYS:
+        np.testing.assert_allclose(actual[key], expected[key], rtol=1e-12, atol=1e-12,
+                                   equal_nan=True, err_msg=f"{label} {key}")
+
+
+def test_cache_matches_dataframe_lookups():
+    """Exact, gap, duplicate, before-coverage and future dates for every province"""
+    print("\n" + "="*80)
+    print("🧪 TEST WEATHER DATA CACHE vs DATAFRAME LOOKUPS")
+    print("="*80)
+    
+    with tempfile.TemporaryDirectory() as root:
+        path = Path(root) / "weather.csv"
+        df = write_weather(path)
+        cache = WeatherDataCache(path)
+        assert cache.load()
+        legacy = LegacyWeatherCache(path)
+        
+        # Every day of the coverage (exact and gap dates), some before it, future dates
+        dates = list(pd.date_range('2022-12-20', '2025-01-10', freq='D'))
+        dates += [pd.Timestamp('2024-06-15 13:45'), pd.Timestamp.now() + pd.Timedelta(days=40)]
+        dates += [pd.Timestamp.now().normalize() + pd.DateOffset(months=m) for m in range(1, 13)]
+        
+        seen = set()
+        for province in PROVINCES + ['ไม่มีจังหวัด']:
+            for date in dates:
+                expected = legacy.get_weather(province, date)
+                assert_weather_matches(cache.get_weather(province, date), expected, f"{province} {date}")
+                seen.add(expected['data_type'] if expected else None)
+            for month in range(1, 13):
+                date = pd.Timestamp(2023, month, 1)
+                assert_weather_matches(cache.get_weather(province, date, use_historical=True),
+                                       legacy.get_weather(province, date, use_historical=True),
+                                       f"{province} month {month}")
+        
+        assert seen == {'actual', 'recent_average', 'historical_average', None}
+        print(f"✅ {len(dates) * (len(PROVINCES) + 1)} lookups match ({len(df)} weather rows)")
+
+
+def test_duplicate_dates_first_row_wins():
+    """A date listed twice returns the row that comes first in the file"""
+    with tempfile.TemporaryDirectory() as root:
+        path = Path(root) / "weather.csv"
+        df = write_weather(path, seed=3)
+        cache = WeatherDataCache(path)
+        assert cache.load()
+        
+        first = df[df.duplicated(['province', 'date'], keep=False)].drop_duplicates(['province', 'date'], keep='first')
+        first = first[first['temperature_celsius'].notna()]
+        assert len(first) > 0, "no duplicate dates exercised"
+        for _, row in first.iterrows():
+            weather = cache.get_weather(row['province'], pd.Timestamp(row['date']))
+            assert weather['data_type'] == 'actual'
+            assert weather['temperature'] == row['temperature_celsius']
+        print(f"✅ first row wins for {len(first)} duplicated dates")
+
+
+if __name__ == "__main__":
+    test_cache_matches_dataframe_lookups()
+    test_duplicate_dates_first_row_wins()
+    print("\n" + "="*80)
+    print("✅ ALL TESTS PASSED")
+    print("="*80)
@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Test Model B Weather Window Index
+Checks WeatherWindowIndex prefix-sum lookups against the weather.csv
+mask / mean / sum / count computation ModelBWrapper used before, and that
+the batched calendar path windows planting dates like the single-date path
+"""
+
+import sys
+from pathlib import Path
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+
+# Add backend to path
+backend_dir = Path(__file__).parent / "backend"
+sys.path.insert(0, str(backend_dir))
+
+import model_b_wrapper
+from model_b_wrapper import ModelBWrapper, WeatherWindowIndex
+
+PROVINCES = ['เชียงใหม่', 'ขอนแก่น', 'สงขลา']
+
+
+def make_weather(seed=0):
+    """Daily weather with gaps, duplicate days, NaNs and a province-wide hole"""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for province in PROVINCES:
+        days = pd.date_range('2023-01-01', '2024-12-31', freq='D')
+        days = days[rng.random(len(days)) > 0.15]  # gaps
+        days = days[(days < '2024-03-01') | (days > '2024-05-15')]  # no rows at all
+        days = days.append(days[rng.random(len(days)) < 0.03])  # duplicate days
+        frames.append(pd.DataFrame({
+            'province': province,
+            'date': days,
+            'temperature_celsius': rng.uniform(18, 40, len(days)),
+            'rainfall_mm': rng.gamma(0.6, 8.0, len(days)) * (rng.random(len(days)) > 0.4),
+        }))
+    df = pd.concat(frames, ignore_index=True).sample(frac=1, random_state=seed).reset_index(drop=True)
+    df.loc[rng.random(len(df)) < 0.05, 'temperature_celsius'] = np.nan
+    df.loc[rng.random(len(df)) < 0.05, 'rainfall_mm'] = np.nan
+    return df
+
+
+def legacy_window(df, province, start_date, end_date):
+    """Mask / mean / sum / count over weather.csv (previous implementation)"""
+    mask = (
+        (df['province'] == province) &
+        (df['date'] >= start_date) &
+        (df['date'] <= end_date)
+    )
+    weather_data = df[mask]
+    if len(weather_data) == 0:
+        return None
+    return {
+        'avg_temp': float(weather_data['temperature_celsius'].mean()),
+        'avg_rainfall': float(weather_data['rainfall_mm'].mean()),
+        'total_rainfall': float(weather_data['rainfall_mm'].sum()),
+        'rainy_days': float((weather_data['rainfall_mm'] > 0.1).sum()),
+        'rows': len(weather_data)
+    }
+
+
+def random_windows(n=300, seed=0):
+    """30-day windows ending the day before planting dates in and around the data"""
+    rng = np.random.default_rng(seed)
+    planting = pd.Timestamp('2022-11-01') + pd.to_timedelta(rng.integers(0, 850, n), unit='D')
+    ends = planting - pd.Timedelta(days=1)
+    return ends - pd.Timedelta(days=29), ends
+
+
+def assert_window_matches(actual, expected, label):
+    for key in ('avg_temp', 'avg_rainfall', 'total_rainfall', 'rainy_days', 'rows'):
+        np.testing.assert_allclose(actual[key], expected[key], rtol=1e-9, atol=1e-9,
+                                   equal_nan=True, err_msg=f"{label} {key}")
+
+
+def test_window_matches_dataframe_filter():
+    """Single-window lookups, including empty windows and unknown provinces"""
+    print("\n" + "="*80)
+    print("🧪 TEST WEATHER WINDOW INDEX vs DATAFRAME FILTER")
+    print("="*80)
+    
+    df = make_weather()
+    index = WeatherWindowIndex(df)
+    starts, ends = random_windows()
+    
+    empty = 0
+    for province in PROVINCES + ['ไม่มีจังหวัด']:
+        for start, end in zip(starts, ends):
+            expected = legacy_window(df, province, start, end)
+            actual = index.window(province, start.to_pydatetime(), end.to_pydatetime())
+            if expected is None:
+                assert actual is None, f"{province} {start.date()} should have no rows"
+                empty += 1
+            else:
+                assert_window_matches(actual, expected, f"{province} {start.date()}")
+    
+    assert empty > len(starts), "empty windows not exercised"
+    print(f"✅ {len(starts) * (len(PROVINCES) + 1)} windows match ({empty} empty)")
+
+
+def test_windows_matches_single_lookups():
+    """Vectorized windows() agrees with the DataFrame filter row by row"""
+    df = make_weather(seed=1)
+    index = WeatherWindowIndex(df)
+    starts, ends = random_windows(seed=1)
+    
+    for province in PROVINCES + ['ไม่มีจังหวัด']:
+        batch = index.windows(province, starts.to_numpy(), ends.to_numpy())
+        for i, (start, end) in enumerate(zip(starts, ends)):
+            expected = legacy_window(df, province, start, end)
+            if expected is None:
+                assert batch['rows'][i] == 0
+            else:
+                assert_window_matches({key: values[i] for key, values in batch.items()}, expected,
+                                      f"{province} {start.date()}")
+    print("✅ batched windows match")
+
+
+class StandInModelB(ModelBWrapper):
+    """ModelBWrapper with a fitted stand-in classifier instead of the pickled model"""
+    
+    def __init__(self):
+        super().__init__()
+        rng = np.random.default_rng(0)
+        X = pd.DataFrame(rng.normal(size=(300, 17)), columns=self.required_features)
+        self.scaler = StandardScaler().fit(X)
+        self.model = LogisticRegression().fit(self.scaler.transform(X), (X.iloc[:, 1] + X.iloc[:, 4] > 0).astype(int))
+    
+    def load_model(self):
+        pass
+
+
+def test_calendar_with_time_of_day_matches_single_dates():
+    """predict_calendar(datetime with a time of day) == predict_planting_window('YYYY-MM-DD')"""
+    previous_index = model_b_wrapper._weather_index
+    model_b_wrapper._weather_index = WeatherWindowIndex(make_weather())
+    try:
+        wrapper = StandInModelB()
+        wrapper.cube = None
+        province = PROVINCES[0]
+        crop_type = next(iter(wrapper.crop_characteristics))
+        
+        # Like the planting router: now() + n days, time of day kept
+        now = datetime(2024, 10, 17, 14, 32)
+        calendar_dates = [now + timedelta(days=n) for n in range(-400, 60, 7)]
+        
+        calendar = wrapper.predict_calendar(crop_type, province, calendar_dates)
+        batch = wrapper.predict_batch([
+            {'crop_type': crop_type, 'province': province, 'planting_date': day} for day in calendar_dates
+        ])
+        for day, from_calendar, from_batch in zip(calendar_dates, calendar, batch):
+            single = wrapper.predict_planting_window(crop_type, province, day.strftime('%Y-%m-%d'))
+            for result in (from_calendar, from_batch):
+                assert result['features']['planting_date'] == single['features']['planting_date']
+                for key in ('avg_temp', 'avg_rainfall'):
+                    np.testing.assert_allclose(result['features'][key], single['features'][key],
+                                               rtol=1e-9, err_msg=f"{day} {key}")
+                np.testing.assert_allclose(result['probability']['good'], single['probability']['good'],
+                                           rtol=1e-9, err_msg=str(day))
+        print(f"✅ {len(calendar_dates)} calendar dates with a time of day match single-date predictions")
+    finally:
+        model_b_wrapper._weather_index = previous_index
+
+
+if __name__ == "__main__":
+    test_window_matches_dataframe_filter()
+    test_windows_matches_single_lookups()
+    test_calendar_with_time_of_day_matches_single_dates()
+    print("\n" + "="*80)
+    print("✅ ALL TESTS PASSED")
+    print("="*80)
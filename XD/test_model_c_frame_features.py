@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Test Model C v8 Panel Features
+Checks price_feature_engine.model_c_frame_features against the per-group
+lambda transforms the training script used before vectorization
+"""
+
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# Add backend and training script directories to path
+backend_dir = Path(__file__).parent / "backend"
+sys.path.insert(0, str(backend_dir))
+sys.path.insert(0, str(Path(__file__).parent / "buildingModel.py"))
+
+from price_feature_engine import model_c_frame_features
+from benchmark_model_c_features import legacy_features, WEATHER_COLS
+
+
+def make_panel(seed=0):
+    """Interleaved panel with short series, single-row series and missing values"""
+    rng = np.random.default_rng(seed)
+    frames = []
+    lengths = [1, 3, 7, 8, 15, 31, 45, 120]
+    for i, length in enumerate(lengths):
+        frames.append(pd.DataFrame({
+            'province': f"province_{i % 3}",
+            'crop_type': f"crop_{i}",
+            'date': pd.date_range('2024-01-01', periods=length, freq='D'),
+            'price_per_kg': rng.uniform(5, 60, length),
+            'temperature_celsius': rng.uniform(20, 38, length),
+            'rainfall_mm': rng.gamma(1.5, 4.0, length),
+            'humidity_percent': rng.uniform(50, 95, length)
+        }))
+    df = pd.concat(frames, ignore_index=True)
+    
+    # Missing prices / weather readings
+    for col in ['price_per_kg'] + WEATHER_COLS:
+        df.loc[rng.random(len(df)) < 0.05, col] = np.nan
+    
+    # Rows of different series interleaved, still chronological within each series
+    df = df.sort_values(['date', 'crop_type']).reset_index(drop=True)
+    df.index = df.index * 3 + 11
+    return df
+
+
+def assert_frames_match(expected, actual):
+    assert list(actual.index) == list(expected.index), "row order differs"
+    for col in expected.columns:
+        a = expected[col].to_numpy(dtype=np.float64)
+        b = actual[col].to_numpy(dtype=np.float64)
+        assert np.array_equal(np.isnan(a), np.isnan(b)), f"NaN mismatch in {col}"
+        np.testing.assert_allclose(b[~np.isnan(b)], a[~np.isnan(a)], rtol=1e-9, atol=1e-9, err_msg=col)
+
+
+def test_frame_features_match_groupby_lambdas():
+    """Lags, shifted rolling mean/std/median, momentum, volatility and weather stats"""
+    print("\n" + "="*80)
+    print("🧪 TEST MODEL C PANEL FEATURES vs GROUPBY LAMBDAS")
+    print("="*80)
+    
+    for seed in range(3):
+        df = make_panel(seed)
+        expected = legacy_features(df, WEATHER_COLS)
+        actual = model_c_frame_features(df, weather_cols=WEATHER_COLS)
+        
+        assert set(actual.columns) == set(expected.columns)
+        assert_frames_match(expected, actual[expected.columns])
+        print(f"✅ seed {seed}: {len(df)} rows, {len(expected.columns)} features match")
+
+
+def test_frame_features_without_weather():
+    """No weather columns requested -> price features only"""
+    df = make_panel(7)
+    expected = legacy_features(df, [])
+    actual = model_c_frame_features(df)
+    
+    assert set(actual.columns) == set(expected.columns)
+    assert_frames_match(expected, actual[expected.columns])
+    print("✅ price-only features match")
+
+
+if __name__ == "__main__":
+    test_frame_features_match_groupby_lambdas()
+    test_frame_features_without_weather()
+    print("\n" + "="*80)
+    print("✅ ALL TESTS PASSED")
+    print("="*80)